@@ -0,0 +1,98 @@
+try:
+    import numpy as np
+except ImportError:  # numpy ist optional, ohne wird jedes Blatt einzeln bewertet
+    np = None
+
+from games.tic_tac_toe import WIN_LENGTH, get_line_scores, get_win_score, get_window_masks
+
+# Zellenwerte der Brett-Arrays
+AI_CELL = 1
+HUMAN_CELL = -1
+
+
+class TicTacToeBatchEvaluator:
+    """Evaluates many TicTacToe boards with one vectorized NumPy call.
+
+    Boards are int8 arrays of shape ``(N, size, size)`` (or ``(N, size * size)``) with ``AI_CELL``,
+    ``HUMAN_CELL`` and 0 for empty. All windows are gathered at once with an index array of shape
+    ``(windows, win_length)``. The scores are the same as ``TicTacToe.evaluate_board`` from the
+    AI's view: the win score for a win, 0 for a draw, otherwise the open-line score.
+    """
+
+    def __init__(self, board_size=6, win_length=WIN_LENGTH):
+        if np is None:
+            raise ImportError("numpy is required for the batched evaluation (pip install numpy)")
+        self.board_size = board_size
+        self.win_length = win_length
+        self.win_score = get_win_score(win_length)
+        cells = board_size * board_size
+        masks = get_window_masks(board_size, win_length)
+        self.window_cells = np.array([[i for i in range(cells) if mask >> i & 1] for mask in masks],
+                                     dtype=np.intp).reshape(len(masks), win_length)
+        self.line_scores = np.array(get_line_scores(win_length), dtype=np.int64)
+        # Zuwachs eines Fensters durch einen eigenen Stein, nach Anzahl eigener Steine
+        self.line_gains = np.append(np.diff(self.line_scores), 0)
+        # incidence[cell, window] = 1, wenn das Feld im Fenster liegt
+        self.incidence = np.zeros((cells, len(self.window_cells)), dtype=np.int64)
+        self.incidence[self.window_cells, np.arange(len(self.window_cells))[:, None]] = 1
+
+    def supports(self, game):
+        return (hasattr(game, 'window_counts') and game.board_size == self.board_size
+                and game.win_length == self.win_length)
+
+    def board_array(self, game):
+        """The board of ``game`` as a flat int8 array."""
+        board = np.zeros(self.board_size * self.board_size, dtype=np.int8)
+        for mark, value in ((game.ai_player_mark, AI_CELL), (game.human_player_mark, HUMAN_CELL)):
+            bits = game.mark_bits[mark]
+            while bits:
+                low = bits & -bits
+                board[low.bit_length() - 1] = value
+                bits ^= low
+        return board
+
+    def evaluate(self, boards):
+        """Returns ``(scores, winners)`` for N boards; winners are ``AI_CELL``, ``HUMAN_CELL`` or 0."""
+        flat = boards.reshape(len(boards), -1)
+        windows = flat[:, self.window_cells]
+        ai = (windows == AI_CELL).sum(axis=2)
+        human = (windows == HUMAN_CELL).sum(axis=2)
+        line = (np.where(human == 0, self.line_scores[ai], 0).sum(axis=1)
+                - np.where(ai == 0, self.line_scores[human], 0).sum(axis=1))
+        # Wie check_win_condition: ein Sieg des Menschen wird zuerst gemeldet
+        human_wins = (human == self.win_length).any(axis=1)
+        ai_wins = (ai == self.win_length).any(axis=1)
+        full = (flat != 0).all(axis=1)
+        scores = np.where(human_wins, -self.win_score, np.where(ai_wins, self.win_score, np.where(full, 0, line)))
+        winners = np.where(human_wins, HUMAN_CELL, np.where(ai_wins, AI_CELL, 0))
+        return scores, winners
+
+    def evaluate_moves(self, game, moves, mark):
+        """Evaluates the positions after each of ``moves`` by ``mark`` without calling make_move.
+
+        Same result as ``evaluate`` on the child boards, but computed from the window counters of
+        ``game``: the change of every window is one vector, and ``incidence`` adds them up per cell.
+        """
+        other = game.human_player_mark if mark == game.ai_player_mark else game.ai_player_mark
+        own = np.array(game.window_counts[mark])
+        opp = np.array(game.window_counts[other])
+        # Eigenes Fenster wächst, ein gegnerisches wird blockiert und zählt nicht mehr
+        gains = np.where(opp == 0, self.line_gains[own], 0) + np.where(own == 0, self.line_scores[opp], 0)
+        completes = (own == self.win_length - 1) & (opp == 0)
+        size = self.board_size
+        cells = np.fromiter((r * size + c for r, c in moves), dtype=np.intp, count=len(moves))
+        incidence = self.incidence[cells]
+        sign = 1 if mark == game.ai_player_mark else -1
+        scores = sign * (incidence @ gains) + game.line_score
+        wins = (incidence @ completes) > 0
+        if game.marks_placed + 1 == size * size:
+            scores[:] = 0  # letztes Feld: Unentschieden, sofern der Zug nicht gewinnt
+        scores[wins] = sign * self.win_score
+        return scores, np.where(wins, sign, 0)
+
+
+def get_batch_evaluator(board_size=6, win_length=WIN_LENGTH):
+    """Returns a TicTacToeBatchEvaluator, or None if numpy is not installed."""
+    if np is None:
+        return None
+    return TicTacToeBatchEvaluator(board_size, win_length)
@@ -0,0 +1,333 @@
+import math
+import random
+import time
+
+# Iterationen je Schwierigkeitsstufe (max_depth), auch wenn das Zeitbudget länger reichen würde
+ITERATIONS_PER_LEVEL = 2000
+# Explorationskonstante der UCT-Formel
+EXPLORATION = 1.4
+# Heuristische Vorbewertung: zählt wie so viele virtuelle Besuche, Bewertungen werden mit PRIOR_SCALE gestaucht
+PRIOR_VISITS = 5
+PRIOR_SCALE = 100.0
+# Ein Blatt wird erst nach so vielen echten Playouts expandiert (das Expandieren bewertet alle Züge)
+EXPAND_AFTER_PLAYOUTS = 3
+# Zeit/Abbruch nur alle N Iterationen prüfen
+BUDGET_CHECK_INTERVAL = 64
+
+_WINDOW_CELLS = {}
+
+
+def _window_cells(game):
+    """Cell indices of every window of a TicTacToe board, built once per (size, win length)."""
+    key = (game.board_size, game.win_length)
+    cells = _WINDOW_CELLS.get(key)
+    if cells is None:
+        cells = [tuple(i for i in range(game.board_size * game.board_size) if mask >> i & 1)
+                 for mask in game.window_masks]
+        _WINDOW_CELLS[key] = cells
+    return cells
+
+
+def _player_to_move(game):
+    if hasattr(game, 'ai_player_mark'):
+        return game.human_player_mark if game.current_player == "human" else game.ai_player_mark
+    return game.current_player_piece
+
+
+def _winner(game, status):
+    """Piece or mark of the winner for a check_win_condition status, None for a draw."""
+    if status == "draw":
+        return None
+    if hasattr(game, 'ai_player_mark'):
+        return game.ai_player_mark if status == "ai_wins" else game.human_player_mark
+    return game.ai_player_piece if status == "ai_wins" else game.human_player_piece
+
+
+class _Node:
+    __slots__ = ("move", "player", "key", "parent", "children", "visits", "wins", "winner")
+
+    def __init__(self, move, player, key, parent):
+        self.move = move
+        self.player = player  # wer den Zug in diesen Knoten gemacht hat; wins zählt aus seiner Sicht
+        self.key = key
+        self.parent = parent
+        self.children = None  # None = noch nicht expandiert
+        self.visits = 0
+        self.wins = 0.0
+        self.winner = False  # False = Spiel läuft, sonst Gewinner (None bei Unentschieden)
+
+
+class MCTS:
+    """Monte Carlo Tree Search (UCT) with the interface of ``Minimax.find_best_move``.
+
+    Every iteration walks down the tree by the UCT formula, expands a leaf with all its moves
+    once it has had ``EXPAND_AFTER_PLAYOUTS`` playouts, finishes the game with a random playout and counts the result back up the path. The most
+    visited root move is played. With ``use_priors`` new children start with ``PRIOR_VISITS``
+    virtual visits won at a rate derived from ``evaluate_board``, so good moves are tried first.
+
+    The tree is kept between moves: if the new position is a child or grandchild of the previous
+    root, its subtree and visit counts are reused. TicTacToe playouts fill the empty cells of an
+    array in random order and look up which window was completed first; other games play random
+    moves with make_move/undo_move.
+    """
+
+    def __init__(self, game_logic_instance, max_depth=3, iterations=None, exploration=EXPLORATION, use_priors=True,
+                 seed=None, batch_evaluator=None):
+        self.game_logic_instance = game_logic_instance
+        # Wie bei Minimax die Schwierigkeitsstufe; ohne iterations = max_depth * ITERATIONS_PER_LEVEL Iterationen
+        self.max_depth = int(max_depth) if max_depth is not None else 3
+        self.iterations = iterations
+        self.exploration = exploration
+        self.use_priors = use_priors
+        # Vorbewertung aller Züge eines Knotens in einem Aufruf (ai/batch_eval.py)
+        self.batch_evaluator = batch_evaluator
+        self._expand_visits = (PRIOR_VISITS if use_priors else 0) + EXPAND_AFTER_PLAYOUTS
+        self.rng = random.Random(seed)
+        # Kompatibel zu Minimax (GameController teilt die Tabelle mit der Ponder-Engine)
+        self.transposition_table = None
+        self.search_mode = "mcts"
+        self.ai_player_piece = None
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self.principal_variation = []
+        self.search_stats = self._empty_search_stats()
+        self.search_time_ms = 0.0
+        self._root = None
+
+    @staticmethod
+    def _empty_search_stats():
+        return {'playouts': 0, 'reused_visits': 0}
+
+    def new_game(self):
+        """Forgets the tree of the previous game."""
+        self._root = None
+
+    def find_best_move(self, ai_player_role_piece, time_limit_ms=None, max_nodes=None, stop_event=None):
+        """Returns the most visited move after the iteration budget, or None if the AI has no moves.
+
+        The budget is ``iterations`` (default ``max_depth * ITERATIONS_PER_LEVEL``), lowered by
+        ``max_nodes``; ``time_limit_ms`` and ``stop_event`` end the search earlier.
+        """
+        start_time = time.perf_counter()
+        self.search_stats = self._empty_search_stats()
+        try:
+            return self._find_best_move(ai_player_role_piece, time_limit_ms, max_nodes, stop_event, start_time)
+        finally:
+            self.search_time_ms = (time.perf_counter() - start_time) * 1000.0
+
+    def _find_best_move(self, ai_player_role_piece, time_limit_ms, max_nodes, stop_event, start_time):
+        self.ai_player_piece = ai_player_role_piece
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self.principal_variation = []
+        state = self.game_logic_instance.clone()
+        if state.is_game_over():
+            return None
+
+        root = self._reuse_root(state)
+        self.search_stats['reused_visits'] = root.visits
+        self._expand(root, state)
+        if not root.children:
+            return None
+        if len(root.children) == 1:
+            self.completed_depth = self.max_depth
+            return root.children[0].move
+
+        full_budget = self.iterations if self.iterations is not None else self.max_depth * ITERATIONS_PER_LEVEL
+        budget = min(full_budget, max_nodes) if max_nodes is not None else full_budget
+        deadline = start_time + time_limit_ms / 1000.0 if time_limit_ms is not None else None
+        for iteration in range(budget):
+            if iteration % BUDGET_CHECK_INTERVAL == 0 and iteration:
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+                if stop_event is not None and stop_event.is_set():
+                    break
+            self._iterate(root, state)
+            self.nodes_searched += 1
+        self.search_stats['playouts'] = self.nodes_searched
+
+        self._root = root
+        best = max(root.children, key=lambda child: child.visits)
+        self.principal_variation = self._principal_variation(root, PRIOR_VISITS if self.use_priors else 0)
+        # Wie bei Minimax: die Stufe, deren Budget vollständig abgearbeitet wurde
+        self.completed_depth = self.max_depth * self.nodes_searched // full_budget
+        return best.move
+
+    def _reuse_root(self, state):
+        """Returns the node of the current position from the previous tree, or a new root."""
+        key = state.zobrist_hash
+        previous = self._root
+        if previous is not None:
+            # Eigener Zug und Antwort des Gegners: die Stellung liegt höchstens zwei Ebenen tiefer
+            candidates = [previous]
+            for child in previous.children or ():
+                candidates.append(child)
+                candidates.extend(child.children or ())
+            for node in candidates:
+                if node.key == key and node.winner is False:
+                    node.parent = None
+                    return node
+        return _Node(None, None, key, None)
+
+    def _expand(self, node, state):
+        if node.children is not None:
+            return
+        player = _player_to_move(state)
+        if hasattr(state, 'get_all_possible_moves'):
+            moves = list(state.get_all_possible_moves(player))
+        else:
+            moves = state.get_possible_moves(player)
+        if self.use_priors and self.batch_evaluator is not None and self.batch_evaluator.supports(state):
+            node.children = self._batch_children(node, state, moves, player)
+            return
+        children = []
+        for move in moves:
+            state.make_move(move, player)
+            child = _Node(move, player, state.zobrist_hash, node)
+            status = state.check_win_condition()
+            if status is not None:
+                child.winner = _winner(state, status)
+            if self.use_priors:
+                if status is not None:
+                    prior = 1.0 if child.winner == player else 0.5 if child.winner is None else 0.0
+                else:
+                    prior = self._prior(state.evaluate_board(player))
+                child.visits = PRIOR_VISITS
+                child.wins = PRIOR_VISITS * prior
+            state.undo_move()
+            children.append(child)
+        node.children = children
+
+    def _batch_children(self, node, state, moves, player):
+        """Children with priors from one batched evaluation, without make_move (TicTacToe only)."""
+        scores, winners = self.batch_evaluator.evaluate_moves(state, moves, player)
+        sign = 1 if player == state.ai_player_mark else -1
+        keys = state.zobrist.piece_keys[player]
+        side_key = state.zobrist.side_key
+        last_cell = state.marks_placed + 1 == state.board_size * state.board_size
+        size = state.board_size
+        children = []
+        for move, score, winner in zip(moves, scores.tolist(), winners.tolist()):
+            child = _Node(move, player, state.zobrist_hash ^ keys[move[0] * size + move[1]] ^ side_key, node)
+            if winner:
+                child.winner = player
+                prior = 1.0
+            elif last_cell:
+                child.winner = None
+                prior = 0.5
+            else:
+                prior = self._prior(sign * score)
+            child.visits = PRIOR_VISITS
+            child.wins = PRIOR_VISITS * prior
+            children.append(child)
+        return children
+
+    @staticmethod
+    def _prior(score):
+        """Maps an evaluation from the mover's view to an expected result between 0 and 1."""
+        if score == float('inf'):
+            return 1.0
+        if score == -float('inf'):
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, score / PRIOR_SCALE))))
+
+    def _select(self, node):
+        log_visits = math.log(node.visits + 1)
+        exploration = self.exploration
+        best = None
+        best_value = -1.0
+        for child in node.children:
+            if child.visits == 0:
+                return child
+            value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def _iterate(self, root, state):
+        node = root
+        path = [root]
+        depth = 0
+        while node.children and node.winner is False:
+            node = self._select(node)
+            state.make_move(node.move, node.player)
+            path.append(node)
+            depth += 1
+        if node.winner is False and node.visits >= self._expand_visits:
+            self._expand(node, state)
+            if node.children:
+                node = self._select(node)
+                state.make_move(node.move, node.player)
+                path.append(node)
+                depth += 1
+        winner = node.winner if node.winner is not False else self._playout(state)
+        for _ in range(depth):
+            state.undo_move()
+        for visited in path:
+            visited.visits += 1
+            if winner is None:
+                visited.wins += 0.5
+            elif winner == visited.player:
+                visited.wins += 1.0
+
+    def _playout(self, state):
+        """Plays random moves to the end and returns the winner (None for a draw)."""
+        if hasattr(state, 'window_counts'):
+            return self._array_playout(state)
+        played = 0
+        status = state.check_win_condition()
+        while status is None:
+            player = _player_to_move(state)
+            moves = state.get_all_possible_moves(player) if hasattr(state, 'get_all_possible_moves') \
+                else state.get_possible_moves(player)
+            state.make_move(moves[self.rng.randrange(len(moves))], player)
+            played += 1
+            status = state.check_win_condition()
+        winner = _winner(state, status)
+        for _ in range(played):
+            state.undo_move()
+        return winner
+
+    def _array_playout(self, state):
+        """TicTacToe playout without make_move: fill all empty cells in random order, first window wins."""
+        to_move = _player_to_move(state)
+        other = state.human_player_mark if to_move == state.ai_player_mark else state.ai_player_mark
+        size = state.board_size * state.board_size
+        to_move_bits = state.mark_bits[to_move]
+        other_bits = state.mark_bits[other]
+        occupied = to_move_bits | other_bits
+        empty = [i for i in range(size) if not occupied >> i & 1]
+        self.rng.shuffle(empty)
+        placed_at = [-1] * size
+        for turn, cell in enumerate(empty):
+            placed_at[cell] = turn
+        # Abwechselnd ziehen: gerade Züge für to_move, ungerade für den Gegner
+        for cell in empty[::2]:
+            to_move_bits |= 1 << cell
+        for cell in empty[1::2]:
+            other_bits |= 1 << cell
+        # Gewinner ist, wessen Fenster als erstes vollständig war
+        winner = None
+        first = size
+        for mask, cells in zip(state.window_masks, _window_cells(state)):
+            if to_move_bits & mask == mask:
+                mark = to_move
+            elif other_bits & mask == mask:
+                mark = other
+            else:
+                continue
+            completed = max(placed_at[cell] for cell in cells)
+            if completed < first:
+                first, winner = completed, mark
+        return winner
+
+    @staticmethod
+    def _principal_variation(root, virtual_visits):
+        variation = []
+        node = root
+        while node.children:
+            node = max(node.children, key=lambda child: child.visits)
+            if node.visits <= virtual_visits:
+                break
+            variation.append(node.move)
+        return variation
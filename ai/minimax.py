@@ -1,107 +1,819 @@
-import copy
+import time
+
+from ai.move_ordering import MoveOrdering, captured_count
+from ai.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+# Wird in den Schlüssel gemischt, damit Max- und Min-Knoten derselben Stellung getrennt bleiben
+MAXIMIZING_KEY = 0x9E3779B97F4A7C15
+# Zeit/Knotenbudget nur alle N Knoten prüfen
+BUDGET_CHECK_INTERVAL = 256
+# "alphabeta": Minimax mit zwei Zweigen; "pvs": Negamax mit Principal Variation Search
+SEARCH_MODES = ("alphabeta", "pvs")
+# Halbe Breite des Aspirationsfensters um den Wert der vorigen Iteration (nur "pvs")
+ASPIRATION_WINDOW = 50
+# Selektive Suche (nur "pvs"): Late-Move-Reductions, Null-Move- und Futility-Pruning
+LMR_FULL_DEPTH_MOVES = 3
+LMR_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_MIN_PIECES = 3
+FUTILITY_MARGIN = 25
+# Drohungssuche (ai/threat_space.py) nur in Knoten mit mindestens dieser Resttiefe, nicht an den Blättern
+THREAT_CHECK_MIN_DEPTH = 2
+
+
+class _SearchAborted(Exception):
+    """Raised inside the search when the time or node budget is used up."""
+
 
 class Minimax:
     WIN_BASE_SCORE = 1000000
+    # Größter Wert im "pvs"-Modus (gewonnene Endstellung); ersetzt ±inf als Fenstergrenze
+    MAX_SCORE = 2 * WIN_BASE_SCORE
 
-    def __init__(self, game_logic_instance, max_depth=3):
+    def __init__(self, game_logic_instance, max_depth=3, transposition_table_mb=TranspositionTable.DEFAULT_SIZE_MB,
+                 use_transposition_table=True, parallel_workers=None, use_move_ordering=True, search_mode="alphabeta",
+                 use_quiescence=True, use_lmr=False, use_null_move=False, use_futility=False, use_symmetry=True,
+                 opening_book=None, tablebase=None, threat_search=None, proof_search=None, batch_evaluator=None):
+        if search_mode not in SEARCH_MODES:
+            raise ValueError("Unknown search mode")
+        self.search_mode = search_mode
         self.game_logic_instance = game_logic_instance
         self.max_depth = int(max_depth) if max_depth is not None else 3
         self.ai_player_piece = None
+        self.transposition_table_mb = transposition_table_mb
+        self.transposition_table = TranspositionTable(transposition_table_mb) if use_transposition_table else None
+        # Killer- und History-Sortierung (ai/move_ordering.py); None = nur Tabellenzug zuerst
+        self.move_ordering = MoveOrdering() if use_move_ordering else None
+        # Schlagfolgen am Horizont auflösen (nur Spiele mit get_capture_moves, also Dame)
+        self.use_quiescence = use_quiescence
+        # Selektive Suche, nur im "pvs"-Modus wirksam
+        self.use_lmr = use_lmr
+        self.use_null_move = use_null_move
+        self.use_futility = use_futility
+        # Symmetrische Stellungen teilen sich Tabelleneinträge (nur Spiele mit canonical_hash, also TicTacToe)
+        self.use_symmetry = use_symmetry
+        self._symmetric_keys = False
+        # Eröffnungsbuch (ai/opening_book.OpeningBook); wird vor jeder Suche befragt
+        self.opening_book = opening_book
+        # Endspieldatenbank (ai/tablebase.DameTablebase); beendet die Suche in jeder erfassten Stellung
+        self.tablebase = tablebase
+        # Löser für erzwungene Drohfolgen (ai/threat_space.ThreatSpaceSearch), vor und in der Suche
+        self.threat_search = threat_search
+        # Beweiszahlsuche (ai/proof_number.ProofNumberSearch) als Vorprüfung in Stellungen mit wenigen Steinen
+        self.proof_search = proof_search
+        # Bewertet alle Züge eines Knotens mit Resttiefe 1 in einem Aufruf (ai/batch_eval.py, nur ohne Quiescence)
+        self.batch_evaluator = batch_evaluator
+        self._batch_leaves = False
+        self.search_stats = self._empty_search_stats()
+        self.search_time_ms = 0.0
+        self._exact_leaves = True
+        self._in_null_move = False
+        # Anzahl Prozesse für die parallele Wurzelsuche (ai/parallel.py); None = seriell
+        self.parallel_workers = parallel_workers
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self.principal_variation = []
+        self._deadline = None
+        self._node_limit = None
+        self._stop_event = None
+        self._budget_enabled = False
 
     def _get_current_turn_piece(self, game_state_instance, is_maximizing_player_turn):
         if is_maximizing_player_turn:
             return self.ai_player_piece
-        else:
-            if game_state_instance.__class__.__name__ == "TicTacToe":
-                return game_state_instance.human_player_mark if self.ai_player_piece == game_state_instance.ai_player_mark else game_state_instance.ai_player_mark
-            elif game_state_instance.__class__.__name__ == "Dame":
-                return game_state_instance.human_player_piece if self.ai_player_piece == game_state_instance.ai_player_piece else game_state_instance.ai_player_piece
-            return None
+        if hasattr(game_state_instance, 'ai_player_mark'):
+            return game_state_instance.human_player_mark if self.ai_player_piece == game_state_instance.ai_player_mark else game_state_instance.ai_player_mark
+        if hasattr(game_state_instance, 'ai_player_piece'):
+            return game_state_instance.human_player_piece if self.ai_player_piece == game_state_instance.ai_player_piece else game_state_instance.ai_player_piece
+        return None
 
-    def find_best_move(self, ai_player_role_piece):
-        self.ai_player_piece = ai_player_role_piece
-        best_move_found = None
-        best_eval_score = -float('inf')
-        alpha = -float('inf')
-        beta = float('inf')
+    def _get_moves(self, game_state, player_piece):
+        if hasattr(game_state, 'get_all_possible_moves'):
+            return game_state.get_all_possible_moves(player_piece)
+        # TicTacToe: Felder neben bestehenden Steinen zuerst
+        return self._sort_moves(game_state.get_possible_moves(player_piece), game_state, player_piece)
 
-        current_live_game = self.game_logic_instance
+    def _position_key(self, game_state, is_maximizing_player_turn):
+        key = game_state.canonical_hash() if self._symmetric_keys else game_state.zobrist_hash
+        if is_maximizing_player_turn:
+            key ^= MAXIMIZING_KEY
+        return key
 
-        if current_live_game.__class__.__name__ == "TicTacToe":
-            possible_first_moves = current_live_game.get_possible_moves(self.ai_player_piece)
-            possible_first_moves = self._sort_moves(possible_first_moves, current_live_game, self.ai_player_piece)
-            clone_func = lambda g: g.clone()
-        else:
-            possible_first_moves = current_live_game.get_all_possible_moves(self.ai_player_piece) if hasattr(
-                current_live_game, 'get_all_possible_moves') else current_live_game.get_possible_moves(
-                self.ai_player_piece)
-            clone_func = lambda g: copy.deepcopy(g)
+    def _table_move(self, game_state, move):
+        """Move as stored in the transposition table: in the orientation of the canonical position."""
+        if move is None or not self._symmetric_keys:
+            return move
+        return game_state.to_canonical_move(move, game_state.canonical_symmetry())
+
+    def _board_move(self, game_state, move):
+        """Inverse of ``_table_move``: a stored move in the orientation of ``game_state``."""
+        if move is None or not self._symmetric_keys:
+            return move
+        return game_state.from_canonical_move(move, game_state.canonical_symmetry())
+
+    def _probe_move(self, game_state, key, moves):
+        """Returns the stored entry for ``key`` and its best move if that move is legal in ``moves``."""
+        if self.transposition_table is None:
+            return None, None
+        entry = self.transposition_table.probe(key)
+        if entry is not None:
+            move = self._board_move(game_state, entry[4])
+            if move is not None and move in moves:
+                return entry, move
+        return None, None
+
+    def find_best_move(self, ai_player_role_piece, time_limit_ms=None, max_nodes=None, stop_event=None):
+        """Returns the best move for the AI, or None if it has no moves.
+
+        Without a budget the root is searched once to ``max_depth``. With ``time_limit_ms`` and/or
+        ``max_nodes`` the search deepens iteratively from depth 1 up to ``max_depth`` and returns the
+        best move of the deepest iteration that finished within the budget. Setting ``stop_event``
+        (a ``threading.Event``) from another thread ends the search the same way.
+
+        Afterwards ``nodes_searched``, ``search_time_ms`` and ``search_stats`` describe the search.
+        """
+        start_time = time.perf_counter()
+        self.search_stats = self._empty_search_stats()
+        try:
+            return self._find_best_move(ai_player_role_piece, time_limit_ms, max_nodes, stop_event, start_time)
+        finally:
+            self.search_time_ms = (time.perf_counter() - start_time) * 1000.0
+            self._deadline = None
+            self._node_limit = None
+            self._stop_event = None
+            self._budget_enabled = False
+
+    def _find_best_move(self, ai_player_role_piece, time_limit_ms, max_nodes, stop_event, start_time):
+        self.ai_player_piece = ai_player_role_piece
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self.principal_variation = []
+        if self.opening_book is not None:
+            # Buchzug nur, wenn er mindestens so tief gesucht wurde wie diese Suche gehen würde
+            book_move = self.opening_book.probe(self.game_logic_instance, self.ai_player_piece, self.max_depth)
+            if book_move is not None:
+                self.search_stats['book_hits'] += 1
+                self.completed_depth = self.max_depth
+                return book_move
+        if self.transposition_table is not None:
+            # Einträge früherer Züge bleiben abrufbar, werden aber zuerst ersetzt
+            self.transposition_table.new_search()
+        if self.move_ordering is not None:
+            self.move_ordering.new_search()
+        self._deadline = start_time + time_limit_ms / 1000.0 if time_limit_ms is not None else None
+        self._node_limit = max_nodes
+        self._stop_event = stop_event
+
+        # Einmal kopieren, danach wird mit make_move/undo_move auf demselben Objekt gesucht
+        search_state = self.game_logic_instance.clone()
+        self._exact_leaves = not self._has_quiescence(search_state)
+        self._batch_leaves = self._uses_batch_leaves(search_state)
+        self._symmetric_keys = self.use_symmetry and hasattr(search_state, 'canonical_hash')
+        possible_first_moves = self._get_moves(search_state, self.ai_player_piece)
 
         if not possible_first_moves:
             return None
+        # Abgebrochen wird auch in den Vorprüfungen, mit dem ersten Zug wie bei der iterativen Vertiefung
+        if self._stop_requested(stop_event):
+            return possible_first_moves[0]
 
         # Prüfe auf sofortigen Gewinnzug
         for move in possible_first_moves:
-            simulated_game = clone_func(current_live_game)
-            simulated_game.make_move(move, self.ai_player_piece)
-            if simulated_game.check_win_condition() == "ai_wins":
+            search_state.make_move(move, self.ai_player_piece)
+            is_win = search_state.check_win_condition() == "ai_wins"
+            search_state.undo_move()
+            if is_win:
                 return move  # Sofortiger Gewinnzug
 
-        for move in possible_first_moves:
-            simulated_game_after_ai_move = clone_func(current_live_game)
-            simulated_game_after_ai_move.make_move(move, self.ai_player_piece)
-            eval_score = self._minimax_recursive(simulated_game_after_ai_move, self.max_depth - 1, False, alpha, beta)
+        if self.threat_search is not None:
+            threat = self.threat_search.solve(search_state, self.ai_player_piece, stop_event=stop_event,
+                                              deadline=self._deadline)
+            if threat is not None:
+                self.search_stats['threat_wins'] += 1
+                self.completed_depth = self.max_depth
+                self.principal_variation = threat[1]
+                return threat[1][0]
+            if self._stop_requested(stop_event):
+                return possible_first_moves[0]
+
+        # Ist das Zeitbudget schon verbraucht, entfallen die übrigen Vorprüfungen; Tiefe 1 liefert trotzdem einen Zug
+        if self.tablebase is not None and not self._deadline_passed():
+            tablebase_move = self.tablebase.best_move(search_state, self.ai_player_piece)
+            if tablebase_move is not None:
+                self.search_stats['tablebase_hits'] += 1
+                self.completed_depth = self.max_depth
+                return tablebase_move
+
+        if self.proof_search is not None and not self._deadline_passed() and self.proof_search.applies(search_state):
+            proof_move = self.proof_search.winning_move(search_state, self.ai_player_piece, stop_event=stop_event,
+                                                        deadline=self._deadline)
+            if proof_move is not None:
+                self.search_stats['proof_wins'] += 1
+                self.completed_depth = self.max_depth
+                return proof_move
+            if self._stop_requested(stop_event):
+                return possible_first_moves[0]
+
+        # Bereits vollständig durchsuchte Wurzel wiederverwenden, sonst gespeicherten Zug zuerst
+        root_key = self._position_key(search_state, True)
+        root_entry, root_move = self._probe_move(search_state, root_key, possible_first_moves)
+        if root_entry is not None:
+            if root_entry[1] >= self.max_depth and root_entry[2] == EXACT:
+                self.completed_depth = root_entry[1]
+                return root_move
+            possible_first_moves = [root_move] + [m for m in possible_first_moves if m != root_move]
+        if self._symmetric_keys and hasattr(search_state, 'unique_moves'):
+            # Solange die Stellung symmetrisch ist, führen symmetrische Züge zu gleichwertigen Stellungen
+            possible_first_moves = search_state.unique_moves(possible_first_moves)
+
+        if self._deadline is None and self._node_limit is None and self._stop_event is None:
+            best_move_found, _ = self._search_root(search_state, possible_first_moves, self.max_depth)
+            self.completed_depth = self.max_depth
+            self.principal_variation = self._extract_principal_variation(search_state)
+            return best_move_found
+
+        best_move_found = possible_first_moves[0]
+        iteration_scores = {}
+        for depth in range(1, self.max_depth + 1):
+            try:
+                # Bewertungen schwanken zwischen geraden und ungeraden Tiefen: Fenster um den Wert von depth - 2
+                move, iteration_scores[depth] = self._search_root_aspiration(search_state, possible_first_moves, depth,
+                                                                             iteration_scores.get(depth - 2))
+            except _SearchAborted:
+                break
+            best_move_found = move
+            self.completed_depth = depth
+            self.principal_variation = self._extract_principal_variation(search_state)
+            # Nächste Iteration beginnt mit dem bisher besten Zug (Hauptvariante)
+            possible_first_moves = [move] + [m for m in possible_first_moves if m != move]
+        return best_move_found
+
+    @staticmethod
+    def _stop_requested(stop_event):
+        return stop_event is not None and stop_event.is_set()
+
+    def _deadline_passed(self):
+        return self._deadline is not None and time.perf_counter() > self._deadline
+
+    def new_game(self):
+        """Forgets the previous game; the engine itself can be reused for the next one."""
+        if self.transposition_table is not None:
+            self.transposition_table.clear()
+        if self.move_ordering is not None:
+            self.move_ordering.clear()
+        self.nodes_searched = 0
+        self.completed_depth = 0
+        self.principal_variation = []
+
+    def _search_root_aspiration(self, search_state, root_moves, depth, previous_score):
+        """One iteration of iterative deepening; "pvs" first tries a narrow window around ``previous_score``."""
+        check_budget = depth > 1
+        use_window = (self.search_mode == "pvs" and not self.parallel_workers and previous_score is not None
+                      and abs(previous_score) < self.WIN_BASE_SCORE)
+        if use_window:
+            alpha = previous_score - ASPIRATION_WINDOW
+            beta = previous_score + ASPIRATION_WINDOW
+            move, score = self._search_root(search_state, root_moves, depth, check_budget, alpha, beta)
+            if alpha < score < beta:
+                return move, score
+            # Wert liegt außerhalb des Fensters: nur die verfehlte Seite öffnen
+            if score <= alpha:
+                return self._search_root(search_state, root_moves, depth, check_budget, beta=beta)
+            return self._search_root(search_state, root_moves, depth, check_budget, alpha=alpha)
+        return self._search_root(search_state, root_moves, depth, check_budget)
+
+    def _search_root(self, search_state, root_moves, depth, check_budget=False, alpha=-float('inf'), beta=float('inf')):
+        if self.parallel_workers and len(root_moves) > 1:
+            from ai.parallel import search_root_parallel
+            time_limit_ms = None
+            if check_budget and self._deadline is not None:
+                time_limit_ms = max(0.0, (self._deadline - time.perf_counter()) * 1000.0)
+            stop_event = self._stop_event if check_budget else None
+            best_move_found, best_eval_score = search_root_parallel(self, search_state, root_moves, depth, time_limit_ms,
+                                                                    stop_event)
+        elif self.search_mode == "pvs":
+            # Ein Gewinn mit MAX_SCORE schneidet wie +inf im "alphabeta"-Modus sofort ab
+            alpha = max(alpha, -self.MAX_SCORE)
+            beta = min(beta, self.MAX_SCORE)
+            best_move_found, best_eval_score = self._search_root_pvs(search_state, root_moves, depth, check_budget,
+                                                                     alpha, beta)
+            if not alpha < best_eval_score < beta and abs(best_eval_score) != self.MAX_SCORE:
+                # Nur eine Schranke (Aspirationsfenster verfehlt), nicht als exakter Wert speichern
+                return best_move_found, best_eval_score
+        else:
+            best_move_found, best_eval_score = self._search_root_serial(search_state, root_moves, depth, check_budget)
+
+        if self.transposition_table is not None:
+            root_key = self._position_key(search_state, True)
+            self.transposition_table.store(root_key, depth, EXACT, best_eval_score,
+                                           self._table_move(search_state, best_move_found))
+        return best_move_found, best_eval_score
+
+    def _search_root_serial(self, search_state, root_moves, depth, check_budget):
+        # Auch wenn alle Züge verlieren, wird ein Zug zurückgegeben
+        best_move_found = root_moves[0]
+        best_eval_score = -float('inf')
+        alpha = -float('inf')
+        beta = float('inf')
+        self._budget_enabled = check_budget
+        for move in root_moves:
+            search_state.make_move(move, self.ai_player_piece)
+            try:
+                eval_score = self._minimax_recursive(search_state, depth - 1, False, alpha, beta, 1)
+            finally:
+                search_state.undo_move()
             if eval_score > best_eval_score:
                 best_eval_score = eval_score
                 best_move_found = move
             alpha = max(alpha, eval_score)
+        return best_move_found, best_eval_score
 
-        return best_move_found
+    def _search_root_pvs(self, search_state, root_moves, depth, check_budget, alpha, beta):
+        best_move_found = root_moves[0]
+        best_eval_score = -float('inf')
+        self._budget_enabled = check_budget
+        for index, move in enumerate(root_moves):
+            search_state.make_move(move, self.ai_player_piece)
+            try:
+                if index == 0 or alpha <= -self.MAX_SCORE:
+                    eval_score = -self._negamax(search_state, depth - 1, False, -beta, -alpha, 1)
+                else:
+                    eval_score = -self._negamax(search_state, depth - 1, False, -alpha - 1, -alpha, 1)
+                    if (depth > 1 or not self._exact_leaves) and alpha < eval_score < beta:
+                        eval_score = -self._negamax(search_state, depth - 1, False, -beta, -alpha, 1)
+            finally:
+                search_state.undo_move()
+            if eval_score > best_eval_score:
+                best_eval_score = eval_score
+                best_move_found = move
+            alpha = max(alpha, eval_score)
+            if alpha >= beta:
+                break
+        return best_move_found, best_eval_score
+
+    def worker_options(self):
+        """Constructor options for the engines in the parallel worker processes.
+
+        LMR, null move and futility pruning stay off there: they depend on the search window, and the
+        narrowed shared-alpha window of a worker could then pick another move than the serial search.
+        """
+        return {
+            'max_depth': self.max_depth,
+            'transposition_table_mb': self.transposition_table_mb,
+            'use_transposition_table': self.transposition_table is not None,
+            'use_move_ordering': self.move_ordering is not None,
+            'search_mode': self.search_mode,
+            'use_quiescence': self.use_quiescence,
+            'use_lmr': False,
+            'use_null_move': False,
+            'use_futility': False,
+            'use_symmetry': self.use_symmetry,
+            'tablebase': self.tablebase,
+            'threat_search': self.threat_search,
+            'batch_evaluator': self.batch_evaluator,
+        }
+
+    def search_root_move(self, game_state, move, depth, ai_player_piece, alpha, time_limit_ms=None, stop_event=None):
+        """Searches a single root move with the window (alpha, inf); used by the parallel workers."""
+        self.ai_player_piece = ai_player_piece
+        self.nodes_searched = 0
+        self._deadline = time.perf_counter() + time_limit_ms / 1000.0 if time_limit_ms is not None else None
+        self._node_limit = None
+        self._stop_event = stop_event
+        self._budget_enabled = self._deadline is not None or stop_event is not None
+        self._exact_leaves = not self._has_quiescence(game_state)
+        self._batch_leaves = self._uses_batch_leaves(game_state)
+        self._symmetric_keys = self.use_symmetry and hasattr(game_state, 'canonical_hash')
+        game_state.make_move(move, ai_player_piece)
+        try:
+            if self.search_mode == "pvs":
+                return -self._negamax(game_state, depth - 1, False, -self.MAX_SCORE, -max(alpha, -self.MAX_SCORE), 1)
+            return self._minimax_recursive(game_state, depth - 1, False, alpha, float('inf'), 1)
+        finally:
+            game_state.undo_move()
+            self._budget_enabled = False
+            self._stop_event = None
+
+    def _extract_principal_variation(self, search_state):
+        """Follows the best moves stored in the transposition table from the root."""
+        if self.transposition_table is None:
+            return []
+        variation = []
+        is_maximizing_player_turn = True
+        seen = set()
+        while True:
+            key = self._position_key(search_state, is_maximizing_player_turn)
+            if key in seen:
+                break
+            seen.add(key)
+            piece = self._get_current_turn_piece(search_state, is_maximizing_player_turn)
+            _, move = self._probe_move(search_state, key, self._get_moves(search_state, piece))
+            if move is None:
+                break
+            search_state.make_move(move, piece)
+            variation.append(move)
+            is_maximizing_player_turn = not is_maximizing_player_turn
+        for _ in variation:
+            search_state.undo_move()
+        return variation
+
+    def _check_budget(self):
+        if not self._budget_enabled:
+            return
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _SearchAborted()
+        if self._node_limit is not None and self.nodes_searched > self._node_limit:
+            raise _SearchAborted()
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise _SearchAborted()
+
+    def _minimax_recursive(self, game_state, depth, is_maximizing_player_turn, alpha, beta, ply):
+        self.nodes_searched += 1
+        if self.nodes_searched % BUDGET_CHECK_INTERVAL == 0:
+            self._check_budget()
+        if self.tablebase is not None:
+            score = self._tablebase_score(game_state, depth)
+            if score is not None:
+                return score if is_maximizing_player_turn else -score
+        tt = self.transposition_table
+        key = self._position_key(game_state, is_maximizing_player_turn)
+        entry = tt.probe(key) if tt is not None else None
+        if entry is not None and entry[1] >= depth:
+            entry_flag, entry_score = entry[2], entry[3]
+            if entry_flag == EXACT:
+                return entry_score
+            if entry_flag == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            elif entry_flag == UPPER_BOUND:
+                beta = min(beta, entry_score)
+            if beta <= alpha:
+                return entry_score
+
+        if depth == 0 and self._wants_quiescence(game_state):
+            if is_maximizing_player_turn:
+                score = self._quiescence(game_state, True, alpha, beta)
+            else:
+                score = -self._quiescence(game_state, False, -beta, -alpha)
+            if tt is not None:
+                tt.store(key, 0, self._bound_flag(score, alpha, beta), score, None)
+            return score
 
-    def _minimax_recursive(self, game_state, depth, is_maximizing_player_turn, alpha, beta):
         if depth == 0 or game_state.is_game_over():
-            return game_state.evaluate_board(self.ai_player_piece)
+            score = game_state.evaluate_board(self.ai_player_piece)
+            if tt is not None:
+                tt.store(key, depth, EXACT, score, None)
+            return score
 
         current_recursive_turn_piece = self._get_current_turn_piece(game_state, is_maximizing_player_turn)
         if current_recursive_turn_piece is None:
             return 0
+        if self.threat_search is not None and depth >= THREAT_CHECK_MIN_DEPTH:
+            score = self._threat_score(game_state, current_recursive_turn_piece)
+            if score is not None:
+                score = score if is_maximizing_player_turn else -score
+                if tt is not None:
+                    tt.store(key, depth, EXACT, score, None)
+                return score
 
-        if game_state.__class__.__name__ == "TicTacToe":
-            possible_moves = game_state.get_possible_moves(current_recursive_turn_piece)
-            possible_moves = self._sort_moves(possible_moves, game_state, current_recursive_turn_piece)
-            clone_func = lambda g: g.clone()
-        else:
-            possible_moves = game_state.get_all_possible_moves(current_recursive_turn_piece) if hasattr(game_state, 'get_all_possible_moves') else game_state.get_possible_moves(current_recursive_turn_piece)
-            clone_func = lambda g: copy.deepcopy(g)
+        possible_moves = self._get_moves(game_state, current_recursive_turn_piece)
 
         if not possible_moves:
             if is_maximizing_player_turn:
                 return -self.WIN_BASE_SCORE - depth
             else:
                 return self.WIN_BASE_SCORE + depth
+        if depth == 1 and self._batch_leaves:
+            score, best_move = self._batch_last_ply(game_state, current_recursive_turn_piece, possible_moves,
+                                                    is_maximizing_player_turn)
+            score = score if is_maximizing_player_turn else -score
+            if tt is not None:
+                tt.store(key, depth, EXACT, score, self._table_move(game_state, best_move))
+            return score
 
+        tt_move = self._board_move(game_state, entry[4]) if entry is not None else None
+        move_ordering = self.move_ordering
+        if move_ordering is not None:
+            possible_moves = move_ordering.order(possible_moves, current_recursive_turn_piece, ply, tt_move)
+        elif tt_move is not None and tt_move in possible_moves:
+            possible_moves = [tt_move] + [m for m in possible_moves if m != tt_move]
+
+        alpha_original, beta_original = alpha, beta
+        best_move = None
         if is_maximizing_player_turn:
             max_eval = -float('inf')
             for move in possible_moves:
-                next_game_state = clone_func(game_state)
-                next_game_state.make_move(move, current_recursive_turn_piece)
-                evaluation = self._minimax_recursive(next_game_state, depth - 1, False, alpha, beta)
-                max_eval = max(max_eval, evaluation)
+                game_state.make_move(move, current_recursive_turn_piece)
+                try:
+                    evaluation = self._minimax_recursive(game_state, depth - 1, False, alpha, beta, ply + 1)
+                finally:
+                    game_state.undo_move()
+                if evaluation > max_eval:
+                    max_eval = evaluation
+                    best_move = move
                 alpha = max(alpha, evaluation)
                 if beta <= alpha:
+                    if move_ordering is not None:
+                        move_ordering.record_cutoff(move, current_recursive_turn_piece, ply, depth)
                     break
-            return max_eval
+            best_eval = max_eval
         else:
             min_eval = float('inf')
             for move in possible_moves:
-                next_game_state = clone_func(game_state)
-                next_game_state.make_move(move, current_recursive_turn_piece)
-                evaluation = self._minimax_recursive(next_game_state, depth - 1, True, alpha, beta)
-                min_eval = min(min_eval, evaluation)
+                game_state.make_move(move, current_recursive_turn_piece)
+                try:
+                    evaluation = self._minimax_recursive(game_state, depth - 1, True, alpha, beta, ply + 1)
+                finally:
+                    game_state.undo_move()
+                if evaluation < min_eval:
+                    min_eval = evaluation
+                    best_move = move
                 beta = min(beta, evaluation)
                 if beta <= alpha:
+                    if move_ordering is not None:
+                        move_ordering.record_cutoff(move, current_recursive_turn_piece, ply, depth)
                     break
-            return min_eval
+            best_eval = min_eval
+
+        if tt is not None:
+            if best_eval <= alpha_original:
+                flag = UPPER_BOUND
+            elif best_eval >= beta_original:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            tt.store(key, depth, flag, best_eval, self._table_move(game_state, best_move))
+        return best_eval
+
+    def _uses_batch_leaves(self, game_state):
+        return (self.batch_evaluator is not None and not self._has_quiescence(game_state)
+                and self.batch_evaluator.supports(game_state))
+
+    def _batch_last_ply(self, game_state, piece, moves, is_ai_turn):
+        """Exact value and best move of a node with depth 1 (score from the side to move), all leaves in one batch.
+
+        Gives the same values as searching every move down to ``evaluate_board``, but without
+        make_move/undo_move and without alpha-beta cutoffs among the leaves.
+        """
+        scores, _ = self.batch_evaluator.evaluate_moves(game_state, moves, piece)
+        self.nodes_searched += len(moves)
+        if not is_ai_turn:
+            scores = -scores
+        best = int(scores.argmax())
+        return int(scores[best]), moves[best]
+
+    def _has_quiescence(self, game_state):
+        return self.use_quiescence and hasattr(game_state, 'get_capture_moves')
+
+    def _wants_quiescence(self, game_state):
+        return self._has_quiescence(game_state) and not game_state.is_game_over()
+
+    @staticmethod
+    def _empty_search_stats():
+        return {
+            'lmr_reductions': 0,
+            'lmr_researches': 0,
+            'null_move_tries': 0,
+            'null_move_cutoffs': 0,
+            'futility_prunes': 0,
+            'book_hits': 0,
+            'tablebase_hits': 0,
+            'threat_wins': 0,
+            'proof_wins': 0,
+        }
+
+    def _tablebase_score(self, game_state, depth):
+        """Exact score of a tablebase position from the side to move, or None if it is not covered.
+
+        Uses the scale of ``-WIN_BASE_SCORE - depth`` for a side without moves: a loss in
+        ``distance`` plies counts like running out of moves ``distance`` plies deeper.
+        """
+        result = self.tablebase.probe(game_state)
+        if result is None:
+            return None
+        self.search_stats['tablebase_hits'] += 1
+        wins, distance = result
+        score = self.WIN_BASE_SCORE + depth - distance
+        return score if wins else -score
+
+    def _threat_score(self, game_state, piece):
+        """Score for the side to move if it wins by a forced sequence of threats, or None.
+
+        On the scale of the game's own win score, minus the plies until the win.
+        """
+        result = self.threat_search.solve(game_state, piece)
+        if result is None:
+            return None
+        self.search_stats['threat_wins'] += 1
+        return game_state.win_score - result[0]
+
+    def _null_move_allowed(self, game_state, piece, possible_moves):
+        """Null move only without pending captures and with enough pieces, where zugzwang is unlikely."""
+        if self._in_null_move or not hasattr(game_state, 'piece_count'):
+            return False
+        if captured_count(possible_moves[0]):
+            return False
+        return game_state.piece_count(piece) >= NULL_MOVE_MIN_PIECES
+
+    @staticmethod
+    def _bound_flag(score, alpha, beta):
+        if score <= alpha:
+            return UPPER_BOUND
+        if score >= beta:
+            return LOWER_BOUND
+        return EXACT
+
+    def _static_score(self, game_state, is_ai_turn):
+        if self.search_mode == "pvs":
+            return self._leaf_score(game_state, is_ai_turn)
+        score = game_state.evaluate_board(self.ai_player_piece)
+        return score if is_ai_turn else -score
+
+    def _quiescence(self, game_state, is_ai_turn, alpha, beta):
+        """Resolves pending captures below the horizon; scores are from the side to move (negamax).
+
+        Only captures are searched. A side without a capture stands pat with the static evaluation;
+        a side that has one must take it (captures are compulsory), so it gets no stand-pat there.
+        """
+        self.nodes_searched += 1
+        if self.nodes_searched % BUDGET_CHECK_INTERVAL == 0:
+            self._check_budget()
+        if game_state.is_game_over():
+            return self._static_score(game_state, is_ai_turn)
+        piece = self._get_current_turn_piece(game_state, is_ai_turn)
+        captures = game_state.get_capture_moves(piece)
+        if not captures:
+            return self._static_score(game_state, is_ai_turn)
+        if len(captures) > 1:
+            # Mehr geschlagene Steine zuerst; sortierte Kopie, die Liste ist im Zug-Cache des Spiels
+            captures = sorted(captures, key=lambda move: -len(move[3]))
+
+        best_score = -float('inf')
+        for move in captures:
+            game_state.make_move(move, piece)
+            try:
+                score = -self._quiescence(game_state, not is_ai_turn, -beta, -alpha)
+            finally:
+                game_state.undo_move()
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+        return best_score
+
+    def _leaf_score(self, game_state, is_ai_turn):
+        """Static evaluation from the side to move; wins/losses (±inf in Dame) become finite for null windows."""
+        score = game_state.evaluate_board(self.ai_player_piece)
+        if score == float('inf'):
+            score = self.MAX_SCORE
+        elif score == -float('inf'):
+            score = -self.MAX_SCORE
+        return score if is_ai_turn else -score
+
+    def _negamax(self, game_state, depth, is_ai_turn, alpha, beta, ply):
+        """Principal variation search in negamax form; scores are from the side to move.
+
+        The first move of a node is searched with the full window, all later moves with a null
+        window ``(alpha, alpha + 1)`` and only re-searched when they fail high inside the window.
+        """
+        self.nodes_searched += 1
+        if self.nodes_searched % BUDGET_CHECK_INTERVAL == 0:
+            self._check_budget()
+        if self.tablebase is not None:
+            score = self._tablebase_score(game_state, depth)
+            if score is not None:
+                return score
+        tt = self.transposition_table
+        key = self._position_key(game_state, is_ai_turn)
+        entry = tt.probe(key) if tt is not None else None
+        if entry is not None and entry[1] >= depth:
+            entry_flag, entry_score = entry[2], entry[3]
+            if entry_flag == EXACT:
+                return entry_score
+            if entry_flag == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            elif entry_flag == UPPER_BOUND:
+                beta = min(beta, entry_score)
+            if beta <= alpha:
+                return entry_score
+
+        if depth == 0 and self._wants_quiescence(game_state):
+            score = self._quiescence(game_state, is_ai_turn, alpha, beta)
+            if tt is not None:
+                tt.store(key, 0, self._bound_flag(score, alpha, beta), score, None)
+            return score
+
+        if depth == 0 or game_state.is_game_over():
+            score = self._leaf_score(game_state, is_ai_turn)
+            if tt is not None:
+                tt.store(key, depth, EXACT, score, None)
+            return score
+
+        piece = self._get_current_turn_piece(game_state, is_ai_turn)
+        if piece is None:
+            return 0
+        if self.threat_search is not None and depth >= THREAT_CHECK_MIN_DEPTH:
+            score = self._threat_score(game_state, piece)
+            if score is not None:
+                if tt is not None:
+                    tt.store(key, depth, EXACT, score, None)
+                return score
+        possible_moves = self._get_moves(game_state, piece)
+        if not possible_moves:
+            return -self.WIN_BASE_SCORE - depth
+        if depth == 1 and self._batch_leaves:
+            score, best_move = self._batch_last_ply(game_state, piece, possible_moves, is_ai_turn)
+            if tt is not None:
+                tt.store(key, depth, EXACT, score, self._table_move(game_state, best_move))
+            return score
+
+        is_pv_node = beta - alpha > 1
+        stats = self.search_stats
+        quiet_node = not captured_count(possible_moves[0])
+
+        if (self.use_null_move and not is_pv_node and depth >= NULL_MOVE_MIN_DEPTH
+                and abs(beta) < self.WIN_BASE_SCORE and self._null_move_allowed(game_state, piece, possible_moves)
+                and self._leaf_score(game_state, is_ai_turn) >= beta):
+            # Zug aussetzen: hält die Stellung selbst dann noch beta, ist sie gut genug für einen Cutoff
+            stats['null_move_tries'] += 1
+            self._in_null_move = True
+            game_state.switch_player()
+            try:
+                null_score = -self._negamax(game_state, depth - 1 - NULL_MOVE_REDUCTION, not is_ai_turn,
+                                            -beta, -beta + 1, ply + 1)
+            finally:
+                game_state.switch_player()
+                self._in_null_move = False
+            if null_score >= beta:
+                stats['null_move_cutoffs'] += 1
+                return beta
+
+        futility_score = None
+        if (self.use_futility and depth == 1 and not is_pv_node and quiet_node
+                and abs(alpha) < self.WIN_BASE_SCORE):
+            static_score = self._leaf_score(game_state, is_ai_turn)
+            if static_score + FUTILITY_MARGIN <= alpha:
+                futility_score = static_score + FUTILITY_MARGIN
+
+        tt_move = self._board_move(game_state, entry[4]) if entry is not None else None
+        move_ordering = self.move_ordering
+        if move_ordering is not None:
+            possible_moves = move_ordering.order(possible_moves, piece, ply, tt_move)
+        elif tt_move is not None and tt_move in possible_moves:
+            possible_moves = [tt_move] + [m for m in possible_moves if m != tt_move]
+
+        alpha_original = alpha
+        best_eval = -float('inf')
+        best_move = None
+        for index, move in enumerate(possible_moves):
+            game_state.make_move(move, piece)
+            try:
+                if futility_score is not None and index > 0 and not game_state.is_game_over():
+                    # Ruhiger Zug kurz vor dem Horizont, der alpha auch mit Marge nicht erreicht
+                    stats['futility_prunes'] += 1
+                    evaluation = futility_score
+                # Volles Fenster für den ersten Zug und solange alle bisherigen Züge verlieren
+                elif index == 0 or alpha <= -self.MAX_SCORE:
+                    evaluation = -self._negamax(game_state, depth - 1, not is_ai_turn, -beta, -alpha, ply + 1)
+                else:
+                    reduction = 0
+                    if (self.use_lmr and quiet_node and index >= LMR_FULL_DEPTH_MOVES and depth >= LMR_MIN_DEPTH
+                            and move != tt_move):
+                        reduction = 1
+                        stats['lmr_reductions'] += 1
+                        evaluation = -self._negamax(game_state, depth - 1 - reduction, not is_ai_turn,
+                                                    -alpha - 1, -alpha, ply + 1)
+                        if evaluation > alpha:
+                            stats['lmr_researches'] += 1
+                            reduction = 0
+                    if not reduction:
+                        evaluation = -self._negamax(game_state, depth - 1, not is_ai_turn, -alpha - 1, -alpha, ply + 1)
+                    # Blattwerte sind exakt (ohne Quiescence), dort ist keine zweite Suche nötig
+                    if (depth > 1 or not self._exact_leaves) and alpha < evaluation < beta:
+                        evaluation = -self._negamax(game_state, depth - 1, not is_ai_turn, -beta, -alpha, ply + 1)
+            finally:
+                game_state.undo_move()
+            if evaluation > best_eval:
+                best_eval = evaluation
+                best_move = move
+            if evaluation > alpha:
+                alpha = evaluation
+            if alpha >= beta:
+                if move_ordering is not None:
+                    move_ordering.record_cutoff(move, piece, ply, depth)
+                break
+
+        if tt is not None:
+            if best_eval <= alpha_original:
+                flag = UPPER_BOUND
+            elif best_eval >= beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            tt.store(key, depth, flag, best_eval, self._table_move(game_state, best_move))
+        return best_eval
 
     def _sort_moves(self, moves, game_state, player_mark):
         # Nur für TicTacToe sinnvoll
@@ -117,4 +829,4 @@ class Minimax:
                         if game_state.board[nr][nc] != '':
                             neighbors += 1
             return -neighbors
-        return sorted(moves, key=move_score)
\ No newline at end of file
+        return sorted(moves, key=move_score)
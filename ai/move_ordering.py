@@ -0,0 +1,79 @@
+# Sortierstufen: Tabellenzug vor Schlagzügen vor Killerzügen vor History-Werten
+TT_MOVE_SCORE = 1 << 40
+CAPTURE_SCORE = 1 << 32
+KILLER_SCORE = 1 << 28
+MAX_PLY = 64
+KILLERS_PER_PLY = 2
+
+
+def move_key(move):
+    """Hashable key of a move: ``(from, to)`` for Dame move lists, the cell itself for TicTacToe."""
+    if isinstance(move, list):
+        return move[1], move[2]
+    return move
+
+
+def captured_count(move):
+    """Number of pieces a Dame capture removes, 0 for every other move."""
+    if isinstance(move, list) and move[0] == "capture":
+        return len(move[3])
+    return 0
+
+
+class MoveOrdering:
+    """Move ordering for the alpha-beta search, shared by both games.
+
+    Moves are tried in this order: the transposition table move, captures by the number of
+    captured pieces, the killer moves of the current ply (quiet moves that caused a cutoff in
+    a sibling node) and finally all other moves by their history score. Moves with the same
+    score keep the order of the game's move generator.
+    """
+
+    def __init__(self):
+        self.killers = [[] for _ in range(MAX_PLY)]
+        # (Spielstein, Zugschlüssel) -> Summe von depth² aller Cutoffs
+        self.history = {}
+
+    def new_search(self):
+        """Called once per find_best_move: killers are reset, history values are halved."""
+        self.killers = [[] for _ in range(MAX_PLY)]
+        self.history = {key: value >> 1 for key, value in self.history.items() if value > 1}
+
+    def clear(self):
+        self.killers = [[] for _ in range(MAX_PLY)]
+        self.history = {}
+
+    def order(self, moves, player_piece, ply, tt_move=None):
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        history = self.history
+        scored = []
+        for index, move in enumerate(moves):
+            if tt_move is not None and move == tt_move:
+                score = TT_MOVE_SCORE
+            else:
+                captured = captured_count(move)
+                if captured:
+                    score = CAPTURE_SCORE * captured
+                else:
+                    key = move_key(move)
+                    if key in killers:
+                        score = KILLER_SCORE
+                    else:
+                        score = history.get((player_piece, key), 0)
+            # Index als zweiter Schlüssel: stabile Reihenfolge, Züge selbst werden nie verglichen
+            scored.append((-score, index, move))
+        scored.sort()
+        return [move for _, _, move in scored]
+
+    def record_cutoff(self, move, player_piece, ply, depth):
+        """Remembers a quiet move that caused a beta cutoff as killer and in the history table."""
+        if captured_count(move):
+            return
+        key = move_key(move)
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if key not in killers:
+                killers.insert(0, key)
+                del killers[KILLERS_PER_PLY:]
+        history_key = (player_piece, key)
+        self.history[history_key] = self.history.get(history_key, 0) + depth * depth
@@ -0,0 +1,196 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+
+# Dateikopf: Kennung und Anzahl Datensätze; danach die Datensätze nach Schlüssel sortiert
+BOOK_MAGIC = b"OBK1"
+HEADER = struct.Struct("<4sI")
+# Schlüssel, Startfeld (NO_SQUARE bei TicTacToe), Zielfeld, Anzahl geschlagener Steine, Suchtiefe
+RECORD = struct.Struct("<QBBBB")
+NO_SQUARE = 255
+BOOK_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books")
+BOOK_FILES = {"Dame": "dame.book", "TicTacToe": "tictactoe.book"}
+
+_OPEN_BOOKS = {}
+
+
+def position_key(game):
+    """Book key of a position: the symmetry-independent hash where the game has one, else the Zobrist hash."""
+    if hasattr(game, 'canonical_hash'):
+        return game.canonical_hash()
+    return game.zobrist_hash
+
+
+def encode_move(game, move):
+    """Returns ``(from, to, captured)`` as square indices; TicTacToe moves in canonical orientation."""
+    size = game.board_size
+    if isinstance(move, list):
+        (from_r, from_c), (to_r, to_c) = move[1], move[2]
+        captured = len(move[3]) if move[0] == "capture" else 0
+        return from_r * size + from_c, to_r * size + to_c, captured
+    if hasattr(game, 'canonical_symmetry'):
+        move = game.to_canonical_move(move, game.canonical_symmetry())
+    return NO_SQUARE, move[0] * size + move[1], 0
+
+
+def decode_move(game, from_square, to_square, captured, legal_moves):
+    """Returns the legal move matching a book record, or None."""
+    size = game.board_size
+    if from_square == NO_SQUARE:
+        move = (to_square // size, to_square % size)
+        if hasattr(game, 'canonical_symmetry'):
+            move = game.from_canonical_move(move, game.canonical_symmetry())
+        return move if move in legal_moves else None
+    origin = (from_square // size, from_square % size)
+    target = (to_square // size, to_square % size)
+    for move in legal_moves:
+        if move[1] == origin and move[2] == target and (len(move[3]) if move[0] == "capture" else 0) == captured:
+            return move
+    return None
+
+
+def write_book(path, records):
+    """Writes ``{key: (from, to, captured, depth)}`` as a sorted file of fixed-size records."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(BOOK_MAGIC, len(records)))
+        for key in sorted(records):
+            book_file.write(RECORD.pack(key, *records[key]))
+
+
+class OpeningBook:
+    """Read-only opening book, memory-mapped instead of loaded.
+
+    Opening the book only maps the file; a lookup is a binary search over the sorted
+    fixed-size records, so nothing is parsed at startup and a hit costs a few microseconds.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Leere Datei lässt sich nicht mappen
+            self._file.close()
+            raise ValueError(f"Empty opening book: {path}")
+        magic, count = HEADER.unpack_from(self._data, 0)
+        if magic != BOOK_MAGIC or HEADER.size + count * RECORD.size > len(self._data):
+            self.close()
+            raise ValueError(f"Not an opening book: {path}")
+        self.count = count
+        self.hits = 0
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, key):
+        """Returns ``(from, to, captured, depth)`` stored for ``key``, or None."""
+        data = self._data
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record = RECORD.unpack_from(data, HEADER.size + middle * RECORD.size)
+            if record[0] < key:
+                low = middle + 1
+            elif record[0] > key:
+                high = middle
+            else:
+                return record[1:]
+        return None
+
+    def probe(self, game, player_piece, min_depth=0):
+        """Returns the book move of ``player_piece`` in ``game`` if it was searched at least ``min_depth`` deep."""
+        record = self.lookup(position_key(game))
+        if record is None or record[3] < min_depth:
+            return None
+        if hasattr(game, 'get_all_possible_moves'):
+            legal_moves = game.get_all_possible_moves(player_piece)
+        else:
+            legal_moves = game.get_possible_moves(player_piece)
+        move = decode_move(game, record[0], record[1], record[2], legal_moves)
+        if move is not None:
+            self.hits += 1
+        return move
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+
+def get_opening_book(game_type, directory=BOOK_DIRECTORY):
+    """Returns the shared book of a game type ("Dame" or "TicTacToe"), or None if no book file exists."""
+    path = os.path.join(directory, BOOK_FILES[game_type])
+    if path not in _OPEN_BOOKS:
+        _OPEN_BOOKS[path] = OpeningBook(path) if os.path.exists(path) else None
+    return _OPEN_BOOKS[path]
+
+
+def build_book(game, plies, depth, progress=None):
+    """Searches every AI position of the first ``plies`` plies of ``game`` to ``depth``.
+
+    All human moves are expanded (TicTacToe: one per group of symmetric moves); at AI
+    positions only the book move is followed, because the AI will always play it.
+    Returns ``{key: (from, to, captured, depth)}`` for ``write_book``.
+    """
+    from ai.minimax import Minimax
+
+    engine = Minimax(game, max_depth=depth, search_mode="pvs")
+    is_dame = hasattr(game, 'get_all_possible_moves')
+    human_piece = game.human_player_piece if is_dame else game.human_player_mark
+    ai_piece = game.ai_player_piece if is_dame else game.ai_player_mark
+    records = {}
+    expanded = set()
+
+    def expand(ply):
+        key = position_key(game)
+        if ply >= plies or game.is_game_over() or key in expanded:
+            return
+        expanded.add(key)
+        if game.current_player == "ai":
+            engine.game_logic_instance = game
+            move = engine.find_best_move(ai_piece)
+            if move is None:
+                return
+            # Sofortiger Gewinnzug: completed_depth bleibt 0, der Zug ist aber in jeder Tiefe richtig
+            records[key] = encode_move(game, move) + (engine.completed_depth or depth,)
+            if progress is not None:
+                progress(len(records))
+            game.make_move(move, ai_piece)
+            expand(ply + 1)
+            game.undo_move()
+            return
+        moves = game.get_all_possible_moves(human_piece) if is_dame else game.get_possible_moves(human_piece)
+        if hasattr(game, 'unique_moves'):
+            moves = game.unique_moves(moves)
+        for move in list(moves):
+            game.make_move(move, human_piece)
+            expand(ply + 1)
+            game.undo_move()
+
+    expand(0)
+    return records
+
+
+if __name__ == "__main__":
+    from games.dame_bitboard import BitboardDame
+    from games.tic_tac_toe import TicTacToe
+
+    parser = argparse.ArgumentParser(description="Builds the opening book of a game.")
+    parser.add_argument("game", choices=sorted(BOOK_FILES))
+    parser.add_argument("--plies", type=int, default=6, help="book covers the AI moves of the first N plies")
+    parser.add_argument("--depth", type=int, default=12, help="search depth of every book move")
+    parser.add_argument("--output", default=None, help="book file (default: ai/books/<game>.book)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    new_game = BitboardDame() if args.game == "Dame" else TicTacToe()
+    book = build_book(new_game, args.plies, args.depth,
+                      progress=lambda count: print(f"\r{count} positions", end="", flush=True))
+    output = args.output or os.path.join(BOOK_DIRECTORY, BOOK_FILES[args.game])
+    write_book(output, book)
+    print(f"\n{len(book)} positions written to {output} in {time.perf_counter() - start:.1f} s")
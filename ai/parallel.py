@@ -0,0 +1,207 @@
+import atexit
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# Wartezeit zwischen zwei Prüfungen des stop_event, während die Worker rechnen
+STOP_POLL_SECONDS = 0.02
+
+_pool = None
+_pool_workers = 0
+_shared_alpha = None
+_shared_stop = None
+_search_counter = 0
+
+# Nur im Worker-Prozess gesetzt
+_worker_alpha = None
+_worker_stop = None
+_worker_engine = None
+_worker_engine_key = None
+_worker_game = None
+_worker_search_id = None
+
+# Antwort eines Workers, dessen Engine nicht zum Schlüssel der Aufgabe passt: die Aufgabe kommt mit Setup zurück
+_NEEDS_SETUP = "needs_setup"
+
+
+def _init_worker(shared_alpha, shared_stop):
+    global _worker_alpha, _worker_stop
+    _worker_alpha = shared_alpha
+    _worker_stop = shared_stop
+
+
+class _SharedStopEvent:
+    """Stop event of the worker processes, backed by the shared flag that the main process sets."""
+
+    @staticmethod
+    def is_set():
+        return bool(_worker_stop.value)
+
+
+def get_pool(workers=None):
+    """Returns the persistent process pool, (re)creating it if the worker count changed.
+
+    The pool uses the "spawn" start method so that it is safe to create from the Qt application.
+    """
+    global _pool, _pool_workers, _shared_alpha, _shared_stop
+    workers = workers or os.cpu_count() or 1
+    if _pool is not None and _pool_workers == workers:
+        return _pool
+    shutdown_pool()
+    context = multiprocessing.get_context("spawn")
+    _shared_alpha = context.Value('d', -float('inf'))
+    _shared_stop = context.Value('b', 0)
+    _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                initializer=_init_worker, initargs=(_shared_alpha, _shared_stop))
+    _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None
+    _pool_workers = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def _root_window_alpha(shared_alpha):
+    """Lower window bound for a root move, given the best exact score known so far.
+
+    The window starts just below the best score so that a move scoring *equal* to it still gets an
+    exact value; ties are then broken by move order exactly like in the serial search.
+    """
+    if shared_alpha == float('inf'):
+        return sys.float_info.max
+    return shared_alpha - 1
+
+
+def _engine_key(game_state, engine_options):
+    """Identifies the game variant and engine options of a search, so workers know when to rebuild their engine.
+
+    Solver objects (tablebase, threat search, ...) are compared by their identity in the main process.
+    """
+    options = tuple(sorted(
+        (name, value if value is None or isinstance(value, (bool, int, float, str)) else (type(value).__name__, id(value)))
+        for name, value in engine_options.items()))
+    return type(game_state).__name__, game_state.board_size, getattr(game_state, 'win_length', None), options
+
+
+def _search_root_move(task, setup=None):
+    """Searches one root move in a worker process.
+
+    ``task`` holds only the position (board and side to move); the engine options and a game of the
+    right variant come pickled in ``setup``, which the main process sends only after a ``_NEEDS_SETUP`` answer.
+    """
+    global _worker_engine, _worker_engine_key, _worker_game, _worker_search_id
+    from ai.minimax import Minimax, _SearchAborted
+
+    search_id, index, board, current_player, move, depth, ai_player_piece, engine_key, time_limit_ms, check_stop = task
+    if _worker_engine is None or _worker_engine_key != engine_key:
+        if setup is None:
+            return index, _NEEDS_SETUP, False, 0
+        # Anderes Spiel oder andere Optionen als die vorige Suche: Engine neu anlegen
+        engine_options, _worker_game = pickle.loads(setup)
+        _worker_engine = Minimax(_worker_game, **engine_options)
+        _worker_engine_key = engine_key
+    if _worker_search_id != search_id:
+        # Neue Wurzelsuche: Tabelle leeren, damit das Ergebnis dem seriellen Suchlauf entspricht
+        if _worker_engine.transposition_table is not None:
+            _worker_engine.transposition_table.clear()
+        _worker_search_id = search_id
+
+    game_state = _worker_game
+    game_state.set_position(board, current_player)
+    engine = _worker_engine
+    engine.game_logic_instance = game_state
+    alpha = _root_window_alpha(_worker_alpha.value)
+    try:
+        score = engine.search_root_move(game_state, move, depth, ai_player_piece, alpha, time_limit_ms,
+                                        _SharedStopEvent() if check_stop else None)
+    except _SearchAborted:
+        return index, None, True, engine.nodes_searched
+
+    if score <= alpha:
+        # Nur eine obere Schranke: kann den besten Zug nicht mehr schlagen
+        return index, None, False, engine.nodes_searched
+    with _worker_alpha.get_lock():
+        if score > _worker_alpha.value:
+            _worker_alpha.value = score
+    return index, score, False, engine.nodes_searched
+
+
+def search_root_parallel(engine, search_state, root_moves, depth, time_limit_ms=None, stop_event=None):
+    """Searches the root moves of ``engine`` in the persistent process pool.
+
+    Returns ``(best_move, best_score)`` with the same tie-breaking as the serial search, or raises
+    ``_SearchAborted`` if any worker ran out of time or ``stop_event`` was set. A set stop event
+    cancels the moves that have not started and stops the running workers through a shared flag.
+
+    Each task carries only the board and the side to move. The engine options and the game object
+    are pickled once per search and sent only to workers whose engine does not match them yet
+    (after a ``_NEEDS_SETUP`` answer).
+    """
+    global _search_counter
+    from ai.minimax import _SearchAborted
+
+    pool = get_pool(engine.parallel_workers)
+    with _shared_alpha.get_lock():
+        _shared_alpha.value = -float('inf')
+    _shared_stop.value = 0
+    _search_counter += 1
+    engine_options = engine.worker_options()
+    engine_key = _engine_key(search_state, engine_options)
+    setup = None
+    board = [row[:] for row in search_state.board]
+    tasks = [(_search_counter, index, board, search_state.current_player, move, depth, engine.ai_player_piece,
+              engine_key, time_limit_ms, stop_event is not None)
+             for index, move in enumerate(root_moves)]
+    pending = {pool.submit(_search_root_move, task) for task in tasks}
+
+    stopped = False
+    results = []
+    while pending:
+        done, pending = wait(pending, timeout=STOP_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.cancelled():
+                continue
+            result = future.result()
+            if result[1] == _NEEDS_SETUP:
+                if setup is None:
+                    # Einmal pro Suche serialisieren, danach wird nur noch die fertige Bytefolge verschickt
+                    setup = pickle.dumps((engine_options, search_state), pickle.HIGHEST_PROTOCOL)
+                pending.add(pool.submit(_search_root_move, tasks[result[0]], setup))
+            else:
+                results.append(result)
+        if pending and stop_event is not None and stop_event.is_set():
+            _shared_stop.value = 1
+            for future in pending:
+                future.cancel()
+            stopped = True
+            # Laufende Worker brechen über das gemeinsame Flag ab; warten, damit der Pool frei ist
+            done, _ = wait(pending)
+            results.extend(result for result in (future.result() for future in done if not future.cancelled())
+                           if result[1] != _NEEDS_SETUP)
+            break
+
+    best_index = None
+    best_score = -float('inf')
+    aborted = stopped
+    for index, score, was_aborted, nodes in results:
+        engine.nodes_searched += nodes
+        aborted = aborted or was_aborted
+        if score is None:
+            continue
+        if best_index is None or score > best_score or (score == best_score and index < best_index):
+            best_score = score
+            best_index = index
+    if aborted:
+        raise _SearchAborted()
+    if best_index is None:
+        return root_moves[0], best_score
+    return root_moves[best_index], best_score
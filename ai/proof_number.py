@@ -0,0 +1,159 @@
+import time
+
+INFINITY = 10 ** 9
+DEFAULT_MAX_NODES = 20000
+# Größe des Knotenspeichers (Einträge); beim Überlauf werden zuerst die ungelösten Stellungen verworfen
+DEFAULT_MAX_ENTRIES = 200000
+# Vorprüfung nur mit höchstens so vielen Steinen auf dem Brett
+DEFAULT_MAX_PIECES = 10
+
+PROVEN = (0, INFINITY)
+DISPROVEN = (INFINITY, 0)
+UNKNOWN = (1, 1)
+
+
+class _BudgetExhausted(Exception):
+    """Raised inside the search when the node or time budget is used up or the stop event is set."""
+
+
+class ProofNumberSearch:
+    """Depth-first proof-number search (df-pn) that proves or disproves a forced win in Dame.
+
+    Every position has a proof number (how many positions still have to be won to prove the win)
+    and a disproof number (the same for refuting it). The search always expands the most-proving
+    position and gives each child thresholds derived from its siblings, so it needs no explicit
+    tree: ``(pn, dn)`` of the visited positions live in a node store keyed by Zobrist hash that
+    holds at most ``max_entries`` positions. Dame has no repetitions and no draws, so a disproof
+    is a proof that the other side wins.
+
+    The store is kept between calls: the next move of a proven game is usually proven already.
+    """
+
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES, max_entries=DEFAULT_MAX_ENTRIES, max_pieces=DEFAULT_MAX_PIECES):
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.max_pieces = max_pieces
+        self.nodes_searched = 0
+        # Je Angreifer ein eigener Speicher: dieselbe Stellung hat für beide Seiten andere Zahlen
+        self._stores = {}
+        self._store = None
+        self._attacker = None
+        self._win_status = None
+        self._node_limit = None
+        self._stop_event = None
+        self._deadline = None
+
+    def applies(self, game):
+        """True for Dame positions with at most ``max_pieces`` pieces."""
+        if not hasattr(game, 'piece_count'):
+            return False
+        return game.piece_count(game.human_player_piece) + game.piece_count(game.ai_player_piece) <= self.max_pieces
+
+    def prove(self, game, attacker, max_nodes=None, stop_event=None, deadline=None):
+        """Returns True if ``attacker`` (to move) wins by force, False if it loses, None if the budget ran out.
+
+        Setting ``stop_event`` from another thread, or passing the time ``deadline`` (a
+        ``time.perf_counter()`` value), ends the search like an exhausted budget.
+        """
+        self._stop_event = stop_event
+        self._deadline = deadline
+        self._store = self._stores.setdefault(attacker, {})
+        self._attacker = attacker
+        self._win_status = "ai_wins" if attacker == game.ai_player_piece else "human_wins"
+        self._node_limit = self.nodes_searched + (self.max_nodes if max_nodes is None else max_nodes)
+        try:
+            pn, dn = self._search(game, INFINITY, INFINITY)
+        except _BudgetExhausted:
+            return None
+        finally:
+            self._stop_event = None
+            self._deadline = None
+        if pn == 0:
+            return True
+        if dn == 0:
+            return False
+        return None
+
+    def winning_move(self, game, attacker, max_nodes=None, stop_event=None, deadline=None):
+        """Returns a move that keeps a proven win for ``attacker``, or None if no win was proven."""
+        if not self.prove(game, attacker, max_nodes, stop_event, deadline):
+            return None
+        for move in list(game.get_all_possible_moves(attacker)):
+            game.make_move(move, attacker)
+            try:
+                numbers = self._numbers(game)
+            finally:
+                game.undo_move()
+            if numbers[0] == 0:
+                return move
+        return None
+
+    def _numbers(self, game):
+        status = game.check_win_condition()
+        if status is not None:
+            return PROVEN if status == self._win_status else DISPROVEN
+        return self._store.get(game.zobrist_hash, UNKNOWN)
+
+    def _save(self, key, numbers):
+        store = self._store
+        if len(store) >= self.max_entries and key not in store:
+            # Bewiesene Stellungen behalten, ungelöste sind beim nächsten Besuch schnell neu berechnet
+            solved = {k: v for k, v in store.items() if v[0] == 0 or v[1] == 0}
+            if len(solved) >= self.max_entries // 2:
+                solved = {}
+            store.clear()
+            store.update(solved)
+        store[key] = numbers
+
+    def _search(self, game, proof_threshold, disproof_threshold):
+        self.nodes_searched += 1
+        if self.nodes_searched > self._node_limit:
+            raise _BudgetExhausted()
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise _BudgetExhausted()
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _BudgetExhausted()
+        piece = game.current_player_piece
+        or_node = piece == self._attacker
+        children = []
+        for move in list(game.get_all_possible_moves(piece)):
+            game.make_move(move, piece)
+            status = game.check_win_condition()
+            if status is None:
+                children.append((move, game.zobrist_hash, None))
+            else:
+                children.append((move, None, PROVEN if status == self._win_status else DISPROVEN))
+            game.undo_move()
+
+        while True:
+            numbers = [terminal if terminal is not None else self._store.get(key, UNKNOWN)
+                       for _, key, terminal in children]
+            # ODER-Knoten: ein bewiesener Zug genügt; UND-Knoten: alle Antworten müssen verlieren
+            if or_node:
+                pn = min(n[0] for n in numbers)
+                dn = min(INFINITY, sum(n[1] for n in numbers))
+            else:
+                pn = min(INFINITY, sum(n[0] for n in numbers))
+                dn = min(n[1] for n in numbers)
+            if pn >= proof_threshold or dn >= disproof_threshold or pn == 0 or dn == 0:
+                break
+
+            index = 0 if or_node else 1
+            order = sorted(range(len(numbers)), key=lambda i: numbers[i][index])
+            best = order[0]
+            second = numbers[order[1]][index] if len(order) > 1 else INFINITY
+            best_pn, best_dn = numbers[best]
+            if or_node:
+                child_pn = min(proof_threshold, second + 1)
+                child_dn = min(INFINITY, disproof_threshold - dn + best_dn)
+            else:
+                child_pn = min(INFINITY, proof_threshold - pn + best_pn)
+                child_dn = min(disproof_threshold, second + 1)
+            move = children[best][0]
+            game.make_move(move, piece)
+            try:
+                self._search(game, child_pn, child_dn)
+            finally:
+                game.undo_move()
+        self._save(game.zobrist_hash, (pn, dn))
+        return pn, dn
@@ -0,0 +1,260 @@
+import argparse
+import itertools
+import mmap
+import os
+import sys
+import time
+
+from games.dame_bitboard import BitboardDame
+
+# Dateikopf: Kennung, Brettgröße, höchste Steinzahl je Seite; danach ein Byte je Stellung
+TABLEBASE_MAGIC = b"DTB1"
+HEADER_SIZE = 8
+TABLEBASE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books")
+DEFAULT_MAX_PIECES = 3
+
+# Byte-Kodierung aus Sicht der Seite am Zug: 0 = nicht gelöst, 2*d + 1 = Gewinn in d Halbzügen, 2*d + 2 = Verlust
+UNSOLVED = 0
+
+
+def encode_result(wins, distance):
+    return 2 * distance + (1 if wins else 2)
+
+
+def decode_result(value):
+    """Returns ``(wins, distance)`` for a stored byte; ``distance`` counts plies until the game is over."""
+    return bool(value & 1), (value - 1) // 2
+
+
+class DameTablebase:
+    """Win/loss and distance for every Dame position with at most ``max_pieces`` men per side.
+
+    Men only move forward, so no position can repeat and the positions form a DAG: every
+    position is solved from its successors (memoized depth-first), which is the retrograde
+    analysis of this game without the unmove generator. Draws cannot occur.
+
+    The index of a position is ``(human_code * ai_count + ai_code) * 2 + ai_to_move``, where the
+    codes number all sets of up to ``max_pieces`` squares a side can stand on without having
+    already won. Index pairs whose sets overlap are never used and stay ``UNSOLVED``.
+    """
+
+    def __init__(self, board_size=6, max_pieces=DEFAULT_MAX_PIECES, data=None):
+        self.board_size = board_size
+        self.max_pieces = max_pieces
+        self._game = BitboardDame(board_size)
+        geometry = self._game.geometry
+        dark = [r * board_size + c for r in range(board_size) for c in range(board_size) if (r + c) % 2 == 0]
+        # Ein Stein auf der gegnerischen Grundreihe hat schon gewonnen, diese Felder kommen nicht vor
+        self._human_codes = self._number_sets([i for i in dark if not geometry.last_row_mask >> i & 1])
+        self._ai_codes = self._number_sets([i for i in dark if not geometry.first_row_mask >> i & 1])
+        self.size = len(self._human_codes) * len(self._ai_codes) * 2
+        self.data = data if data is not None else bytearray(self.size)
+        self.hits = 0
+        self.path = None
+        self._mmap_file = None
+
+    def __reduce__(self):
+        # Für die Prozesse der parallelen Suche: eine geladene Tabelle wird dort neu gemappt, nicht kopiert
+        if self.path is not None:
+            return _load_shared, (self.path,)
+        return DameTablebase, (self.board_size, self.max_pieces, bytes(self.data))
+
+    def _number_sets(self, squares):
+        codes = {}
+        for count in range(1, self.max_pieces + 1):
+            for combination in itertools.combinations(squares, count):
+                codes[sum(1 << i for i in combination)] = len(codes)
+        return codes
+
+    def index(self, human_bits, ai_bits, ai_to_move):
+        """Index of a position, or None if it is not covered (too many pieces, or already decided)."""
+        human_code = self._human_codes.get(human_bits)
+        ai_code = self._ai_codes.get(ai_bits)
+        if human_code is None or ai_code is None:
+            return None
+        return (human_code * len(self._ai_codes) + ai_code) * 2 + ai_to_move
+
+    def generate(self, progress=None):
+        """Solves every position of the table."""
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+        ai_count = len(self._ai_codes)
+        for human_bits, human_code in self._human_codes.items():
+            for ai_bits, ai_code in self._ai_codes.items():
+                if human_bits & ai_bits:
+                    continue
+                for ai_to_move in (0, 1):
+                    self._solve(human_bits, ai_bits, ai_to_move)
+            if progress is not None:
+                progress((human_code + 1) * ai_count * 2, self.size)
+
+    def _solve(self, human_bits, ai_bits, ai_to_move):
+        index = self.index(human_bits, ai_bits, ai_to_move)
+        value = self.data[index]
+        if value != UNSOLVED:
+            return value
+        game = self._game
+        geometry = game.geometry
+        n = self.board_size
+        game.human_bits, game.ai_bits = human_bits, ai_bits
+        if ai_to_move:
+            own, opp, goal_mask = ai_bits, human_bits, geometry.first_row_mask
+            moves = game._generate_moves(own, opp, -1)
+        else:
+            own, opp, goal_mask = human_bits, ai_bits, geometry.last_row_mask
+            moves = game._generate_moves(own, opp, 1)
+
+        best_win = None
+        longest_loss = 0
+        for move in moves:
+            (from_r, from_c), (to_r, to_c) = move[1], move[2]
+            to_bit = 1 << (to_r * n + to_c)
+            new_own = own ^ (1 << (from_r * n + from_c)) ^ to_bit
+            new_opp = opp
+            if move[0] == "capture":
+                for cap_r, cap_c in move[3]:
+                    new_opp &= ~(1 << (cap_r * n + cap_c))
+            if to_bit & goal_mask or not new_opp:
+                # Grundreihe erreicht oder letzten Stein geschlagen: Gewinn mit diesem Zug
+                best_win = 1
+                break
+            if ai_to_move:
+                child = self._solve(new_opp, new_own, 0)
+            else:
+                child = self._solve(new_own, new_opp, 1)
+            child_wins, child_distance = decode_result(child)
+            if not child_wins:
+                if best_win is None or child_distance + 1 < best_win:
+                    best_win = child_distance + 1
+            elif best_win is None:
+                longest_loss = max(longest_loss, child_distance + 1)
+        # Ohne Zug verliert die Seite am Zug sofort (longest_loss bleibt 0)
+        value = encode_result(True, best_win) if best_win is not None else encode_result(False, longest_loss)
+        self.data[index] = value
+        return value
+
+    def probe_bits(self, human_bits, ai_bits, ai_to_move):
+        """Returns ``(wins, distance)`` for the side to move, or None if the position is not in the table."""
+        index = self.index(human_bits, ai_bits, ai_to_move)
+        if index is None:
+            return None
+        value = self.data[index]
+        if value == UNSOLVED:
+            return None
+        self.hits += 1
+        return decode_result(value)
+
+    def probe(self, game):
+        """Returns ``(wins, distance)`` for the side to move in ``game``, or None."""
+        if game.board_size != self.board_size:
+            return None
+        human_bits = getattr(game, 'human_bits', None)
+        if human_bits is None:
+            if len(game.human_pieces) > self.max_pieces or len(game.ai_pieces) > self.max_pieces:
+                return None
+            human_bits = sum(1 << (r * self.board_size + c) for r, c in game.human_pieces)
+            ai_bits = sum(1 << (r * self.board_size + c) for r, c in game.ai_pieces)
+        else:
+            ai_bits = game.ai_bits
+        # Wird in jedem Suchknoten aufgerufen: die meisten Stellungen scheitern schon hier
+        human_code = self._human_codes.get(human_bits)
+        if human_code is None:
+            return None
+        ai_code = self._ai_codes.get(ai_bits)
+        if ai_code is None:
+            return None
+        value = self.data[(human_code * len(self._ai_codes) + ai_code) * 2 + (game.current_player == "ai")]
+        if value == UNSOLVED:
+            return None
+        self.hits += 1
+        return decode_result(value)
+
+    def best_move(self, game, player_piece):
+        """Returns the move that wins fastest (or loses slowest) according to the table, or None."""
+        if self.probe(game) is None:
+            return None
+        best_move = None
+        best_rank = None
+        for move in list(game.get_all_possible_moves(player_piece)):
+            game.make_move(move, player_piece)
+            try:
+                if game.check_win_condition() is not None:
+                    # Der Zug beendet das Spiel; verlieren kann man mit dem eigenen Zug nicht
+                    return move
+                result = self.probe(game)
+            finally:
+                game.undo_move()
+            if result is None:
+                return None
+            opponent_wins, distance = result
+            # Gegner verliert: schnellster Gewinn zuerst; sonst die längste Verteidigung
+            rank = (0, distance) if not opponent_wins else (1, -distance)
+            if best_rank is None or rank < best_rank:
+                best_move, best_rank = move, rank
+        return best_move
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as table_file:
+            table_file.write(TABLEBASE_MAGIC + bytes([self.board_size, self.max_pieces, 0, 0]))
+            table_file.write(self.data)
+
+    @classmethod
+    def load(cls, path):
+        """Maps a saved table into memory; nothing is read until a position is probed."""
+        table_file = open(path, "rb")
+        data = view = None
+        try:
+            data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if data[:4] != TABLEBASE_MAGIC:
+                raise ValueError(f"Not a Dame tablebase: {path}")
+            view = memoryview(data)[HEADER_SIZE:]
+            table = cls(data[4], data[5], data=view)
+            if len(table.data) != table.size:
+                raise ValueError(f"Truncated Dame tablebase: {path}")
+        except Exception:
+            # Die Sicht zuerst freigeben, sonst lässt sich die Abbildung nicht schließen
+            if view is not None:
+                view.release()
+            if data is not None:
+                data.close()
+            table_file.close()
+            raise
+        table.path = path
+        table._mmap_file = table_file
+        return table
+
+
+def tablebase_path(board_size=6, max_pieces=DEFAULT_MAX_PIECES, directory=TABLEBASE_DIRECTORY):
+    return os.path.join(directory, f"dame{board_size}_{max_pieces}.tb")
+
+
+_LOADED = {}
+
+
+def get_tablebase(board_size=6, max_pieces=DEFAULT_MAX_PIECES):
+    """Returns the shared tablebase for the board size, or None if the file was not generated."""
+    path = tablebase_path(board_size, max_pieces)
+    return _load_shared(path) if os.path.exists(path) else None
+
+
+def _load_shared(path):
+    if path not in _LOADED:
+        _LOADED[path] = DameTablebase.load(path)
+    return _LOADED[path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates the Dame endgame tablebase.")
+    parser.add_argument("--board-size", type=int, default=6)
+    parser.add_argument("--max-pieces", type=int, default=DEFAULT_MAX_PIECES, help="men per side")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = DameTablebase(args.board_size, args.max_pieces)
+    table.generate(progress=lambda done, total: print(f"\r{100 * done // total}%", end="", flush=True))
+    output = args.output or tablebase_path(args.board_size, args.max_pieces)
+    table.save(output)
+    print(f"\n{table.size} positions written to {output} in {time.perf_counter() - start:.1f} s")
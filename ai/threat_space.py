@@ -0,0 +1,133 @@
+import time
+
+DEFAULT_MAX_DEPTH = 8
+# Gespeicherte Fehlschläge je Suche, danach wird die Tabelle geleert
+MAX_FAILED_POSITIONS = 100000
+
+
+class _SearchStopped(Exception):
+    """Raised inside the search when the stop event is set or the deadline passed; nothing is stored as failed."""
+
+
+def _window_cells(window_masks, own_counts, opp_counts, empty, marks):
+    """Bit set of the empty cells in all windows with ``marks`` own and no opponent marks."""
+    cells = 0
+    for mask, own, opp in zip(window_masks, own_counts, opp_counts):
+        if own == marks and not opp:
+            cells |= mask & empty
+    return cells
+
+
+class ThreatSpaceSearch:
+    """Threat-space solver for TicTacToe (victory by continuous fours, VCF).
+
+    Only threat-creating moves are searched for the attacker: moves that leave a window with all
+    but one cell own marks and that cell empty (a "four" in 4 in a row). The defender has exactly one answer to a
+    four, blocking the empty cell, so the defender is not branched at all. A move that creates two
+    fours at once (a double threat) wins. If the defender has a four of its own, the attacker must
+    block it and may only go on if the blocking move is a four too.
+
+    The search reads the window counters that ``TicTacToe`` keeps for ``evaluate_board``, so a
+    node costs one pass over the windows. Wins found are sound; threats by three (VCT) are not
+    searched, because their defence is not a single forced move.
+    """
+
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH):
+        # Höchstzahl eigener Drohzüge in einer Gewinnfolge
+        self.max_depth = max_depth
+        self.nodes_searched = 0
+        self._failed = {}
+        self._stop_event = None
+        self._deadline = None
+
+    @staticmethod
+    def supports(game):
+        return hasattr(game, 'window_counts')
+
+    def solve(self, game, attacker, max_depth=None, stop_event=None, deadline=None):
+        """Returns ``(plies, line)`` of a forced win for ``attacker`` (to move in ``game``), or None.
+
+        ``line`` alternates attacker threats and the forced defender blocks and ends with the move
+        that wins or creates a double threat; ``plies`` counts the moves until the game is won.
+        Setting ``stop_event`` from another thread, or passing ``deadline`` (a ``time.perf_counter()``
+        value), ends the search with None.
+        """
+        if not self.supports(game):
+            return None
+        if len(self._failed) > MAX_FAILED_POSITIONS:
+            self._failed.clear()
+        defender = game.human_player_mark if attacker == game.ai_player_mark else game.ai_player_mark
+        self._stop_event = stop_event
+        self._deadline = deadline
+        try:
+            return self._search(game, attacker, defender, self.max_depth if max_depth is None else max_depth)
+        except _SearchStopped:
+            return None
+        finally:
+            self._stop_event = None
+            self._deadline = None
+
+    def _search(self, game, attacker, defender, depth):
+        """Returns ``(plies, line)`` of a forced win for ``attacker``, or None."""
+        self.nodes_searched += 1
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise _SearchStopped()
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _SearchStopped()
+        size = game.board_size
+        threat = game.win_length - 1
+        masks = game.window_masks
+        own_counts = game.window_counts[attacker]
+        opp_counts = game.window_counts[defender]
+        empty = game.full_mask & ~(game.mark_bits[attacker] | game.mark_bits[defender])
+
+        wins = _window_cells(masks, own_counts, opp_counts, empty, threat)
+        if wins:
+            index = (wins & -wins).bit_length() - 1
+            return 1, [(index // size, index % size)]
+        if depth <= 0:
+            return None
+        key = (game.zobrist_hash, attacker)
+        if self._failed.get(key, -1) >= depth:
+            return None
+
+        forced = _window_cells(masks, opp_counts, own_counts, empty, threat)
+        if forced & (forced - 1):
+            # Zwei Drohungen des Gegners lassen sich nicht mit einem Zug abwehren
+            self._failed[key] = depth
+            return None
+
+        # Felder, die ein Fenster mit win_length - 2 eigenen Steinen zu einem Vierer machen; Doppeldrohungen zuerst
+        candidates = {}
+        for mask, own, opp in zip(masks, own_counts, opp_counts):
+            if own == threat - 1 and not opp:
+                cells = mask & empty
+                while cells:
+                    low = cells & -cells
+                    candidates[low] = candidates.get(low, 0) + 1
+                    cells ^= low
+        if forced:
+            candidates = {forced: candidates[forced]} if forced in candidates else {}
+
+        for cell in sorted(candidates, key=lambda bit: -candidates[bit]):
+            index = cell.bit_length() - 1
+            move = (index // size, index % size)
+            game.make_move(move, attacker)
+            try:
+                threats = _window_cells(masks, own_counts, opp_counts, empty & ~cell, threat)
+                if threats & (threats - 1):
+                    # Doppeldrohung: der Gegner blockt eine, die andere gewinnt
+                    return 3, [move]
+                block_index = threats.bit_length() - 1
+                block = (block_index // size, block_index % size)
+                game.make_move(block, defender)
+                try:
+                    result = self._search(game, attacker, defender, depth - 1)
+                finally:
+                    game.undo_move()
+                if result is not None:
+                    return result[0] + 2, [move, block] + result[1]
+            finally:
+                game.undo_move()
+        self._failed[key] = depth
+        return None
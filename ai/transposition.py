@@ -0,0 +1,58 @@
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+    """Fixed-size hash table of previously searched positions.
+
+    Every slot holds one entry ``(key, depth, flag, score, best_move, generation)``.
+    The slot of a position is chosen by its Zobrist key, so the table never grows beyond
+    the capacity derived from ``max_size_mb``. When two positions compete for a slot the
+    deeper search wins, unless the stored entry is left over from an older search.
+    """
+
+    DEFAULT_SIZE_MB = 16
+    # Grobe Schätzung: Slot-Referenz + Tupel + Zahlen + Zug
+    ENTRY_SIZE_BYTES = 160
+
+    def __init__(self, max_size_mb=DEFAULT_SIZE_MB, max_entries=None):
+        if max_entries is None:
+            max_entries = int(max_size_mb * 1024 * 1024) // self.ENTRY_SIZE_BYTES
+        capacity = 1
+        while capacity * 2 <= max(1, max_entries):
+            capacity *= 2
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self.slots = [None] * capacity
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def probe(self, key):
+        """Returns the stored entry for ``key`` or None."""
+        entry = self.slots[key & self._mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, best_move):
+        index = key & self._mask
+        old = self.slots[index]
+        if old is None or old[5] != self.generation or old[0] == key or depth >= old[1]:
+            self.slots[index] = (key, depth, flag, score, best_move, self.generation)
+            self.stores += 1
+
+    def new_search(self):
+        """Marks all current entries as old so they are replaced first."""
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * self.capacity
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __len__(self):
+        return sum(1 for entry in self.slots if entry is not None)
@@ -0,0 +1,74 @@
+import argparse
+import random
+import time
+
+from ai.minimax import Minimax
+from games.dame import BOARD_SIZES
+from games.dame_bitboard import BitboardDame
+
+
+def _random_position(board_size, plies, rng):
+    """A running game after ``plies`` random moves from the start position, AI to move."""
+    while True:
+        game = BitboardDame(board_size)
+        for _ in range(plies):
+            piece = game.current_player_piece
+            game.make_move(rng.choice(list(game.get_all_possible_moves(piece))), piece)
+            if game.is_game_over():
+                break
+        if not game.is_game_over() and game.current_player == "ai":
+            return game
+
+
+def _engine(game, depth):
+    # Wie GameController für Dame: PVS mit LMR und Futility, ohne Null-Move, Buch und Endspieldatenbank
+    return Minimax(game, max_depth=depth, search_mode="pvs", use_lmr=True, use_futility=True)
+
+
+def bench_size(board_size, max_depth, positions, rng):
+    # Der Mensch beginnt: nach einem Zug (Eröffnung) bzw. einer ungeraden Zahl von Zügen ist die KI am Zug
+    games = [_random_position(board_size, 1, rng)] + [_random_position(board_size, 2 * board_size + 1, rng)
+                                                      for _ in range(positions - 1)]
+
+    # Zuggenerierung, Zug, Bewertung und Rücknahme, wie an einem Knoten der Suche
+    calls = 0
+    start = time.perf_counter()
+    for game in games:
+        for _ in range(20):
+            piece = game.current_player_piece
+            for move in list(game.get_all_possible_moves(piece)):
+                game.make_move(move, piece)
+                game.evaluate_board(game.ai_player_piece)
+                game.undo_move()
+                calls += 1
+    move_us = (time.perf_counter() - start) * 1e6 / calls
+
+    rows = []
+    for depth in range(1, max_depth + 1):
+        nodes = 0
+        start = time.perf_counter()
+        for game in games:
+            engine = _engine(game, depth)
+            engine.find_best_move(game.ai_player_piece)
+            nodes += engine.nodes_searched
+        elapsed = time.perf_counter() - start
+        rows.append((depth, nodes, elapsed))
+    start = BitboardDame(board_size)
+    return len(start.get_all_possible_moves(start.human_player_piece)), move_us, rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures Dame search speed and time to depth per board size.")
+    parser.add_argument("--depth", type=int, default=10, help="deepest search")
+    parser.add_argument("--positions", type=int, default=4, help="opening position plus random positions per size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BOARD_SIZES))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for board_size in args.sizes:
+        opening_moves, move_us, rows = bench_size(board_size, args.depth, args.positions, rng)
+        print(f"{board_size}x{board_size}: {opening_moves} opening moves, {move_us:.1f} us per move + evaluation")
+        print(f"{'depth':>7} {'nodes':>9} {'nodes/s':>8} {'s/search':>9}")
+        for depth, nodes, elapsed in rows:
+            print(f"{depth:>7} {nodes:>9} {nodes / elapsed:>8.0f} {elapsed / args.positions:>9.3f}")
@@ -0,0 +1,105 @@
+import argparse
+import random
+import time
+
+from ai.minimax import Minimax
+from games import tic_tac_toe
+from games.tic_tac_toe import TicTacToe
+
+# (Brettgröße, Gewinnlänge) der gemessenen Varianten
+VARIANTS = ((6, 4), (10, 5), (15, 5))
+
+
+def _has_open_threat(game):
+    # Ein Fenster mit win_length - 1 eigenen und keinem fremden Stein: sofortiger Gewinn bzw. erzwungene Abwehr
+    threat = game.win_length - 1
+    ai_counts = game.window_counts[game.ai_player_mark]
+    human_counts = game.window_counts[game.human_player_mark]
+    return any((ai == threat and not human) or (human == threat and not ai)
+               for ai, human in zip(ai_counts, human_counts))
+
+
+def _random_position(board_size, win_length, fill, rng):
+    """A running game with about ``fill`` of the cells taken, AI to move, without a win in one or a forced block.
+
+    Otherwise the root check for an immediate win (or a single forced reply) would answer without a search.
+    """
+    while True:
+        game = TicTacToe(board_size, win_length)
+        # Der Mensch beginnt: nach einer ungeraden Zahl von Zügen ist die KI am Zug
+        for _ in range(int(board_size * board_size * fill) // 2 * 2 + 1):
+            mark = game.human_player_mark if game.current_player == "human" else game.ai_player_mark
+            game.make_move(rng.choice(game.get_possible_moves()), mark)
+            if game.is_game_over():
+                break
+        if not game.is_game_over() and game.current_player == "ai" and not _has_open_threat(game):
+            return game
+
+
+def _scan_line_score(game):
+    """Open-line score computed from scratch over all windows, as a reference for the incremental counters."""
+    ai_bits = game.mark_bits[game.ai_player_mark]
+    human_bits = game.mark_bits[game.human_player_mark]
+    score = 0
+    for mask in game.window_masks:
+        ai = bin(ai_bits & mask).count("1")
+        human = bin(human_bits & mask).count("1")
+        if not human:
+            score += game.line_scores[ai]
+        elif not ai:
+            score -= game.line_scores[human]
+    return score
+
+
+def bench_variant(board_size, win_length, depth, positions, rng):
+    tic_tac_toe._WINDOW_MASKS.pop((board_size, win_length), None)
+    tic_tac_toe._CELL_WINDOWS.pop((board_size, win_length), None)
+    start = time.perf_counter()
+    game = TicTacToe(board_size, win_length)
+    tables_ms = (time.perf_counter() - start) * 1000.0
+    windows = len(game.window_masks)
+    games = [_random_position(board_size, win_length, 0.3, rng) for _ in range(positions)]
+
+    # Zug + Gewinnprüfung + Bewertung + Rücknahme, wie an einem Blatt der Suche
+    moves = 0
+    start = time.perf_counter()
+    for game in games:
+        for move in game.get_possible_moves():
+            game.make_move(move, game.ai_player_mark)
+            game.check_win_condition()
+            game.evaluate_board(game.ai_player_mark)
+            game.undo_move()
+            moves += 1
+    move_us = (time.perf_counter() - start) * 1e6 / moves
+
+    start = time.perf_counter()
+    for game in games:
+        assert _scan_line_score(game) == game.line_score
+    scan_us = (time.perf_counter() - start) * 1e6 / len(games)
+
+    nodes = 0
+    start = time.perf_counter()
+    for game in games:
+        engine = Minimax(game, max_depth=depth, search_mode="pvs")
+        engine.find_best_move(game.ai_player_mark)
+        assert engine.nodes_searched > 0, "position was answered without a search"
+        nodes += engine.nodes_searched
+    search_s = time.perf_counter() - start
+    return windows, tables_ms, move_us, scan_us, nodes, search_s
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures TicTacToe move, evaluation and search cost per board size.")
+    parser.add_argument("--depth", type=int, default=3, help="search depth of the Minimax runs")
+    parser.add_argument("--positions", type=int, default=5, help="random positions per variant")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'board':>7} {'k':>2} {'windows':>8} {'tables ms':>10} {'move us':>8} {'scan us':>8} "
+          f"{'nodes':>8} {'nodes/s':>8} {'s/search':>9}")
+    for board_size, win_length in VARIANTS:
+        windows, tables_ms, move_us, scan_us, nodes, search_s = bench_variant(
+            board_size, win_length, args.depth, args.positions, rng)
+        print(f"{board_size:>4}x{board_size:<2} {win_length:>2} {windows:>8} {tables_ms:>10.1f} {move_us:>8.1f} "
+              f"{scan_us:>8.1f} {nodes:>8} {nodes / search_s:>8.0f} {search_s / args.positions:>9.2f}")
@@ -5,6 +5,8 @@ class BaseGame(ABC):
         self.board_size = board_size
         self.board = self.initialize_board()
         self.current_player = "human" # 'human' or 'ai'
+        self.move_stack = [] # undo records pushed by make_move
+        self.zobrist_hash = self.zobrist.compute_hash(self.board, self.current_player)
 
     @abstractmethod
     def initialize_board(self):
@@ -16,6 +18,16 @@ class BaseGame(ABC):
         """Applies a move to the board for the given player."""
         pass
 
+    @abstractmethod
+    def undo_move(self):
+        """Reverts the last successful make_move, including the current player. Returns False if there is nothing to undo."""
+        pass
+
+    @abstractmethod
+    def clone(self):
+        """Returns an independent copy of the current game state."""
+        pass
+
     @abstractmethod
     def get_ai_move(self):
         """Returns the AI's move based on the current board state."""
@@ -46,4 +58,5 @@ class BaseGame(ABC):
         if self.current_player == "human":
             self.current_player = "ai"
         else:
-            self.current_player = "human" 
\ No newline at end of file
+            self.current_player = "human"
+        self.zobrist_hash ^= self.zobrist.side_key 
\ No newline at end of file
@@ -1,8 +1,18 @@
 from .base_game import BaseGame
+from .zobrist import get_zobrist_table
 
 EMPTY = '_'
 HUMAN_PIECE = 'W'
 AI_PIECE = 'B'
+_NOT_CACHED = object()
+# Spielbare Brettgrößen (GameController, Spielauswahl)
+BOARD_SIZES = (6, 8, 10)
+
+
+def starting_rows(board_size):
+    """Rows of pieces per side at the start: 2 on 6x6, 3 on 8x8, 4 on 10x10; two rows stay empty."""
+    return (board_size - 2) // 2
+
 
 class Dame(BaseGame):
     def __init__(self, board_size=6):
@@ -10,18 +20,35 @@ class Dame(BaseGame):
         self.ai_player_piece = AI_PIECE
         self.human_pieces = set()
         self.ai_pieces = set()
+        self.zobrist = get_zobrist_table(board_size, (self.human_player_piece, self.ai_player_piece))
+        self._ai_engine = None  # wird von get_ai_move angelegt, clone() übernimmt sie nicht
         super().__init__(board_size)
 
+    def _clear_cache(self):
+        """Forgets the legal moves and the game status cached for the current position."""
+        self._cache_hash = None
+        self._position_cache = {}
+
+    def _get_position_cache(self):
+        # Gültig, solange sich zobrist_hash nicht ändert, also bis zum nächsten make_move/undo_move.
+        # Schlüssel: Spielstein ('W'/'B') -> Zugliste, current_player ('human'/'ai') -> Spielstatus
+        if self._cache_hash != self.zobrist_hash:
+            self._cache_hash = self.zobrist_hash
+            self._position_cache = {}
+        return self._position_cache
+
     def initialize_board(self):
+        self._clear_cache()
         board = [[EMPTY for _ in range(self.board_size)] for _ in range(self.board_size)]
         self.human_pieces.clear()
         self.ai_pieces.clear()
-        for row in range(self.board_size - 2, self.board_size):
+        rows = starting_rows(self.board_size)
+        for row in range(self.board_size - rows, self.board_size):
             for col in range(self.board_size):
                 if (row + col) % 2 == 0:
                     board[row][col] = self.ai_player_piece
                     self.ai_pieces.add((row, col))
-        for row in range(2):
+        for row in range(rows):
             for col in range(self.board_size):
                 if (row + col) % 2 == 0:
                     board[row][col] = self.human_player_piece
@@ -35,6 +62,15 @@ class Dame(BaseGame):
         return self.ai_player_piece if player_piece == self.human_player_piece else self.human_player_piece
 
     def get_all_possible_moves(self, player_piece):
+        """Returns the legal moves of ``player_piece``. The list is cached for the current position
+        and must not be modified."""
+        cache = self._get_position_cache()
+        moves = cache.get(player_piece)
+        if moves is None:
+            moves = cache[player_piece] = self._generate_all_moves(player_piece)
+        return moves
+
+    def _generate_all_moves(self, player_piece):
         pieces = self.human_pieces if player_piece == self.human_player_piece else self.ai_pieces
         direction = 1 if player_piece == self.human_player_piece else -1
         opponent_piece = self._get_opponent_piece(player_piece)
@@ -43,6 +79,19 @@ class Dame(BaseGame):
             return captures
         return self._get_regular_moves(pieces, direction)
 
+    def piece_count(self, player_piece):
+        return len(self.human_pieces if player_piece == self.human_player_piece else self.ai_pieces)
+
+    def get_capture_moves(self, player_piece):
+        """Returns only the captures of ``player_piece`` (used by the quiescence search)."""
+        moves = self._get_position_cache().get(player_piece)
+        if moves is not None:
+            # Schlagzwang: die Zugliste besteht entweder nur aus Schlagzügen oder enthält keinen
+            return moves if moves and moves[0][0] == "capture" else []
+        pieces = self.human_pieces if player_piece == self.human_player_piece else self.ai_pieces
+        direction = 1 if player_piece == self.human_player_piece else -1
+        return self._get_possible_captures(pieces, self._get_opponent_piece(player_piece), direction)
+
     def get_possible_moves(self, piece_coord):
         row, col = piece_coord
         if not self._is_valid_coord(row, col) or self.board[row][col] == EMPTY:
@@ -63,25 +112,28 @@ class Dame(BaseGame):
         return possible_captures
 
     def _get_possible_captures_for_piece(self, piece_coord, opponent_piece, direction):
+        """Returns one move per complete capture chain of the piece at ``piece_coord``:
+        ``["capture", from, to, [captured, ...], [landing square, ...]]``."""
         possible_captures = []
-        row, col = piece_coord
-        for drow in [-1, 1]:
-            for dcol in [-1, 1]:
-                jump_row, jump_col = row + drow, col + dcol
-                land_row, land_col = row + 2 * drow, col + 2 * dcol
-                if self._is_valid_coord(land_row, land_col) and \
-                        self.board[land_row][land_col] == EMPTY and \
-                        self._is_valid_coord(jump_row, jump_col) and \
-                        self.board[jump_row][jump_col] == opponent_piece:
-                    if drow == direction:
-                        possible_captures.append([
-                                "capture",
-                                (row, col),
-                                (land_row, land_col),
-                                [(jump_row, jump_col)]
-                            ])
+        self._extend_capture_chain(piece_coord, piece_coord, opponent_piece, direction, [], [], possible_captures)
         return possible_captures
 
+    def _extend_capture_chain(self, start, position, opponent_piece, direction, captured, path, chains):
+        row, col = position
+        extended = False
+        for dcol in [-1, 1]:
+            jump_row, jump_col = row + direction, col + dcol
+            land_row, land_col = row + 2 * direction, col + 2 * dcol
+            # Nur vorwärts: Startfeld und geschlagene Steine liegen immer hinter dem Stein
+            if self._is_valid_coord(land_row, land_col) and \
+                    self.board[land_row][land_col] == EMPTY and \
+                    self.board[jump_row][jump_col] == opponent_piece:
+                extended = True
+                self._extend_capture_chain(start, (land_row, land_col), opponent_piece, direction,
+                                           captured + [(jump_row, jump_col)], path + [(land_row, land_col)], chains)
+        if not extended and captured:
+            chains.append(["capture", start, position, captured, path])
+
     def _get_regular_moves(self, pieces, direction):
         moves = []
         for row, col in pieces:
@@ -122,52 +174,97 @@ class Dame(BaseGame):
         if not self._is_valid_coord(from_r, from_c) or \
            self.board[from_r][from_c] != player_piece_making_move:
             return False, False
+        if move_type not in ("move", "capture"):
+            return False, False
+        if move_type == "capture" and (len(move_info) < 4 or not isinstance(move_info[3], list)):
+            return False, False
 
+        previous_player = self.current_player
+        previous_hash = self.zobrist_hash
+        keys = self.zobrist.piece_keys
+        moving_keys = keys[player_piece_making_move]
         self.board[to_r][to_c] = player_piece_making_move
         self.board[from_r][from_c] = EMPTY
-        
+        self.zobrist_hash ^= moving_keys[from_r * self.board_size + from_c] ^ moving_keys[to_r * self.board_size + to_c]
+
         moving_player_pieces = self.human_pieces if player_piece_making_move == self.human_player_piece else self.ai_pieces
         opponent_player_pieces = self.ai_pieces if player_piece_making_move == self.human_player_piece else self.human_pieces
 
         if from_pos in moving_player_pieces:
             moving_player_pieces.remove(from_pos)
         moving_player_pieces.add(to_pos)
-        
+
         further_capture_possible = False
+        captured = []
 
         if move_type == "capture":
-            if len(move_info) < 4 or not isinstance(move_info[3], list):
-                self.board[from_r][from_c] = player_piece_making_move
-                self.board[to_r][to_c] = EMPTY
-                if to_pos in moving_player_pieces:
-                    moving_player_pieces.remove(to_pos)
-                moving_player_pieces.add(from_pos)
-                return False, False
-
+            opponent_keys = keys[self._get_opponent_piece(player_piece_making_move)]
             captured_coords_list = move_info[3]
             for cap_r, cap_c in captured_coords_list:
-                self.board[cap_r][cap_c] = EMPTY 
                 if (cap_r, cap_c) in opponent_player_pieces:
                     opponent_player_pieces.remove((cap_r, cap_c))
-            
+                    self.zobrist_hash ^= opponent_keys[cap_r * self.board_size + cap_c]
+                    captured.append((cap_r, cap_c))
+                self.board[cap_r][cap_c] = EMPTY
+
             if self._check_further_captures(to_r, to_c, player_piece_making_move):
                 further_capture_possible = True
             else:
                 self.switch_player()
-        
-        elif move_type == "move":
+        else:
             self.switch_player()
-        
-        else: 
-            self.board[from_r][from_c] = player_piece_making_move
-            self.board[to_r][to_c] = EMPTY
-            if to_pos in moving_player_pieces:
-                moving_player_pieces.remove(to_pos)
-            moving_player_pieces.add(from_pos)
-            return False, False
+
+        self.move_stack.append((player_piece_making_move, from_pos, to_pos, captured, previous_player, previous_hash))
         return True, further_capture_possible
 
+    def undo_move(self):
+        if not self.move_stack:
+            return False
+        piece, from_pos, to_pos, captured, previous_player, previous_hash = self.move_stack.pop()
+        opponent_piece = self._get_opponent_piece(piece)
+        moving_player_pieces = self.human_pieces if piece == self.human_player_piece else self.ai_pieces
+        opponent_player_pieces = self.ai_pieces if piece == self.human_player_piece else self.human_pieces
+
+        self.board[to_pos[0]][to_pos[1]] = EMPTY
+        self.board[from_pos[0]][from_pos[1]] = piece
+        moving_player_pieces.discard(to_pos)
+        moving_player_pieces.add(from_pos)
+        for cap_r, cap_c in captured:
+            self.board[cap_r][cap_c] = opponent_piece
+            opponent_player_pieces.add((cap_r, cap_c))
+
+        self.current_player = previous_player
+        self.zobrist_hash = previous_hash
+        return True
+
+    def clone(self):
+        new_game = Dame(self.board_size)
+        new_game.board = [row[:] for row in self.board]
+        new_game.human_pieces = set(self.human_pieces)
+        new_game.ai_pieces = set(self.ai_pieces)
+        new_game.current_player = self.current_player
+        new_game.zobrist_hash = self.zobrist_hash
+        return new_game
+
+    def set_position(self, board, current_player):
+        """Sets up ``board`` with ``current_player`` to move, without move history (used by the parallel workers)."""
+        self.board = [list(row) for row in board]
+        self.human_pieces = {(r, c) for r, row in enumerate(self.board) for c, piece in enumerate(row)
+                             if piece == self.human_player_piece}
+        self.ai_pieces = {(r, c) for r, row in enumerate(self.board) for c, piece in enumerate(row)
+                          if piece == self.ai_player_piece}
+        self.current_player = current_player
+        self.move_stack = []
+        self.zobrist_hash = self.zobrist.compute_hash(self.board, current_player)
+
     def check_win_condition(self):
+        cache = self._get_position_cache()
+        status = cache.get(self.current_player, _NOT_CACHED)
+        if status is _NOT_CACHED:
+            status = cache[self.current_player] = self._compute_win_condition()
+        return status
+
+    def _compute_win_condition(self):
         for r, c in self.human_pieces:
             if r == self.board_size - 1:
                 return "human_wins"
@@ -193,8 +290,10 @@ class Dame(BaseGame):
 
     def get_ai_move(self):
         from ai.minimax import Minimax
-        ai = Minimax(self, max_depth=3) 
-        best_move = ai.find_best_move(self.ai_player_piece)
+        # Dieselbe Engine für alle Züge, damit die Transpositionstabelle erhalten bleibt
+        if self._ai_engine is None:
+            self._ai_engine = Minimax(self, max_depth=3)
+        best_move = self._ai_engine.find_best_move(self.ai_player_piece)
         return best_move 
 
     def is_game_over(self):
@@ -0,0 +1,353 @@
+from .dame import Dame, EMPTY, starting_rows
+
+_GEOMETRIES = {}
+
+
+class DameGeometry:
+    """Precomputed masks and move records for one board size.
+
+    Square (row, col) is bit ``row * board_size + col``. For every forward diagonal the
+    geometry stores the shift of one step together with the masks of the squares from
+    which a step or a jump in that direction stays on the board, so no coordinate has
+    to be checked while generating moves.
+    """
+
+    def __init__(self, board_size):
+        n = board_size
+        self.board_size = n
+        self.full_mask = (1 << (n * n)) - 1
+        self.coords = [(i // n, i % n) for i in range(n * n)]
+        self.row_masks = [((1 << n) - 1) << (r * n) for r in range(n)]
+        self.first_row_mask = self.row_masks[0]
+        self.last_row_mask = self.row_masks[n - 1]
+
+        # direction (+1 human, -1 ai) -> [(shift, step_mask, jump_mask, move_records, capture_records), ...]
+        # Zugdatensätze werden einmal gebaut und danach nur noch über das Zielfeld nachgeschlagen
+        self.directions = {}
+        for drow in (1, -1):
+            entries = []
+            for dcol in (-1, 1):
+                shift = drow * n + dcol
+                step_mask = 0
+                jump_mask = 0
+                move_records = [None] * (n * n)
+                capture_records = [None] * (n * n)
+                for r in range(n):
+                    for c in range(n):
+                        i = r * n + c
+                        if 0 <= r + drow < n and 0 <= c + dcol < n:
+                            step_mask |= 1 << i
+                            move_records[i + shift] = ["move", self.coords[i], self.coords[i + shift]]
+                        if 0 <= r + 2 * drow < n and 0 <= c + 2 * dcol < n:
+                            jump_mask |= 1 << i
+                            capture_records[i + 2 * shift] = [
+                                "capture", self.coords[i], self.coords[i + 2 * shift], [self.coords[i + shift]],
+                                [self.coords[i + 2 * shift]]
+                            ]
+                entries.append((shift, step_mask, jump_mask, move_records, capture_records))
+            self.directions[drow] = entries
+
+
+def get_dame_geometry(board_size):
+    geometry = _GEOMETRIES.get(board_size)
+    if geometry is None:
+        geometry = DameGeometry(board_size)
+        _GEOMETRIES[board_size] = geometry
+    return geometry
+
+
+def _iter_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class BitboardDame(Dame):
+    """Drop-in replacement for Dame that keeps one integer bitboard per side.
+
+    Move generation, win detection and evaluation work on ``human_bits``/``ai_bits``
+    with mask arithmetic. ``board`` is still kept up to date as a list-of-lists view
+    for the GUI, and ``human_pieces``/``ai_pieces`` are derived from the bitboards.
+    """
+
+    def __init__(self, board_size=6):
+        self.geometry = get_dame_geometry(board_size)
+        self.human_bits = 0
+        self.ai_bits = 0
+        super().__init__(board_size)
+
+    @property
+    def human_pieces(self):
+        return {self.geometry.coords[i] for i in _iter_bits(self.human_bits)}
+
+    @human_pieces.setter
+    def human_pieces(self, pieces):
+        self.human_bits = self._coords_to_bits(pieces)
+
+    @property
+    def ai_pieces(self):
+        return {self.geometry.coords[i] for i in _iter_bits(self.ai_bits)}
+
+    @ai_pieces.setter
+    def ai_pieces(self, pieces):
+        self.ai_bits = self._coords_to_bits(pieces)
+
+    def _coords_to_bits(self, coords):
+        bits = 0
+        for r, c in coords:
+            bits |= 1 << (r * self.board_size + c)
+        return bits
+
+    def initialize_board(self):
+        board = [[EMPTY for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.human_bits = 0
+        self.ai_bits = 0
+        rows = starting_rows(self.board_size)
+        for row in range(self.board_size - rows, self.board_size):
+            for col in range(self.board_size):
+                if (row + col) % 2 == 0:
+                    board[row][col] = self.ai_player_piece
+                    self.ai_bits |= 1 << (row * self.board_size + col)
+        for row in range(rows):
+            for col in range(self.board_size):
+                if (row + col) % 2 == 0:
+                    board[row][col] = self.human_player_piece
+                    self.human_bits |= 1 << (row * self.board_size + col)
+        return board
+
+    def _side_bits(self, player_piece):
+        if player_piece == self.human_player_piece:
+            return self.human_bits, self.ai_bits, 1
+        return self.ai_bits, self.human_bits, -1
+
+    def _generate_captures(self, own, opp, direction, empty):
+        captures = []
+        for shift, _, jump_mask, _, records in self.geometry.directions[direction]:
+            if shift > 0:
+                targets = ((((own & jump_mask) << shift) & opp) << shift) & empty
+            else:
+                targets = ((((own & jump_mask) >> -shift) & opp) >> -shift) & empty
+            while targets:
+                low = targets & -targets
+                land = low.bit_length() - 1
+                self._extend_capture_chain(records[land], low, opp ^ (1 << (land - shift)), direction, empty, captures)
+                targets ^= low
+        return captures
+
+    def _extend_capture_chain(self, move, position_bit, opp, direction, empty, captures):
+        """Appends ``move`` to ``captures``, or every longer chain if the piece can jump on from its landing square."""
+        coords = self.geometry.coords
+        extended = False
+        # Nur vorwärts: Startfeld und geschlagene Steine liegen hinter dem Stein, empty bleibt gültig
+        for shift, _, jump_mask, _, _ in self.geometry.directions[direction]:
+            if shift > 0:
+                target = ((((position_bit & jump_mask) << shift) & opp) << shift) & empty
+            else:
+                target = ((((position_bit & jump_mask) >> -shift) & opp) >> -shift) & empty
+            if target:
+                extended = True
+                land = target.bit_length() - 1
+                jumped = land - shift
+                chain = ["capture", move[1], coords[land], move[3] + [coords[jumped]], move[4] + [coords[land]]]
+                self._extend_capture_chain(chain, target, opp ^ (1 << jumped), direction, empty, captures)
+        if not extended:
+            captures.append(move)
+
+    def _generate_moves(self, own, opp, direction):
+        geometry = self.geometry
+        empty = geometry.full_mask & ~(self.human_bits | self.ai_bits)
+        captures = self._generate_captures(own, opp, direction, empty)
+        if captures:
+            return captures
+        moves = []
+        for shift, step_mask, _, records, _ in geometry.directions[direction]:
+            targets = ((own & step_mask) << shift if shift > 0 else (own & step_mask) >> -shift) & empty
+            while targets:
+                low = targets & -targets
+                moves.append(records[low.bit_length() - 1])
+                targets ^= low
+        return moves
+
+    def _has_any_move(self, own, opp, direction):
+        empty = self.geometry.full_mask & ~(self.human_bits | self.ai_bits)
+        for shift, step_mask, jump_mask, _, _ in self.geometry.directions[direction]:
+            if shift > 0:
+                if ((own & step_mask) << shift) & empty or ((((own & jump_mask) << shift) & opp) << shift) & empty:
+                    return True
+            elif ((own & step_mask) >> -shift) & empty or ((((own & jump_mask) >> -shift) & opp) >> -shift) & empty:
+                return True
+        return False
+
+    def get_all_possible_moves(self, player_piece):
+        own, opp, direction = self._side_bits(player_piece)
+        return self._generate_moves(own, opp, direction)
+
+    def piece_count(self, player_piece):
+        return (self.human_bits if player_piece == self.human_player_piece else self.ai_bits).bit_count()
+
+    def get_capture_moves(self, player_piece):
+        own, opp, direction = self._side_bits(player_piece)
+        return self._generate_captures(own, opp, direction, self.geometry.full_mask & ~(self.human_bits | self.ai_bits))
+
+    def get_possible_moves(self, piece_coord):
+        row, col = piece_coord
+        if not self._is_valid_coord(row, col):
+            return []
+        bit = 1 << (row * self.board_size + col)
+        if self.human_bits & bit:
+            return self._generate_moves(bit, self.ai_bits, 1)
+        if self.ai_bits & bit:
+            return self._generate_moves(bit, self.human_bits, -1)
+        return []
+
+    def _check_further_captures(self, r_start, c_start, piece_making_move):
+        bit = 1 << (r_start * self.board_size + c_start)
+        _, opp, direction = self._side_bits(piece_making_move)
+        empty = self.geometry.full_mask & ~(self.human_bits | self.ai_bits)
+        for shift, _, jump_mask, _, _ in self.geometry.directions[direction]:
+            if shift > 0:
+                if ((((bit & jump_mask) << shift) & opp) << shift) & empty:
+                    return True
+            elif ((((bit & jump_mask) >> -shift) & opp) >> -shift) & empty:
+                return True
+        return False
+
+    def make_move(self, move_info, player_piece_making_move):
+        move_type, from_pos, to_pos = move_info[0], move_info[1], move_info[2]
+        from_r, from_c = from_pos
+        to_r, to_c = to_pos
+        n = self.board_size
+
+        if not self._is_valid_coord(from_r, from_c):
+            return False, False
+        from_index = from_r * n + from_c
+        to_index = to_r * n + to_c
+        is_human = player_piece_making_move == self.human_player_piece
+        own = self.human_bits if is_human else self.ai_bits
+        if not own >> from_index & 1:
+            return False, False
+        if move_type not in ("move", "capture"):
+            return False, False
+        if move_type == "capture" and (len(move_info) < 4 or not isinstance(move_info[3], list)):
+            return False, False
+
+        previous_player = self.current_player
+        previous_hash = self.zobrist_hash
+        keys = self.zobrist.piece_keys
+        moving_keys = keys[player_piece_making_move]
+        own ^= (1 << from_index) | (1 << to_index)
+        self.board[to_r][to_c] = player_piece_making_move
+        self.board[from_r][from_c] = EMPTY
+        self.zobrist_hash ^= moving_keys[from_index] ^ moving_keys[to_index]
+
+        captured = []
+        if move_type == "capture":
+            opp = self.ai_bits if is_human else self.human_bits
+            opponent_keys = keys[self._get_opponent_piece(player_piece_making_move)]
+            for cap_r, cap_c in move_info[3]:
+                cap_index = cap_r * n + cap_c
+                if opp >> cap_index & 1:
+                    opp ^= 1 << cap_index
+                    self.zobrist_hash ^= opponent_keys[cap_index]
+                    captured.append(cap_index)
+                self.board[cap_r][cap_c] = EMPTY
+            if is_human:
+                self.ai_bits = opp
+            else:
+                self.human_bits = opp
+
+        if is_human:
+            self.human_bits = own
+        else:
+            self.ai_bits = own
+
+        further_capture_possible = False
+        if move_type == "capture" and self._check_further_captures(to_r, to_c, player_piece_making_move):
+            further_capture_possible = True
+        else:
+            self.switch_player()
+
+        self.move_stack.append((player_piece_making_move, from_index, to_index, captured, previous_player, previous_hash))
+        return True, further_capture_possible
+
+    def undo_move(self):
+        if not self.move_stack:
+            return False
+        piece, from_index, to_index, captured, previous_player, previous_hash = self.move_stack.pop()
+        coords = self.geometry.coords
+        moved = (1 << from_index) | (1 << to_index)
+        to_r, to_c = coords[to_index]
+        from_r, from_c = coords[from_index]
+        self.board[to_r][to_c] = EMPTY
+        self.board[from_r][from_c] = piece
+
+        restored = 0
+        opponent_piece = self._get_opponent_piece(piece)
+        for cap_index in captured:
+            cap_r, cap_c = coords[cap_index]
+            self.board[cap_r][cap_c] = opponent_piece
+            restored |= 1 << cap_index
+
+        if piece == self.human_player_piece:
+            self.human_bits ^= moved
+            self.ai_bits |= restored
+        else:
+            self.ai_bits ^= moved
+            self.human_bits |= restored
+
+        self.current_player = previous_player
+        self.zobrist_hash = previous_hash
+        return True
+
+    def clone(self):
+        new_game = BitboardDame(self.board_size)
+        new_game.board = [row[:] for row in self.board]
+        new_game.human_bits = self.human_bits
+        new_game.ai_bits = self.ai_bits
+        new_game.current_player = self.current_player
+        new_game.zobrist_hash = self.zobrist_hash
+        return new_game
+
+    def check_win_condition(self):
+        geometry = self.geometry
+        if self.human_bits & geometry.last_row_mask:
+            return "human_wins"
+        if self.ai_bits & geometry.first_row_mask:
+            return "ai_wins"
+        if not self.human_bits:
+            return "ai_wins"
+        if not self.ai_bits:
+            return "human_wins"
+
+        if self.current_player == "human":
+            if not self._has_any_move(self.human_bits, self.ai_bits, 1):
+                return "ai_wins"
+        elif not self._has_any_move(self.ai_bits, self.human_bits, -1):
+            return "human_wins"
+        return None
+
+    def evaluate_board(self, player_piece_perspective):
+        win_status = self.check_win_condition()
+        if win_status == "human_wins":
+            return -float('inf') if player_piece_perspective == self.ai_player_piece else float('inf')
+        if win_status == "ai_wins":
+            return float('inf') if player_piece_perspective == self.ai_player_piece else float('-inf')
+
+        human_bits = self.human_bits
+        ai_bits = self.ai_bits
+        piece_diff_score = human_bits.bit_count() - ai_bits.bit_count()
+
+        human_score = 0
+        ai_score = 0
+        for r, row_mask in enumerate(self.geometry.row_masks):
+            human_score += (r + 1) * (human_bits & row_mask).bit_count()
+            ai_score += (self.board_size - r) * (ai_bits & row_mask).bit_count()
+        advancement_score = human_score - ai_score
+
+        total_score = piece_diff_score * 10 + advancement_score
+
+        if player_piece_perspective == self.human_player_piece:
+            return total_score
+        else:
+            return -total_score
@@ -1,15 +1,135 @@
 from ai.minimax import Minimax
 from games.base_game import BaseGame
+from games.zobrist import get_zobrist_table
+
+# Standardvariante: 4 in einer Reihe auf 6x6
+BOARD_SIZE = 6
+WIN_LENGTH = 4
+# Längere Reihen würden mit 10 ** win_length die Gewinnwerte der Suche (Minimax.WIN_BASE_SCORE) erreichen
+MAX_WIN_LENGTH = 5
+# Punkte einer offenen Linie mit 0..4 eigenen Steinen
+LINE_SCORES = [0, 10, 100, 1000, 10000]
+# Bewertung einer gewonnenen Stellung
+WIN_SCORE = 10000
+
+_WINDOW_MASKS = {}
+_CELL_WINDOWS = {}
+_SYMMETRIES = {}
+
+
+def get_line_scores(win_length=WIN_LENGTH):
+    """Points of an open line with 0..win_length own marks; LINE_SCORES for 4 in a row."""
+    return [0] + [10 ** i for i in range(1, win_length + 1)]
+
+
+def get_win_score(win_length=WIN_LENGTH):
+    """Score of a won position; WIN_SCORE for 4 in a row."""
+    return 10 ** win_length
+
+
+def get_window_masks(board_size, win_length=WIN_LENGTH):
+    """Returns the bit masks of all windows of ``win_length`` cells (rows, columns, both diagonals).
+
+    Cell (row, col) is bit ``row * board_size + col``. The table is built once per (size, length).
+    """
+    masks = _WINDOW_MASKS.get((board_size, win_length))
+    if masks is None:
+        masks = []
+        for r in range(board_size):
+            for c in range(board_size):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r, end_c = r + dr * (win_length - 1), c + dc * (win_length - 1)
+                    if 0 <= end_r < board_size and 0 <= end_c < board_size:
+                        mask = 0
+                        for i in range(win_length):
+                            mask |= 1 << ((r + dr * i) * board_size + c + dc * i)
+                        masks.append(mask)
+        _WINDOW_MASKS[(board_size, win_length)] = masks
+    return masks
+
+
+def get_cell_windows(board_size, win_length=WIN_LENGTH):
+    """Returns, for every cell index, the indices (into get_window_masks) of the windows through that cell."""
+    cell_windows = _CELL_WINDOWS.get((board_size, win_length))
+    if cell_windows is None:
+        masks = get_window_masks(board_size, win_length)
+        cell_windows = [[] for _ in range(board_size * board_size)]
+        for w, mask in enumerate(masks):
+            while mask:
+                low = mask & -mask
+                cell_windows[low.bit_length() - 1].append(w)
+                mask ^= low
+        cell_windows = [tuple(windows) for windows in cell_windows]
+        _CELL_WINDOWS[(board_size, win_length)] = cell_windows
+    return cell_windows
+
+
+def get_symmetry_permutations(board_size):
+    """Returns ``(permutations, inverses)`` for the 8 symmetries of the square board (rotations and reflections).
+
+    ``permutations[s][index]`` is the cell index that ``index`` is mapped to by symmetry ``s``;
+    symmetry 0 is the identity. ``inverses[s]`` maps back. Built once per size.
+    """
+    tables = _SYMMETRIES.get(board_size)
+    if tables is None:
+        m = board_size - 1
+        transforms = (
+            lambda r, c: (r, c),
+            lambda r, c: (c, m - r),
+            lambda r, c: (m - r, m - c),
+            lambda r, c: (m - c, r),
+            lambda r, c: (r, m - c),
+            lambda r, c: (m - r, c),
+            lambda r, c: (c, r),
+            lambda r, c: (m - c, m - r),
+        )
+        permutations = []
+        inverses = []
+        for transform in transforms:
+            permutation = [0] * (board_size * board_size)
+            inverse = [0] * (board_size * board_size)
+            for index in range(board_size * board_size):
+                r, c = transform(index // board_size, index % board_size)
+                permutation[index] = r * board_size + c
+                inverse[r * board_size + c] = index
+            permutations.append(permutation)
+            inverses.append(inverse)
+        tables = (permutations, inverses)
+        _SYMMETRIES[board_size] = tables
+    return tables
 
 
 class TicTacToe(BaseGame):
-    def __init__(self, board_size=6):
-        super().__init__(board_size)
+    def __init__(self, board_size=BOARD_SIZE, win_length=WIN_LENGTH):
+        if not 2 <= win_length <= min(board_size, MAX_WIN_LENGTH):
+            raise ValueError(f"win_length must be between 2 and {MAX_WIN_LENGTH} and fit on the board")
         self.human_player_mark = 'X'
         self.ai_player_mark = 'O'
+        # k in einer Reihe; Fenster- und Punktetabellen werden je (Größe, k) einmal angelegt
+        self.win_length = win_length
+        self.line_scores = get_line_scores(win_length)
+        self.win_score = get_win_score(win_length)
+        self.zobrist = get_zobrist_table(board_size, (self.human_player_mark, self.ai_player_mark))
+        self.window_masks = get_window_masks(board_size, win_length)
+        self.cell_windows = get_cell_windows(board_size, win_length)
+        self.full_mask = (1 << (board_size * board_size)) - 1
+        self.symmetry_permutations, self.symmetry_inverses = get_symmetry_permutations(board_size)
+        self._ai_engine = None  # wird von get_ai_move angelegt, clone() übernimmt sie nicht
+        super().__init__(board_size)
 
     def initialize_board(self):
-        """Initializes the 6x6 game board with empty cells."""
+        """Initializes the game board with empty cells, empty bitboards and window counters."""
+        self.mark_bits = {self.human_player_mark: 0, self.ai_player_mark: 0}
+        # Anzahl Steine je Markierung in jedem Fenster, laufend in make_move/undo_move gepflegt
+        self.window_counts = {
+            self.human_player_mark: [0] * len(self.window_masks),
+            self.ai_player_mark: [0] * len(self.window_masks),
+        }
+        self.completed_windows = {self.human_player_mark: 0, self.ai_player_mark: 0}
+        self.line_score = 0  # Offene-Linien-Bewertung aus Sicht der KI
+        self.marks_placed = 0
+        # Zobrist-Hash der Steine (ohne Seite am Zug) nach jeder der 8 Symmetrien, Index 0 = Identität
+        self.symmetry_hashes = [0] * 8
         return [['' for _ in range(self.board_size)] for _ in range(self.board_size)]
 
     def make_move(self, move, player_mark):
@@ -20,57 +140,127 @@ class TicTacToe(BaseGame):
         """
         row, col = move
         if 0 <= row < self.board_size and 0 <= col < self.board_size and self.board[row][col] == '':
+            index = row * self.board_size + col
+            self.move_stack.append((row, col, self.current_player, self.line_score, self.symmetry_hashes))
             self.board[row][col] = player_mark
+            self.mark_bits[player_mark] |= 1 << index
+            mark_keys = self.zobrist.piece_keys[player_mark]
+            self.zobrist_hash ^= mark_keys[index]
+            self.symmetry_hashes = [h ^ mark_keys[permutation[index]]
+                                    for h, permutation in zip(self.symmetry_hashes, self.symmetry_permutations)]
+            self._update_windows(index, player_mark)
             self.switch_player()
             return True
         return False
 
+    def _update_windows(self, index, player_mark):
+        """Adds a mark to the counters of the windows through ``index`` and adjusts line_score."""
+        own_counts = self.window_counts[player_mark]
+        opponent_counts = self.window_counts[self.human_player_mark if player_mark == self.ai_player_mark else self.ai_player_mark]
+        sign = 1 if player_mark == self.ai_player_mark else -1
+        line_scores = self.line_scores
+        win_length = self.win_length
+        delta = 0
+        for w in self.cell_windows[index]:
+            own = own_counts[w]
+            opponent = opponent_counts[w]
+            if not opponent:
+                delta += line_scores[own + 1] - line_scores[own]
+            elif not own:
+                # Die Linie des Gegners ist ab jetzt blockiert
+                delta += line_scores[opponent]
+            own_counts[w] = own + 1
+            if own + 1 == win_length:
+                self.completed_windows[player_mark] += 1
+        self.line_score += sign * delta
+        self.marks_placed += 1
+
+    def undo_move(self):
+        """Removes the mark placed by the last make_move and restores the player to move."""
+        if not self.move_stack:
+            return False
+        row, col, previous_player, previous_line_score, self.symmetry_hashes = self.move_stack.pop()
+        index = row * self.board_size + col
+        mark = self.board[row][col]
+        self.zobrist_hash ^= self.zobrist.piece_keys[mark][index]
+        self.mark_bits[mark] &= ~(1 << index)
+        self.board[row][col] = ''
+        own_counts = self.window_counts[mark]
+        win_length = self.win_length
+        for w in self.cell_windows[index]:
+            if own_counts[w] == win_length:
+                self.completed_windows[mark] -= 1
+            own_counts[w] -= 1
+        self.line_score = previous_line_score
+        self.marks_placed -= 1
+        if self.current_player != previous_player:
+            self.switch_player()
+        return True
+
+    def canonical_hash(self):
+        """Zobrist hash of the position, equal for all 8 symmetric versions of it (side to move included)."""
+        hashes = self.symmetry_hashes
+        # zobrist_hash ^ hashes[0] ist der Anteil der Seite am Zug
+        return min(hashes) ^ self.zobrist_hash ^ hashes[0]
+
+    def canonical_symmetry(self):
+        """Index of a symmetry that maps the position to its canonical version."""
+        hashes = self.symmetry_hashes
+        return hashes.index(min(hashes))
+
+    def to_canonical_move(self, move, symmetry):
+        index = self.symmetry_permutations[symmetry][move[0] * self.board_size + move[1]]
+        return index // self.board_size, index % self.board_size
+
+    def from_canonical_move(self, move, symmetry):
+        index = self.symmetry_inverses[symmetry][move[0] * self.board_size + move[1]]
+        return index // self.board_size, index % self.board_size
+
+    def unique_moves(self, moves):
+        """Keeps one move of every group of moves that lead to symmetric positions.
+
+        Only symmetries that leave the current position unchanged are used, so on an asymmetric
+        board all moves are returned.
+        """
+        hashes = self.symmetry_hashes
+        stabilizer = [self.symmetry_permutations[s] for s in range(1, 8) if hashes[s] == hashes[0]]
+        if not stabilizer:
+            return moves
+        size = self.board_size
+        seen = set()
+        unique = []
+        for row, col in moves:
+            index = row * size + col
+            if index in seen:
+                continue
+            unique.append((row, col))
+            seen.add(index)
+            seen.update(permutation[index] for permutation in stabilizer)
+        return unique
+
     def get_possible_moves(self, player_mark=None):  # player_mark is not used here but kept for consistency
-        """Returns a list of all possible moves (empty cells)."""
+        """Returns a list of all possible moves (empty cells), scanned from the empty-cell bitboard."""
+        empty = self.full_mask & ~(self.mark_bits[self.human_player_mark] | self.mark_bits[self.ai_player_mark])
+        size = self.board_size
         moves = []
-        for r in range(self.board_size):
-            for c in range(self.board_size):
-                if self.board[r][c] == '':
-                    moves.append((r, c))
+        while empty:
+            low = empty & -empty
+            index = low.bit_length() - 1
+            moves.append((index // size, index % size))
+            empty ^= low
         return moves
 
-    def _check_line(self, mark, count, cells):
-        """Helper to check if a line (row, col, or diagonal) has 'count' marks."""
-        for i in range(len(cells) - count + 1):
-            if all(cells[j] == mark for j in range(i, i + count)):
-                return True
-        return False
-
     def check_win_condition(self):
-        """Checks for 4 in a row, column, or diagonal. Also checks for a draw.
+        """Checks for win_length in a row, column, or diagonal. Also checks for a draw.
         Returns 'human_wins', 'ai_wins', 'draw', or None.
+        Only reads the counters of completed windows, which make_move updates for the windows through the last move.
         """
-        for i in range(self.board_size):
-            row_cells = self.board[i]
-            if self._check_line(self.human_player_mark, 4, row_cells):
-                return "human_wins"
-            if self._check_line(self.ai_player_mark, 4, row_cells):
-                return "ai_wins"
-
-            col_cells = [self.board[r][i] for r in range(self.board_size)]
-            if self._check_line(self.human_player_mark, 4, col_cells):
-                return "human_wins"
-            if self._check_line(self.ai_player_mark, 4, col_cells):
-                return "ai_wins"
-
-        for r_start in range(self.board_size):
-            for c_start in range(self.board_size):
-                if r_start <= self.board_size - 4 and c_start <= self.board_size - 4:
-                    diag_tl_br = [self.board[r_start + i][c_start + i] for i in range(4)]
-                    if all(cell == self.human_player_mark for cell in diag_tl_br): return "human_wins"
-                    if all(cell == self.ai_player_mark for cell in diag_tl_br): return "ai_wins"
-
-                if r_start <= self.board_size - 4 and c_start >= 3:
-                    diag_tr_bl = [self.board[r_start + i][c_start - i] for i in range(4)]
-                    if all(cell == self.human_player_mark for cell in diag_tr_bl): return "human_wins"
-                    if all(cell == self.ai_player_mark for cell in diag_tr_bl): return "ai_wins"
-
-        if not self.get_possible_moves():
+        if self.completed_windows[self.human_player_mark]:
+            return "human_wins"
+        if self.completed_windows[self.ai_player_mark]:
+            return "ai_wins"
+
+        if self.marks_placed == self.board_size * self.board_size:
             return "draw"
 
         return None
@@ -82,66 +272,57 @@ class TicTacToe(BaseGame):
     def evaluate_board(self, player_mark_perspective):
         winner_status = self.check_win_condition()
         if winner_status == "ai_wins":
-            return 10000 if player_mark_perspective == self.ai_player_mark else -10000
+            return self.win_score if player_mark_perspective == self.ai_player_mark else -self.win_score
         elif winner_status == "human_wins":
-            return -10000 if player_mark_perspective == self.ai_player_mark else 10000
+            return -self.win_score if player_mark_perspective == self.ai_player_mark else self.win_score
         elif winner_status == "draw":
             return 0
 
-        def count_open_lines(mark):
-            score = 0
-            # Horizontal und vertikal
-            for r in range(self.board_size):
-                for c in range(self.board_size - 3):
-                    # Horizontal
-                    line = [self.board[r][c + i] for i in range(4)]
-                    if line.count(mark) > 0 and line.count(
-                            self.human_player_mark if mark == self.ai_player_mark else self.ai_player_mark) == 0:
-                        score += pow(10, line.count(mark))
-                    # Vertikal
-                    line = [self.board[c + i][r] for i in range(4)]
-                    if line.count(mark) > 0 and line.count(
-                            self.human_player_mark if mark == self.ai_player_mark else self.ai_player_mark) == 0:
-                        score += pow(10, line.count(mark))
-            # Diagonal
-            for r in range(self.board_size - 3):
-                for c in range(self.board_size - 3):
-                    line = [self.board[r + i][c + i] for i in range(4)]
-                    if line.count(mark) > 0 and line.count(
-                            self.human_player_mark if mark == self.ai_player_mark else self.ai_player_mark) == 0:
-                        score += pow(10, line.count(mark))
-            for r in range(self.board_size - 3):
-                for c in range(3, self.board_size):
-                    line = [self.board[r + i][c - i] for i in range(4)]
-                    if line.count(mark) > 0 and line.count(
-                            self.human_player_mark if mark == self.ai_player_mark else self.ai_player_mark) == 0:
-                        score += pow(10, line.count(mark))
-            return score
-
-        ai_score = count_open_lines(self.ai_player_mark)
-        human_score = count_open_lines(self.human_player_mark)
-        return ai_score - human_score if player_mark_perspective == self.ai_player_mark else human_score - ai_score
+        return self.line_score if player_mark_perspective == self.ai_player_mark else -self.line_score
 
     def get_rules(self):
         return [
-            f"Tic-Tac-Toe (Vier gewinnt) on a {self.board_size}x{self.board_size} board.\n",
+            f"Tic-Tac-Toe ({self.win_length} in a row) on a {self.board_size}x{self.board_size} board.\n",
                 f"Players take turns placing their mark ('{self.human_player_mark}' or '{self.ai_player_mark}').\n",
-                f"The first player to get 4 of their marks in a row, column, or diagonal wins.\n",
+                f"The first player to get {self.win_length} of their marks in a row, column, or diagonal wins.\n",
                 f"If the board is filled and no player has won, the game is a draw.\n",
                 f"Human plays as '{self.human_player_mark}', AI plays as '{self.ai_player_mark}'. Human starts.",
             ]
 
     # In games/tic_tac_toe.py
     def clone(self):
-        new_game = TicTacToe(self.board_size)
+        new_game = TicTacToe(self.board_size, self.win_length)
         new_game.board = [row[:] for row in self.board]
+        new_game.mark_bits = dict(self.mark_bits)
+        new_game.window_counts = {mark: counts[:] for mark, counts in self.window_counts.items()}
+        new_game.completed_windows = dict(self.completed_windows)
+        new_game.line_score = self.line_score
+        new_game.marks_placed = self.marks_placed
+        new_game.symmetry_hashes = self.symmetry_hashes
         new_game.current_player = self.current_player
+        new_game.zobrist_hash = self.zobrist_hash
         return new_game
 
+    def set_position(self, board, current_player):
+        """Sets up ``board`` with ``current_player`` to move, without move history (used by the parallel workers)."""
+        self.board = self.initialize_board()
+        self.current_player = "human"
+        self.zobrist_hash = self.zobrist.compute_hash(self.board, self.current_player)
+        # Steine über make_move setzen, damit Fensterzähler und Hashes stimmen
+        for r, row in enumerate(board):
+            for c, mark in enumerate(row):
+                if mark:
+                    self.make_move((r, c), mark)
+        self.move_stack = []
+        if self.current_player != current_player:
+            self.switch_player()
+
     def get_ai_move(self):
         """Returns the AI's move using Minimax algorithm."""
-        ai = Minimax(self, max_depth=3)  # Default depth, adjusted by GameController
-        return ai.find_best_move(self.ai_player_mark)
+        # Dieselbe Engine für alle Züge, damit die Transpositionstabelle erhalten bleibt
+        if self._ai_engine is None:
+            self._ai_engine = Minimax(self, max_depth=3)  # Default depth, adjusted by GameController
+        return self._ai_engine.find_best_move(self.ai_player_mark)
 
     def __str__(self):
         board_str = ""
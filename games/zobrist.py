@@ -0,0 +1,44 @@
+import random
+
+_TABLES = {}
+
+
+class ZobristTable:
+    """Random 64-bit keys for every (piece, square) pair plus a side-to-move key.
+
+    The keys are generated from a fixed seed so that hashes are stable across runs.
+    """
+
+    def __init__(self, board_size, pieces):
+        rng = random.Random(f"zobrist:{board_size}:{''.join(pieces)}")
+        self.board_size = board_size
+        self.piece_keys = {
+            piece: [rng.getrandbits(64) for _ in range(board_size * board_size)]
+            for piece in pieces
+        }
+        self.side_key = rng.getrandbits(64)
+
+    def square_key(self, piece, row, col):
+        return self.piece_keys[piece][row * self.board_size + col]
+
+    def compute_hash(self, board, current_player):
+        """Computes the hash of a position from scratch."""
+        h = 0
+        for r in range(self.board_size):
+            for c in range(self.board_size):
+                keys = self.piece_keys.get(board[r][c])
+                if keys is not None:
+                    h ^= keys[r * self.board_size + c]
+        if current_player == "ai":
+            h ^= self.side_key
+        return h
+
+
+def get_zobrist_table(board_size, pieces):
+    """Returns the shared ZobristTable for the given board size and piece symbols."""
+    key = (board_size, tuple(pieces))
+    table = _TABLES.get(key)
+    if table is None:
+        table = ZobristTable(board_size, pieces)
+        _TABLES[key] = table
+    return table
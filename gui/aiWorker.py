@@ -0,0 +1,46 @@
+import threading
+import traceback
+
+from gui.signalBus import bus
+
+
+class AIWorker:
+    """Runs one AI search in a background thread so the Qt event loop keeps repainting.
+
+    The search works on a clone of the game taken on the Qt thread; the result is
+    delivered through ``bus.aiMoveReady`` together with the controller's game generation,
+    so the receiver can drop results that belong to a game that was restarted or left.
+    A search that raises prints its traceback and sends ``bus.aiSearchFailed`` instead of a move.
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.generation = controller.game_generation
+        self.stop_event = threading.Event()
+        self.game_snapshot = controller.game.clone()
+        # Engine und Ponder-Lauf auf dem Qt-Thread festhalten, reset_game ersetzt sie im Controller
+        self.search = controller.capture_ai_search()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        """Asks the search to stop; no result is emitted afterwards."""
+        self.stop_event.set()
+
+    def is_cancelled(self):
+        return self.stop_event.is_set()
+
+    def _run(self):
+        try:
+            move = self.controller.search_ai_move(self.game_snapshot, stop_event=self.stop_event,
+                                                  search=self.search)
+        except Exception:
+            # Kein None-Zug senden: apply_ai_move würde ihn wie ein Passen behandeln
+            traceback.print_exc()
+            if not self.stop_event.is_set():
+                bus.aiSearchFailed.emit(self.generation)
+            return
+        if not self.stop_event.is_set():
+            bus.aiMoveReady.emit(self.generation, move)
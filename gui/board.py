@@ -7,16 +7,16 @@ class Board(QWidget):
     def __init__(self, board_state, is_dame=False, possible_moves=None):
         super().__init__()
         self.is_dame = is_dame
+        board_size = len(board_state)
+        cell_size, spacing = self.cell_metrics(board_size)
         layout = QGridLayout(self)
-        layout.setSpacing(Constants.CELL_SPACING)
-        layout.setContentsMargins(Constants.CELL_SPACING, Constants.CELL_SPACING,
-                                  Constants.CELL_SPACING, Constants.CELL_SPACING)
+        layout.setSpacing(spacing)
+        layout.setContentsMargins(spacing, spacing, spacing, spacing)
         self.setAttribute(Qt.WA_StyledBackground, True)
         self.setStyleSheet(f"""
             background-color: {Colors.CTA_HOVER};
             border-radius: 10px;
         """)
-        board_size = len(board_state)
         self.cells = {}
         self.board_state = board_state
 
@@ -39,14 +39,21 @@ class Board(QWidget):
                             image_path = 'xMark.svg'
                         elif piece == 'O':
                             image_path = 'oMark.svg'
-                cell = BoardCell(image=image_path, cellType=cellType, position=(row, col))
+                cell = BoardCell(image=image_path, cellType=cellType, position=(row, col), cell_size=cell_size)
                 layout.addWidget(cell, visual_row, col)
                 self.cells[(row, col)] = cell
 
         self.setLayout(layout)
-        totalSize = Constants.CELL_SIZE * board_size + Constants.CELL_SPACING * (board_size + 1)
+        totalSize = cell_size * board_size + spacing * (board_size + 1)
         self.setFixedSize(totalSize, totalSize)
 
+    @staticmethod
+    def cell_metrics(board_size):
+        """Cell size and spacing in pixels, so that the board fits into BOARD_MAX_SIZE."""
+        spacing = min(Constants.CELL_SPACING, Constants.CELL_SPACING * 6 // board_size)
+        cell_size = min(Constants.CELL_SIZE, (Constants.BOARD_MAX_SIZE - spacing * (board_size + 1)) // board_size)
+        return cell_size, spacing
+
     def show_possible_moves(self, possible_moves):
         for (row, col), cell in self.cells.items():
             piece = self.board_state[row][col]
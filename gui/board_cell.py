@@ -8,18 +8,20 @@ from gui.signalBus import bus
 PLAYER_PIECE_FILES = ['xMark.svg', 'oMark.svg', 'whitePiece.svg', 'blackPiece.svg']
 
 class BoardCell(QFrame):
-    def __init__(self, image=None, cellType=CellType.LIGHT, position=None):
+    def __init__(self, image=None, cellType=CellType.LIGHT, position=None, cell_size=Constants.CELL_SIZE):
         super().__init__()
         self.position = position
-        self.setFixedSize(QSize(Constants.CELL_SIZE, Constants.CELL_SIZE))
+        self.setFixedSize(QSize(cell_size, cell_size))
         self.setCursor(Qt.PointingHandCursor)
 
-        current_image_area_dimension = Constants.CELL_SIZE - 2 * Constants.PADDING
+        # Innenabstand wächst mit der Feldgröße (20 px bei 100 px großen Feldern)
+        padding = Constants.PADDING * cell_size // Constants.CELL_SIZE
+        current_image_area_dimension = cell_size - 2 * padding
         self.target_image_dimension = int(current_image_area_dimension * 1.4)
-        if self.target_image_dimension > Constants.CELL_SIZE:
-            self.target_image_dimension = Constants.CELL_SIZE
+        if self.target_image_dimension > cell_size:
+            self.target_image_dimension = cell_size
         
-        new_layout_padding = (Constants.CELL_SIZE - self.target_image_dimension) // 2
+        new_layout_padding = (cell_size - self.target_image_dimension) // 2
         if new_layout_padding < 0:
             new_layout_padding = 0
 
@@ -19,6 +19,8 @@ class Constants:
     BOARD_WIDTH = 1280
     BOARD_HEIGHT = 820
     CELL_SPACING = 20
+    # Größe des 6x6-Bretts; größere Bretter verkleinern Felder und Abstände, um hineinzupassen
+    BOARD_MAX_SIZE = 6 * CELL_SIZE + 7 * CELL_SPACING
 
 class CellType(Enum):
     LIGHT = "light"
@@ -1,21 +1,103 @@
-from games.dame import Dame
+import itertools
+import threading
+
+from games.dame import EMPTY, BOARD_SIZES as DAME_BOARD_SIZES
+from games.dame_bitboard import BitboardDame
 from games.tic_tac_toe import TicTacToe
 from ai.minimax import Minimax
+from ai.mcts import MCTS
+from ai.opening_book import get_opening_book
+from ai.tablebase import get_tablebase
+from ai.threat_space import ThreatSpaceSearch
+from ai.proof_number import ProofNumberSearch
+from ai.batch_eval import get_batch_evaluator
+
+# Brettgröße, für die Eröffnungsbücher und Endspieldatenbank erzeugt wurden
+DEFAULT_BOARD_SIZE = 6
+
+# Fortlaufende Spielnummern über alle Controller hinweg, damit verspätete KI-Ergebnisse erkannt werden
+_game_generations = itertools.count(1)
 
 class GameController:
-    def __init__(self, game_type="Dame", difficulty=3):
+    # Obergrenze für die Bedenkzeit der KI pro Zug
+    AI_TIME_LIMIT_MS = 3000
+    # Anzahl der wahrscheinlichsten Menschenzüge, die beim Pondering vorausberechnet werden
+    PONDER_CANDIDATES = 3
+    # Obergrenze der iterativen Vertiefung für Dame je Schwierigkeit, solange AI_TIME_LIMIT_MS die Bedenkzeit begrenzt
+    DAME_SEARCH_DEPTHS = {1: 1, 3: 6, 5: 10}
+    # KI-Engine je Spielart: "minimax" (ai/minimax.py) oder "mcts" (ai/mcts.py)
+    AI_ENGINES = {"Dame": "minimax", "TicTacToe": "minimax"}
+
+    def __init__(self, game_type="Dame", difficulty=3, ai_time_limit_ms=AI_TIME_LIMIT_MS, ai_parallel_workers=None,
+                 ai_ponder=False, ai_opening_book=True, ai_tablebase=True, ai_engine=None, board_size=DEFAULT_BOARD_SIZE):
+        self.board_size = board_size
         self.game = self._create_game(game_type)
+        self.game_type = game_type
+        self.engine_type = ai_engine or self.AI_ENGINES[game_type]
         self.difficulty = difficulty
+        self.ai_time_limit_ms = ai_time_limit_ms
+        self.ai_parallel_workers = ai_parallel_workers
+        self.ai_ponder = ai_ponder
+        # Eröffnungsbuch aus ai/books; None, wenn abgeschaltet, die Datei fehlt oder das Brett nicht 6x6 ist
+        use_book = ai_opening_book and board_size == DEFAULT_BOARD_SIZE
+        self.opening_book = get_opening_book(game_type) if use_book else None
+        # Endspieldatenbank aus ai/books, nur für Dame
+        self.tablebase = get_tablebase(self.game.board_size) if ai_tablebase and game_type == "Dame" else None
+        # Gebündelte NumPy-Bewertung der letzten Ebene für TicTacToe; None ohne numpy
+        self.batch_evaluator = get_batch_evaluator(self.game.board_size, self.game.win_length) if game_type == "TicTacToe" else None
+        self._create_search_state()
+        self.ponder_results = {}
+        self.ponder_hits = 0
+        self._ponder_thread = None
+        self._ponder_stop = None
         self.selected_piece = None
         self.possible_moves = []
-        self.game_type = game_type
+        # Bereits angeklickte Landefelder der gewählten Schlagkette
+        self.chain_path = []
         self.mandatory_human_captures = []
+        self.game_generation = next(_game_generations)
+
+    @staticmethod
+    def _selective_search_options(game_type):
+        # Reduktionen und Pruning nur für Dame; TicTacToe wird ohnehin vollständig durchsucht.
+        # Kein Null-Move: Dame-Steine ziehen nur vorwärts, Zugzwang ist häufig und der Null-Move wählte schlechtere Züge
+        enabled = game_type == "Dame"
+        return {"use_lmr": enabled, "use_null_move": False, "use_futility": enabled}
+
+    def _search_depth(self):
+        """Depth limit of the search: ``difficulty``, for Dame with Minimax and a time limit the deeper DAME_SEARCH_DEPTHS."""
+        if self.game_type == "Dame" and self.engine_type == "minimax" and self.ai_time_limit_ms is not None:
+            return self.DAME_SEARCH_DEPTHS.get(self.difficulty, self.difficulty)
+        return self.difficulty
+
+    def _create_engine(self, game, pondering=False):
+        """Creates the engine chosen by ``engine_type``; the ponder engine shares the table of ``engine``."""
+        if self.engine_type == "mcts":
+            return MCTS(game, max_depth=self.difficulty, batch_evaluator=self.batch_evaluator)
+        if self.engine_type != "minimax":
+            raise ValueError(f"Unknown AI engine: {self.engine_type}")
+        return Minimax(game, max_depth=self._search_depth(), use_transposition_table=not pondering,
+                       parallel_workers=None if pondering else self.ai_parallel_workers, search_mode="pvs",
+                       opening_book=self.opening_book, tablebase=self.tablebase, threat_search=self.threat_search,
+                       proof_search=self.proof_search, batch_evaluator=self.batch_evaluator,
+                       **self._selective_search_options(self.game_type))
+
+    def _create_search_state(self):
+        # Erzwungene Drohfolgen (Vierer) für TicTacToe vor und in der Suche
+        self.threat_search = ThreatSpaceSearch() if self.game_type == "TicTacToe" else None
+        # Beweiszahlsuche für Dame-Endspiele; Suche und Pondering laufen nie gleichzeitig, der Speicher wird geteilt
+        self.proof_search = ProofNumberSearch() if self.game_type == "Dame" else None
+        # Eine Engine für das ganze Spiel: die Transpositionstabelle bleibt zwischen den Zügen erhalten
+        self.engine = self._create_engine(self.game)
+        self._ponder_engine = None
 
     def _create_game(self, game_type):
         if game_type == "Dame":
-            return Dame()
+            if self.board_size not in DAME_BOARD_SIZES:
+                raise ValueError(f"Unsupported Dame board size: {self.board_size}")
+            return BitboardDame(self.board_size)
         elif game_type == "TicTacToe":
-            return TicTacToe()
+            return TicTacToe(self.board_size)
         else:
             raise ValueError("Unknown game type")
 
@@ -60,13 +142,12 @@ class GameController:
         if self.selected_piece is not None:
             current_selected_coord = self.selected_piece
 
-            chosen_move = None
-            for move_option in self.possible_moves:
-                if move_option[2] == position:
-                    chosen_move = move_option
-                    break
+            chosen_move, next_hops = self._select_chain_hop(position)
+            if next_hops:
+                return next_hops, None
 
             if chosen_move:
+                self.stop_pondering()
                 valid, further_capture = self.game.make_move(chosen_move, self.game.human_player_piece)
                 if valid:
                     win_status = self.game.check_win_condition()
@@ -82,7 +163,7 @@ class GameController:
                         if not self.possible_moves:
                             self.reset_selection(clear_turn_mandatory_captures=True)
                             return None, "ai_turn_pending"
-                        return self.possible_moves, None
+                        return self._next_hops(self.possible_moves), None
                     else:
                         self.reset_selection(clear_turn_mandatory_captures=True)
                         return None, "ai_turn_pending"
@@ -121,11 +202,42 @@ class GameController:
             if not self.possible_moves: 
                 self.reset_selection(clear_turn_mandatory_captures=False)
                 return None, None
-            return self.possible_moves, None
+            return self._next_hops(self.possible_moves), None
         else:
             return None, None
 
+    @staticmethod
+    def _landing_path(move):
+        # Landefelder einer Schlagkette, bei einfachen Zügen nur das Zielfeld
+        return list(move[4]) if move[0] == "capture" and len(move) > 4 else [move[2]]
+
+    def _next_hops(self, moves):
+        """Returns the landing squares of the next hop of ``moves`` after ``chain_path``, for the move indicators."""
+        hop = len(self.chain_path)
+        return list(dict.fromkeys(self._landing_path(move)[hop] for move in moves))
+
+    def _select_chain_hop(self, position):
+        """Returns ``(move, next_hops)`` for a click on ``position`` while a piece is selected.
+
+        Capture chains are chosen hop by hop along their landing squares (``move[4]``), so chains that
+        end on the same square can be told apart. The move is returned as soon as only one chain fits
+        the clicked squares; otherwise the click is added to ``chain_path`` and the squares of the next
+        hop are returned. ``(None, [])`` if ``position`` is no landing square.
+        """
+        hop = len(self.chain_path)
+        matching = [move for move in self.possible_moves
+                    if self._landing_path(move)[:hop + 1] == self.chain_path + [position]]
+        if not matching:
+            return None, []
+        if len(matching) == 1 or all(len(self._landing_path(move)) == hop + 1 for move in matching):
+            return matching[0], []
+        self.chain_path.append(position)
+        self.possible_moves = matching
+        return None, self._next_hops(matching)
+
     def _handle_tictactoe_click(self, position):
+        if self.game.board[position[0]][position[1]] == '':
+            self.stop_pondering()
         valid = self.game.make_move(position, self.game.human_player_mark)
         if valid:
             win_status = self.game.check_win_condition()
@@ -146,32 +258,94 @@ class GameController:
     def reset_selection(self, clear_turn_mandatory_captures=False):
         self.selected_piece = None
         self.possible_moves = []
+        self.chain_path = []
         if clear_turn_mandatory_captures:
             self.mandatory_human_captures = []
 
     def _resync_dame_piece_sets(self):
         if self.game_type != "Dame":
             return
-        self.game.human_pieces.clear()
-        self.game.ai_pieces.clear()
+        human_pieces = set()
+        ai_pieces = set()
         for row in range(self.game.board_size):
             for col in range(self.game.board_size):
                 if self.game.board[row][col] == self.game.human_player_piece:
-                    self.game.human_pieces.add((row, col))
+                    human_pieces.add((row, col))
                 elif self.game.board[row][col] == self.game.ai_player_piece:
-                    self.game.ai_pieces.add((row, col))
+                    ai_pieces.add((row, col))
+        self.game.human_pieces = human_pieces
+        self.game.ai_pieces = ai_pieces
 
     def make_ai_move(self):
         if self.game.is_game_over():
             self.mandatory_human_captures = []
             return self.game.check_win_condition(), False
-        
+
         if self.game.current_player != "ai":
             return self.game.check_win_condition(), False
 
-        ai = Minimax(self.game, max_depth=self.difficulty)
-        ai_player_id = self.game.ai_player_piece if self.game_type == "Dame" else self.game.ai_player_mark
-        ai_move = ai.find_best_move(ai_player_id)
+        ai_move = self.search_ai_move(self.game)
+        return self.apply_ai_move(ai_move)
+
+    def capture_ai_search(self):
+        """Returns the engine and the pondering run that the next AI search uses.
+
+        Called on the Qt thread (``AIWorker`` does it when it is created), so that a search that is
+        still ending after ``reset_game`` keeps the objects of its own game.
+        """
+        return self.engine, self._ponder_thread, self._ponder_stop, self.ponder_results
+
+    def search_ai_move(self, game_snapshot, stop_event=None, search=None):
+        """Runs the Minimax search on ``game_snapshot`` and returns the AI move without applying it.
+
+        Safe to call from a worker thread as long as ``game_snapshot`` is not the live game and
+        ``search`` comes from ``capture_ai_search`` (see ``gui/aiWorker.py``). ``stop_event`` cancels
+        the search. If the position was already searched to full depth while pondering, that move
+        is returned without a new search.
+        """
+        engine, ponder_thread, ponder_stop, ponder_results = search or self.capture_ai_search()
+        # Nur den mitgegebenen Lauf beenden: self._ponder_thread gehört dem Qt-Thread
+        if ponder_thread is not None:
+            ponder_stop.set()
+            ponder_thread.join()
+        pondered = ponder_results.get(game_snapshot.zobrist_hash)
+        if pondered is not None and pondered[1] >= self._search_depth():
+            self.ponder_hits += 1
+            return pondered[0]
+
+        engine.game_logic_instance = game_snapshot
+        engine.max_depth = self._search_depth()
+        ai_player_id = game_snapshot.ai_player_piece if self.game_type == "Dame" else game_snapshot.ai_player_mark
+        return engine.find_best_move(ai_player_id, time_limit_ms=self.ai_time_limit_ms, stop_event=stop_event)
+
+    def move_animation_frames(self, move):
+        """Returns the boards between the hops of a Dame capture chain, without the final board.
+
+        A chain is one move (``["capture", from, to, captured, path]``), so the search runs once per
+        chain; the GUI shows these frames one after another before the board after ``apply_ai_move``.
+        Empty for simple moves, single captures and TicTacToe.
+        """
+        if self.game_type != "Dame" or not move or move[0] != "capture" or len(move) < 5 or len(move[4]) < 2:
+            return []
+        piece = self.game.board[move[1][0]][move[1][1]]
+        board = [row[:] for row in self.game.board]
+        frames = []
+        position = move[1]
+        for (cap_r, cap_c), (land_r, land_c) in zip(move[3][:-1], move[4][:-1]):
+            board[position[0]][position[1]] = EMPTY
+            board[cap_r][cap_c] = EMPTY
+            board[land_r][land_c] = piece
+            position = (land_r, land_c)
+            frames.append([row[:] for row in board])
+        return frames
+
+    def apply_ai_move(self, ai_move):
+        if self.game.is_game_over():
+            self.mandatory_human_captures = []
+            return self.game.check_win_condition(), False
+
+        if self.game.current_player != "ai":
+            return self.game.check_win_condition(), False
 
         if not ai_move:
             if self.game_type == "Dame":
@@ -204,6 +378,84 @@ class GameController:
         
         return current_win_status, ai_has_more_moves_now
 
+    def start_pondering(self):
+        """Searches the AI's answers to the most likely human replies in a background thread.
+
+        Only a clone of the game is searched. Results are stored by position hash in
+        ``ponder_results`` and the transposition entries go to the table of ``engine``; both are
+        used by ``search_ai_move`` once the human has moved.
+        """
+        # Normalerweise hat search_ai_move den vorigen Lauf schon abgewartet; Engine und Tabelle nie doppelt nutzen
+        self.stop_pondering(wait=True)
+        if not self.ai_ponder or self.game.is_game_over() or self.game.current_player != "human":
+            return
+        self.ponder_results = {}
+        if self._ponder_engine is None:
+            self._ponder_engine = self._create_engine(self.game, pondering=True)
+        self._ponder_stop = threading.Event()
+        # Engine, Tabelle und Ergebnisse werden hier festgelegt: nach reset_game läuft ein alter Lauf auf den alten aus
+        self._ponder_thread = threading.Thread(
+            target=self._ponder, args=(self.game.clone(), self._ponder_stop, self._ponder_engine,
+                                       self.engine.transposition_table, self.ponder_results),
+            daemon=True)
+        self._ponder_thread.start()
+
+    def stop_pondering(self, wait=False):
+        """Stops a running ponder search; with ``wait`` also waits until the thread has ended.
+
+        The Qt thread only sets the event. ``search_ai_move`` waits in the worker thread for the run
+        captured by ``capture_ai_search`` before it uses the table that pondering fills; the search
+        checks the event every few hundred nodes.
+        """
+        ponder_thread = self._ponder_thread
+        if ponder_thread is not None:
+            self._ponder_stop.set()
+            if wait:
+                ponder_thread.join()
+                self._ponder_thread = None
+
+    def _player_ids(self, game):
+        if self.game_type == "Dame":
+            return game.human_player_piece, game.ai_player_piece
+        return game.human_player_mark, game.ai_player_mark
+
+    def _predict_human_replies(self, game_snapshot):
+        """Returns the human moves with the best static evaluation for the human, best first."""
+        human_id, _ = self._player_ids(game_snapshot)
+        if self.game_type == "Dame":
+            moves = game_snapshot.get_all_possible_moves(human_id)
+        else:
+            moves = game_snapshot.get_possible_moves()
+        scored = []
+        for move in moves:
+            game_snapshot.make_move(move, human_id)
+            scored.append((game_snapshot.evaluate_board(human_id), move))
+            game_snapshot.undo_move()
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [move for _, move in scored[:self.PONDER_CANDIDATES]]
+
+    def _ponder(self, game_snapshot, stop_event, engine, transposition_table, ponder_results):
+        human_id, ai_id = self._player_ids(game_snapshot)
+        # Pondering füllt dieselbe Tabelle, die danach die echte Suche verwendet
+        engine.transposition_table = transposition_table
+        engine.max_depth = self._search_depth()
+        for move in self._predict_human_replies(game_snapshot):
+            if stop_event.is_set():
+                break
+            game_snapshot.make_move(move, human_id)
+            # Nur Stellungen, in denen danach die KI am Zug ist (keine Mehrfachsprünge des Menschen)
+            if game_snapshot.current_player == "ai" and not game_snapshot.is_game_over():
+                engine.game_logic_instance = game_snapshot
+                ai_move = engine.find_best_move(ai_id, time_limit_ms=self.ai_time_limit_ms, stop_event=stop_event)
+                if ai_move is not None:
+                    ponder_results[game_snapshot.zobrist_hash] = (ai_move, engine.completed_depth)
+            game_snapshot.undo_move()
+
     def reset_game(self):
+        self.stop_pondering()
+        self.ponder_results = {}
+        self.game_generation = next(_game_generations)
         self.game = self._create_game(self.game_type)
+        # Neue Engine und Löser statt engine.new_game(): eine abgebrochene Suche kann auf den alten noch auslaufen
+        self._create_search_state()
         self.reset_selection(clear_turn_mandatory_captures=True)
\ No newline at end of file
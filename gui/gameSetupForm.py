@@ -4,9 +4,11 @@ from PySide6.QtGui import QFontDatabase, QFont
 import os
 from gui.menuContainer import MenuContainer
 from gui.core.confiq import Colors
+from games.dame import BOARD_SIZES
+from games.tic_tac_toe import BOARD_SIZE as TIC_TAC_TOE_BOARD_SIZE
 
 class GameSetupForm(MenuContainer):
-    playRequested = Signal(str, int)
+    playRequested = Signal(str, int, int)
 
     def __init__(self, parent=None):
         super().__init__(parent, padding=40)
@@ -32,6 +34,9 @@ class GameSetupForm(MenuContainer):
         self.difficulties = ["Easy", "Medium", "Hard"]
         self.selected_game = self.games[0]
         self.selected_difficulty = self.difficulties[1]
+        # Brettgröße nur für Dame wählbar, TicTacToe spielt immer auf TIC_TAC_TOE_BOARD_SIZE
+        self.board_sizes = [f"{size}x{size}" for size in BOARD_SIZES]
+        self.selected_board_size = self.board_sizes[0]
 
         self.gamemode_label = QLabel("Gamemode")
         self.gamemode_label.setFont(self.title_font)
@@ -81,13 +86,43 @@ class GameSetupForm(MenuContainer):
         self._update_difficulty_button_styles()
         self.difficulty_buttons_widget.setFixedWidth(450)
 
+        self.board_size_spacing = QWidget()
+        self.board_size_spacing.setFixedHeight(30)
+        self.addWidget(self.board_size_spacing)
+
+        self.board_size_label = QLabel("Board Size")
+        self.board_size_label.setFont(self.title_font)
+        self.board_size_label.setStyleSheet(f"color: {Colors.FONT_PRIMARY}; margin-bottom: 10px;")
+        self.board_size_label.setAlignment(Qt.AlignCenter)
+        self.addWidget(self.board_size_label)
+
+        self.board_size_buttons_layout = QHBoxLayout()
+        self.board_size_buttons_layout.setSpacing(0)
+        self.board_size_buttons_widget = QWidget()
+        self.board_size_buttons_widget.setLayout(self.board_size_buttons_layout)
+        self.board_size_button_group = []
+
+        for size_name in self.board_sizes:
+            button = QPushButton(size_name)
+            button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+            button.clicked.connect(self.on_board_size_selected)
+            self.board_size_buttons_layout.addWidget(button)
+            self.board_size_button_group.append(button)
+
+        self.addWidget(self.board_size_buttons_widget)
+        self._update_board_size_button_styles()
+        self.board_size_buttons_widget.setFixedWidth(450)
+
         game_group_height = self.gamemode_buttons_widget.sizeHint().height()
         diff_group_height = self.difficulty_buttons_widget.sizeHint().height()
-        max_group_height = max(game_group_height, diff_group_height)
+        size_group_height = self.board_size_buttons_widget.sizeHint().height()
+        max_group_height = max(game_group_height, diff_group_height, size_group_height)
         
         if max_group_height > 0:
             self.gamemode_buttons_widget.setFixedHeight(max_group_height)
             self.difficulty_buttons_widget.setFixedHeight(max_group_height)
+            self.board_size_buttons_widget.setFixedHeight(max_group_height)
+        self._update_board_size_visibility()
         
         self.layout.addSpacing(30) 
 
@@ -145,6 +180,7 @@ class GameSetupForm(MenuContainer):
         sender_button = self.sender()
         self.selected_game = sender_button.text()
         self._update_game_button_styles()
+        self._update_board_size_visibility()
 
     def _update_game_button_styles(self):
         total_buttons = len(self.game_button_group)
@@ -165,6 +201,24 @@ class GameSetupForm(MenuContainer):
             button.setStyleSheet(self._get_button_style(is_selected, i, total_buttons))
             button.setFont(self.default_font)
 
+    def on_board_size_selected(self):
+        sender_button = self.sender()
+        self.selected_board_size = sender_button.text()
+        self._update_board_size_button_styles()
+
+    def _update_board_size_button_styles(self):
+        total_buttons = len(self.board_size_button_group)
+        for i, button in enumerate(self.board_size_button_group):
+            is_selected = (button.text() == self.selected_board_size)
+            button.setStyleSheet(self._get_button_style(is_selected, i, total_buttons))
+            button.setFont(self.default_font)
+
+    def _update_board_size_visibility(self):
+        is_dame = self.selected_game == "Dame"
+        self.board_size_spacing.setVisible(is_dame)
+        self.board_size_label.setVisible(is_dame)
+        self.board_size_buttons_widget.setVisible(is_dame)
+
     def _on_play_clicked(self):
         game = self.selected_game
         difficulty_text = self.selected_difficulty
@@ -175,5 +229,6 @@ class GameSetupForm(MenuContainer):
             "Hard": 5
         }
         difficulty_value = difficulty_map.get(difficulty_text, 3)
+        board_size = int(self.selected_board_size.split("x")[0]) if game == "Dame" else TIC_TAC_TOE_BOARD_SIZE
         
-        self.playRequested.emit(game, difficulty_value)
\ No newline at end of file
+        self.playRequested.emit(game, difficulty_value, board_size)
\ No newline at end of file
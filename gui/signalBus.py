@@ -2,5 +2,9 @@ from PySide6.QtCore import QObject, Signal
 
 class SignalBus(QObject):
     cellClicked = Signal(object)
+    # (game_generation, move) - wird vom KI-Thread gesendet und im Qt-Thread verarbeitet
+    aiMoveReady = Signal(int, object)
+    # (game_generation) - die KI-Suche ist mit einer Ausnahme abgebrochen
+    aiSearchFailed = Signal(int)
 
-bus = SignalBus()
\ No newline at end of file
+bus = SignalBus()
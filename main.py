@@ -7,6 +7,7 @@ from gui.core.confiq import Colors, Constants
 from gui.window import WindowModule, Pivot
 from gui.signalBus import bus
 from gui.gameController import GameController
+from gui.aiWorker import AIWorker
 from gui.loginForm import LoginForm
 from gui.signupForm import SignupForm
 from gui.gameSetupForm import GameSetupForm
@@ -42,6 +43,9 @@ class GridWindowModule(WindowModule):
             painter.drawLine(0, y, width, y)
 
 class MainWindow(QMainWindow):
+    # Pause zwischen den Sprüngen einer Schlagkette der KI
+    AI_HOP_DELAY_MS = 500
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Strategy Games")
@@ -60,6 +64,7 @@ class MainWindow(QMainWindow):
         self.image = None
         self.play_button = None
         self.is_ai_thinking = False
+        self.ai_worker = None
         
         self.game_over_overlay = None # Initialize for the new overlay widget
 
@@ -70,6 +75,8 @@ class MainWindow(QMainWindow):
         self._setup_game_over_overlay() # NEW: Setup the overlay instance
 
         bus.cellClicked.connect(self.handle_cell_click)
+        bus.aiMoveReady.connect(self._on_ai_move_ready)
+        bus.aiSearchFailed.connect(self._on_ai_search_failed)
 
         self.login_form.loginAttempt.connect(self._handle_user_login_attempt)
         self.login_form.guestAccessRequested.connect(self._handle_guest_access)
@@ -223,6 +230,7 @@ class MainWindow(QMainWindow):
         if self.board:
             self.windowModule.removeWidget(self.board)
             self.board = None
+        self._cancel_ai_search()
         if self.controller:
             self.controller = None
         if self.rules_toggle: self.rules_toggle.hide()
@@ -300,24 +308,29 @@ class MainWindow(QMainWindow):
             self.signup_form.display_error(error_message)
             # No username to display yet
 
-    def _handle_game_start(self, game_type, difficulty):
-        print(f"Starting game: {game_type} at difficulty {difficulty}")
+    def _handle_game_start(self, game_type, difficulty, board_size=6):
+        print(f"Starting game: {game_type} ({board_size}x{board_size}) at difficulty {difficulty}")
+        # Laufende Suche zuerst abbrechen, bevor der Controller zurückgesetzt wird
+        self._cancel_ai_search()
         self.set_difficulty(difficulty)
-        self.set_game(game_type)
+        self.set_game(game_type, board_size)
 
     def set_difficulty(self, difficulty):
         self.current_difficulty = difficulty
         if self.controller:
+            self._cancel_ai_search()
             self.controller.set_difficulty(difficulty)
         print(f"Difficulty set to: {self.current_difficulty}")
 
-    def set_game(self, game_type):
+    def set_game(self, game_type, board_size=6):
         print(f"set_game called with type: {game_type}")
+        self._cancel_ai_search()
         if self.board:
             self.windowModule.removeWidget(self.board)
             self.board = None
 
-        self.controller = GameController(game_type=game_type, difficulty=self.current_difficulty)
+        self.controller = GameController(game_type=game_type, difficulty=self.current_difficulty, ai_ponder=True,
+                                         board_size=board_size)
         self.board = Board(self.controller.get_board(), is_dame=(game_type == "Dame"))
 
         self.windowModule.addChildWidget(
@@ -349,12 +362,50 @@ class MainWindow(QMainWindow):
         self._update_violated_rules() # Moved here to update after human move or AI move processed immediately
 
     def _process_ai_move(self):
-        if not self.controller or not self.board:
-            self.is_ai_thinking = False # Reset flag in case of error
+        if not self.controller or not self.board or not self.is_ai_thinking:
+            self.is_ai_thinking = False # Reset flag in case of error or cancelled search
             return
 
-        win_status_after_ai, ai_has_more_moves = self.controller.make_ai_move()
-        
+        # Die Suche läuft in einem Hintergrund-Thread, das Ergebnis kommt über bus.aiMoveReady
+        self.ai_worker = AIWorker(self.controller)
+        self.ai_worker.start()
+
+    def _on_ai_move_ready(self, generation, ai_move):
+        if self.ai_worker is None or self.ai_worker.is_cancelled():
+            return
+        self.ai_worker = None
+        if not self.controller or not self.board or generation != self.controller.game_generation:
+            return # Ergebnis gehört zu einem verlassenen oder neu gestarteten Spiel
+
+        # Zwischenstellungen einer Schlagkette vor dem Anwenden berechnen, danach Sprung für Sprung zeigen
+        frames = self.controller.move_animation_frames(ai_move)
+        win_status_after_ai, ai_has_more_moves = self.controller.apply_ai_move(ai_move)
+        if frames:
+            self._show_ai_hop(generation, frames, win_status_after_ai, ai_has_more_moves)
+        else:
+            self._finish_ai_move(win_status_after_ai, ai_has_more_moves)
+
+    def _on_ai_search_failed(self, generation):
+        if self.ai_worker is None or self.ai_worker.is_cancelled():
+            return
+        self.ai_worker = None
+        if not self.controller or generation != self.controller.game_generation:
+            return
+        # Kein Zug anwenden: die KI bleibt am Zug, das Spiel kann neu gestartet werden
+        print("AI search failed, see the traceback above.")
+        self.is_ai_thinking = False
+
+    def _show_ai_hop(self, generation, frames, win_status_after_ai, ai_has_more_moves):
+        if not self.controller or not self.board or generation != self.controller.game_generation:
+            return # Spiel wurde während der Animation verlassen oder neu gestartet
+        if not frames:
+            self._finish_ai_move(win_status_after_ai, ai_has_more_moves)
+            return
+        self.board.update_board(frames[0])
+        QTimer.singleShot(self.AI_HOP_DELAY_MS, lambda: self._show_ai_hop(
+            generation, frames[1:], win_status_after_ai, ai_has_more_moves))
+
+    def _finish_ai_move(self, win_status_after_ai, ai_has_more_moves):
         self.board.update_board(self.controller.get_board())
         self.board.show_possible_moves([]) # Clear any previous possible moves
         self._update_violated_rules() # Update rules after AI move
@@ -368,6 +419,15 @@ class MainWindow(QMainWindow):
         else:
             # AI turn is fully complete
             self.is_ai_thinking = False # Reset flag
+            self.controller.start_pondering() # Während der Mensch überlegt, mögliche Antworten vorausberechnen
+
+    def _cancel_ai_search(self):
+        if self.ai_worker:
+            self.ai_worker.cancel()
+            self.ai_worker = None
+        if self.controller:
+            self.controller.stop_pondering()
+        self.is_ai_thinking = False
 
     def _update_violated_rules(self):
         if not self.controller or not self.rules_toggle:
@@ -445,6 +505,7 @@ class MainWindow(QMainWindow):
         self.game_over_overlay.raise_() # Bring to front
 
     def handle_restart_game(self):
+        self._cancel_ai_search()
         if self.controller:
             self.controller.reset_game()
             self.board.update_board(self.controller.get_board())
@@ -453,10 +514,12 @@ class MainWindow(QMainWindow):
 
     def _navigate_to_homepage(self):
         # Potentially add any cleanup logic here if views need it before switching
+        self._cancel_ai_search()
         self._show_homepage()
     
     def _handle_logout(self):
         print("User logging out.")
+        self._cancel_ai_search()
         self.current_user_id = None
         self.current_username = None
         self.windowModule.update_username_display(None) # This will hide username and logout button
@@ -1,5 +1,7 @@
+import random
 import sys
 from games.dame import Dame
+from games.dame_bitboard import BitboardDame
 from ai.minimax import Minimax
 
 def test_dame_minimax():
@@ -51,5 +53,446 @@ def test_dame_minimax():
 
     print("Test completed successfully!")
 
+def test_dame_zobrist_hash_is_incremental():
+    game = Dame()
+    for _ in range(8):
+        if game.is_game_over():
+            break
+        moves = game.get_all_possible_moves(game.current_player_piece)
+        game.make_move(moves[0], game.current_player_piece)
+        assert game.zobrist_hash == game.zobrist.compute_hash(game.board, game.current_player)
+
+
+def test_dame_undo_move_restores_state():
+    game = Dame()
+    game.board = [['_'] * 6 for _ in range(6)]
+    game.human_pieces = {(2, 2)}
+    game.ai_pieces = {(3, 3), (5, 5), (3, 1)}
+    for r, c in game.human_pieces:
+        game.board[r][c] = game.human_player_piece
+    for r, c in game.ai_pieces:
+        game.board[r][c] = game.ai_player_piece
+    game.zobrist_hash = game.zobrist.compute_hash(game.board, game.current_player)
+    before = ([row[:] for row in game.board], set(game.human_pieces), set(game.ai_pieces), game.current_player, game.zobrist_hash)
+
+    capture = ["capture", (2, 2), (4, 4), [(3, 3)]]
+    valid, further_capture = game.make_move(capture, game.human_player_piece)
+    assert valid and not further_capture
+    assert game.current_player == "ai"
+    assert game.undo_move()
+    after = (game.board, game.human_pieces, game.ai_pieces, game.current_player, game.zobrist_hash)
+    assert after == before
+    assert not game.undo_move()
+
+
+def test_dame_caches_moves_per_position():
+    game = Dame()
+    moves = game.get_all_possible_moves(game.human_player_piece)
+    assert game.get_all_possible_moves(game.human_player_piece) is moves
+    assert game.check_win_condition() is None
+
+    game.make_move(moves[0], game.human_player_piece)
+    ai_moves = game.get_all_possible_moves(game.ai_player_piece)
+    assert ai_moves == game._generate_all_moves(game.ai_player_piece)
+    assert game.get_capture_moves(game.ai_player_piece) == [m for m in ai_moves if m[0] == "capture"]
+
+    game.undo_move()
+    assert game.get_all_possible_moves(game.human_player_piece) == moves
+    assert game.get_all_possible_moves(game.ai_player_piece) == game._generate_all_moves(game.ai_player_piece)
+
+
+def test_bitboard_dame_matches_dame():
+    rng = random.Random(7)
+    for _ in range(20):
+        game, bitboard_game = Dame(), BitboardDame()
+        while not game.is_game_over():
+            assert bitboard_game.board == game.board
+            assert bitboard_game.zobrist_hash == game.zobrist_hash
+            assert bitboard_game.check_win_condition() == game.check_win_condition()
+            assert bitboard_game.evaluate_board(game.ai_player_piece) == game.evaluate_board(game.ai_player_piece)
+            moves = game.get_all_possible_moves(game.current_player_piece)
+            assert sorted(map(repr, bitboard_game.get_all_possible_moves(game.current_player_piece))) == sorted(map(repr, moves))
+            move = rng.choice(moves)
+            assert bitboard_game.make_move(move, game.current_player_piece) == game.make_move(move, game.current_player_piece)
+        assert bitboard_game.check_win_condition() == game.check_win_condition()
+        while game.undo_move():
+            assert bitboard_game.undo_move()
+            assert bitboard_game.board == game.board
+
+
+def test_dame_minimax_transposition_table_keeps_best_move():
+    game = Dame()
+    game.make_move(game.get_all_possible_moves(game.human_player_piece)[0], game.human_player_piece)
+    with_table = Minimax(game, max_depth=4).find_best_move(game.ai_player_piece)
+    without_table = Minimax(game, max_depth=4, use_transposition_table=False).find_best_move(game.ai_player_piece)
+    assert with_table == without_table
+
+
+def test_dame_pvs_matches_alphabeta():
+    rng = random.Random(7)
+    for _ in range(6):
+        game = BitboardDame()
+        for _ in range(rng.randint(2, 8)):
+            moves = game.get_all_possible_moves(game.current_player_piece)
+            if not moves or game.is_game_over():
+                break
+            game.make_move(rng.choice(moves), game.current_player_piece)
+        if game.is_game_over() or game.current_player != "ai":
+            continue
+        alphabeta = Minimax(game, max_depth=8, use_transposition_table=False)
+        pvs = Minimax(game, max_depth=8, use_transposition_table=False, search_mode="pvs")
+        assert pvs.find_best_move(game.ai_player_piece) == alphabeta.find_best_move(game.ai_player_piece)
+
+
+def test_dame_quiescence_sees_capture_behind_horizon():
+    from games.dame import EMPTY
+    game = BitboardDame()
+    game.board = [[EMPTY] * game.board_size for _ in range(game.board_size)]
+    human, ai = {(1, 1), (0, 4)}, {(3, 3), (5, 1)}
+    for r, c in human:
+        game.board[r][c] = game.human_player_piece
+    for r, c in ai:
+        game.board[r][c] = game.ai_player_piece
+    game.human_pieces, game.ai_pieces = human, ai
+    game.current_player = "ai"
+    game.zobrist_hash = game.zobrist.compute_hash(game.board, game.current_player)
+
+    hanging_move = ["move", (3, 3), (2, 2)]  # wird von (1, 1) geschlagen
+    assert Minimax(game, max_depth=1, use_quiescence=False).find_best_move(game.ai_player_piece) == hanging_move
+    for search_mode in ("alphabeta", "pvs"):
+        engine = Minimax(game, max_depth=1, search_mode=search_mode)
+        assert engine.find_best_move(game.ai_player_piece) != hanging_move
+
+
+def test_dame_controller_keeps_engine_between_moves():
+    from gui.gameController import GameController
+
+    # Ohne Eröffnungsbuch, sonst beantwortet das Buch die ersten Züge ohne Suche
+    controller = GameController(game_type="Dame", difficulty=3, ai_time_limit_ms=None, ai_opening_book=False)
+    engine = controller.engine
+    for _ in range(2):
+        human_move = controller.game.get_all_possible_moves(controller.game.human_player_piece)[0]
+        controller.game.make_move(human_move, controller.game.human_player_piece)
+        controller.make_ai_move()
+    assert controller.engine is engine
+    assert len(engine.transposition_table) > 0
+
+    # Neue Partie, neue Engine: eine abgebrochene Suche kann noch auf der alten laufen
+    controller.reset_game()
+    assert controller.engine is not engine
+    assert controller.engine.game_logic_instance is controller.game
+    assert len(controller.engine.transposition_table) == 0
+
+
+def test_dame_kept_table_saves_nodes_on_next_move():
+    from gui.gameController import GameController
+
+    controller = GameController(game_type="Dame", difficulty=5, ai_time_limit_ms=None, ai_opening_book=False,
+                                ai_tablebase=False)
+    game = controller.game
+    game.make_move(game.get_all_possible_moves(game.human_player_piece)[0], game.human_player_piece)
+    controller.make_ai_move()
+    game.make_move(game.get_all_possible_moves(game.human_player_piece)[0], game.human_player_piece)
+
+    # Zweiter Zug: dieselbe Stellung mit frischer Engine und mit der Tabelle aus dem ersten Zug
+    fresh = controller._create_engine(game.clone())
+    fresh_move = fresh.find_best_move(game.ai_player_piece)
+    kept_move = controller.search_ai_move(game.clone())
+    assert kept_move == fresh_move
+    assert controller.engine.nodes_searched < fresh.nodes_searched
+
+def _set_dame_position(game, human, ai, current_player):
+    from games.dame import EMPTY
+    game.board = [[EMPTY] * game.board_size for _ in range(game.board_size)]
+    for r, c in human:
+        game.board[r][c] = game.human_player_piece
+    for r, c in ai:
+        game.board[r][c] = game.ai_player_piece
+    game.human_pieces, game.ai_pieces = set(human), set(ai)
+    game.current_player = current_player
+    game.zobrist_hash = game.zobrist.compute_hash(game.board, game.current_player)
+
+
+def test_dame_capture_chain_is_one_move():
+    for game in (Dame(), BitboardDame()):
+        _set_dame_position(game, {(3, 3), (1, 1), (0, 4)}, {(4, 4), (5, 1)}, "ai")
+        before = [row[:] for row in game.board]
+        chain = ["capture", (4, 4), (0, 0), [(3, 3), (1, 1)], [(2, 2), (0, 0)]]
+        assert game.get_all_possible_moves(game.ai_player_piece) == [chain]
+        assert game.get_possible_moves((4, 4)) == [chain]
+
+        assert game.make_move(chain, game.ai_player_piece) == (True, False)
+        assert game.current_player == "human"
+        assert game.human_pieces == {(0, 4)}
+        assert game.check_win_condition() == "ai_wins"
+        assert game.undo_move()
+        assert game.board == before
+
+        # Die ganze Kette kostet nur einen Halbzug Suchtiefe
+        assert Minimax(game, max_depth=1).find_best_move(game.ai_player_piece) == chain
+
+
+def test_dame_controller_animates_capture_chain():
+    from gui.gameController import GameController
+
+    controller = GameController(game_type="Dame", difficulty=2, ai_time_limit_ms=None)
+    _set_dame_position(controller.game, {(3, 3), (1, 1), (0, 4)}, {(4, 4), (5, 1)}, "ai")
+    move = controller.search_ai_move(controller.game)
+    assert move[3] == [(3, 3), (1, 1)]
+
+    frames = controller.move_animation_frames(move)
+    assert len(frames) == 1
+    assert frames[0][2][2] == controller.game.ai_player_piece
+    assert frames[0][3][3] == frames[0][4][4] == "_"
+    assert frames[0][1][1] == controller.game.human_player_piece
+    assert controller.move_animation_frames(["move", (5, 1), (4, 0)]) == []
+
+    assert controller.apply_ai_move(move) == ("ai_wins", False)
+    assert controller.game.board[0][0] == controller.game.ai_player_piece
+
+
+def test_dame_controller_selects_chain_hop_by_hop():
+    from gui.gameController import GameController
+
+    # Zwei Schlagketten von (0, 2) enden beide auf (4, 2): gewählt wird über das erste Landefeld
+    for first_hop, captured in (((2, 0), [(1, 1), (3, 1)]), ((2, 4), [(1, 3), (3, 3)])):
+        controller = GameController(game_type="Dame", difficulty=2, ai_time_limit_ms=None)
+        game = controller.game
+        _set_dame_position(game, {(0, 2)}, {(1, 1), (3, 1), (1, 3), (3, 3)}, "human")
+        assert sorted(controller.handle_cell_click((0, 2))[0]) == [(2, 0), (2, 4)]
+        assert controller.handle_cell_click(first_hop) == (None, "ai_turn_pending")
+        for r, c in captured:
+            assert game.board[r][c] == "_"
+        assert game.board[4][2] == game.human_player_piece and game.piece_count(game.ai_player_piece) == 2
+
+    # Gemeinsames erstes Landefeld: danach werden die Felder des nächsten Sprungs angezeigt
+    controller = GameController(game_type="Dame", difficulty=2, ai_time_limit_ms=None)
+    game = controller.game
+    _set_dame_position(game, {(0, 0)}, {(1, 1), (3, 1), (3, 3)}, "human")
+    assert controller.handle_cell_click((0, 0))[0] == [(2, 2)]
+    assert sorted(controller.handle_cell_click((2, 2))[0]) == [(4, 0), (4, 4)]
+    assert game.board[0][0] == game.human_player_piece
+    assert controller.handle_cell_click((4, 4)) == (None, "ai_turn_pending")
+    assert game.board[4][4] == game.human_player_piece and game.board[3][1] == game.ai_player_piece
+
+
+def test_dame_selective_search_reduces_nodes():
+    game = BitboardDame()
+    human_move = game.get_all_possible_moves(game.human_player_piece)[0]
+    game.make_move(human_move, game.human_player_piece)
+
+    full = Minimax(game, max_depth=10, search_mode="pvs")
+    full.find_best_move(game.ai_player_piece, time_limit_ms=60000)
+    selective = Minimax(game, max_depth=10, search_mode="pvs", use_lmr=True, use_null_move=True, use_futility=True)
+    move = selective.find_best_move(game.ai_player_piece, time_limit_ms=60000)
+
+    assert move in game.get_all_possible_moves(game.ai_player_piece)
+    assert selective.nodes_searched < full.nodes_searched
+    assert selective.search_stats["null_move_tries"] > 0
+    assert selective.search_stats["lmr_reductions"] > 0
+    assert selective.search_time_ms > 0
+    assert not any(full.search_stats.values())
+
+    # Die Ply bleibt trotz LMR der Abstand zur Wurzel: Zugstapel minus Ply ist in jedem Knoten gleich
+    reduced = Minimax(game, max_depth=6, search_mode="pvs", use_lmr=True)
+    offsets = set()
+    negamax = reduced._negamax
+
+    def counting_negamax(game_state, depth, is_ai_turn, alpha, beta, ply):
+        offsets.add(len(game_state.move_stack) - ply)
+        return negamax(game_state, depth, is_ai_turn, alpha, beta, ply)
+
+    reduced._negamax = counting_negamax
+    reduced.find_best_move(game.ai_player_piece)
+    assert reduced.search_stats["lmr_reductions"] > 0
+    assert len(offsets) == 1
+
+    # Controller: LMR und Futility ohne Null-Move; mit Zeitlimit sucht "Hard" bis Tiefe 10
+    from gui.gameController import GameController
+    controller = GameController(game_type="Dame", difficulty=5, ai_opening_book=False)
+    assert controller.engine.use_lmr and controller.engine.use_futility and not controller.engine.use_null_move
+    assert controller.engine.max_depth == GameController.DAME_SEARCH_DEPTHS[5] == 10
+    assert GameController(game_type="Dame", difficulty=5, ai_time_limit_ms=None).engine.max_depth == 5
+
+
+def _solve_dame_exhaustively(game):
+    """(wins, distance) of the side to move, by searching every line to the end."""
+    if game.check_win_condition() is not None:
+        return game.check_win_condition() == game.current_player + "_wins", 0
+    piece = game.current_player_piece
+    results = []
+    for move in list(game.get_all_possible_moves(piece)):
+        game.make_move(move, piece)
+        results.append(_solve_dame_exhaustively(game))
+        game.undo_move()
+    wins = [distance + 1 for opponent_wins, distance in results if not opponent_wins]
+    if wins:
+        return True, min(wins)
+    return False, max(distance + 1 for _, distance in results)
+
+
+def test_dame_tablebase_matches_exhaustive_search(tmp_path):
+    import pickle
+    from ai.tablebase import DameTablebase
+
+    table = DameTablebase(max_pieces=2)
+    table.generate()
+    path = str(tmp_path / "dame6_2.tb")
+    table.save(path)
+    loaded = DameTablebase.load(path)
+    assert pickle.loads(pickle.dumps(loaded)).probe_bits(1, 1 << 31, 0) == loaded.probe_bits(1, 1 << 31, 0)
+
+    # Abgeschnittene Datei: Fehler, Datei und Abbildung sind danach wieder geschlossen
+    import gc
+    import warnings
+    import pytest
+    truncated = str(tmp_path / "truncated.tb")
+    with open(path, "rb") as source, open(truncated, "wb") as target:
+        target.write(source.read()[:-1])
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", ResourceWarning)
+        with pytest.raises(ValueError, match="Truncated"):
+            DameTablebase.load(truncated)
+        gc.collect()
+    assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+    rng = random.Random(7)
+    human_squares = [(r, c) for r in range(5) for c in range(6) if (r + c) % 2 == 0]
+    ai_squares = [(r, c) for r in range(1, 6) for c in range(6) if (r + c) % 2 == 0]
+    game = Dame()
+    for _ in range(200):
+        human = set(rng.sample(human_squares, rng.randint(1, 2)))
+        ai = set(rng.sample(ai_squares, rng.randint(1, 2))) - human
+        if not ai:
+            continue
+        _set_dame_position(game, human, ai, rng.choice(["human", "ai"]))
+        assert loaded.probe(game) == _solve_dame_exhaustively(game)
+
+    # Wurzel in der Datenbank: der Zug kommt ohne Suche aus der Tabelle
+    _set_dame_position(game, {(1, 1), (0, 4)}, {(4, 2), (5, 5)}, "ai")
+    engine = Minimax(game, max_depth=6, search_mode="pvs", tablebase=loaded)
+    move = engine.find_best_move(game.ai_player_piece)
+    assert engine.search_stats["tablebase_hits"] == 1 and engine.nodes_searched == 0
+    wins, distance = loaded.probe(game)
+    game.make_move(move, game.ai_player_piece)
+    assert loaded.probe(game) == (not wins, distance - 1)
+
+
+def test_dame_proof_number_search_agrees_with_tablebase():
+    from ai.proof_number import ProofNumberSearch
+    from ai.tablebase import DameTablebase
+
+    table = DameTablebase(max_pieces=2)
+    table.generate()
+    rng = random.Random(3)
+    human_squares = [(r, c) for r in range(5) for c in range(6) if (r + c) % 2 == 0]
+    ai_squares = [(r, c) for r in range(1, 6) for c in range(6) if (r + c) % 2 == 0]
+    solver = ProofNumberSearch()
+    game = BitboardDame()
+    proven = 0
+    for _ in range(100):
+        human = set(rng.sample(human_squares, 2))
+        ai = set(rng.sample(ai_squares, 2)) - human
+        _set_dame_position(game, human, ai, "ai")
+        game.human_bits = sum(1 << (r * 6 + c) for r, c in human)
+        game.ai_bits = sum(1 << (r * 6 + c) for r, c in ai)
+        if game.is_game_over() or table.probe(game) is None:
+            continue
+        wins = table.probe(game)[0]
+        assert solver.prove(game, game.ai_player_piece) == wins
+        if wins:
+            proven += 1
+            engine = Minimax(game, max_depth=2, search_mode="pvs", proof_search=solver)
+            move = engine.find_best_move(game.ai_player_piece)
+            assert engine.nodes_searched == 0
+            game.make_move(move, game.ai_player_piece)
+            # Sofortige Gewinnzüge findet schon die Wurzelprüfung, alle anderen die Beweiszahlsuche
+            assert game.check_win_condition() == "ai_wins" or (engine.search_stats["proof_wins"] == 1
+                                                               and not table.probe(game)[0])
+    assert proven > 10
+
+
+def test_dame_stop_event_ends_root_checks():
+    import threading
+    from ai.proof_number import ProofNumberSearch
+    from gui.gameController import GameController
+
+    stopped = threading.Event()
+    stopped.set()
+    game = BitboardDame()
+    _set_dame_position(game, {(0, 0), (0, 4)}, {(3, 3), (4, 4)}, "ai")
+    game.human_bits = sum(1 << (r * 6 + c) for r, c in ((0, 0), (0, 4)))
+    game.ai_bits = sum(1 << (r * 6 + c) for r, c in ((3, 3), (4, 4)))
+    solver = ProofNumberSearch()
+    assert solver.prove(game, game.ai_player_piece, stop_event=stopped) is None
+    assert solver.nodes_searched == 1
+    # Abgebrochen in der Vorprüfung: erster Zug, keine Suche
+    engine = Minimax(game, max_depth=6, search_mode="pvs", proof_search=solver)
+    move = engine.find_best_move(game.ai_player_piece, stop_event=stopped)
+    assert move in game.get_all_possible_moves(game.ai_player_piece)
+    assert engine.nodes_searched == 0 and engine.search_stats["proof_wins"] == 0 and engine._stop_event is None
+
+    # Neustart: eine abgebrochene Suche behält ihre Engine und Löser, die neue Partie bekommt eigene
+    controller = GameController(game_type="Dame", difficulty=2, ai_time_limit_ms=None)
+    old_engine, old_solver = controller.engine, controller.proof_search
+    controller.reset_game()
+    assert controller.engine is not old_engine and controller.proof_search is not old_solver
+    assert controller.engine.proof_search is controller.proof_search
+
+
+def test_dame_time_limit_bounds_root_checks():
+    import time
+    from ai.proof_number import ProofNumberSearch
+
+    game = BitboardDame()
+    _set_dame_position(game, {(0, 0), (0, 4)}, {(3, 3), (4, 4)}, "ai")
+    solver = ProofNumberSearch()
+    assert solver.prove(game, game.ai_player_piece, deadline=time.perf_counter() - 1) is None
+    assert solver.nodes_searched == 1
+    # Budget schon vor den Vorprüfungen verbraucht: keine Beweiszahlsuche, Tiefe 1 liefert den Zug
+    engine = Minimax(game, max_depth=6, search_mode="pvs", proof_search=solver)
+    move = engine.find_best_move(game.ai_player_piece, time_limit_ms=0)
+    assert move in game.get_all_possible_moves(game.ai_player_piece)
+    assert solver.nodes_searched == 1 and engine.completed_depth >= 1
+
+
+def test_dame_larger_boards():
+    import pytest
+    from gui.gameController import GameController
+
+    # Reihen je Seite: (N - 2) // 2, Steine auf den dunklen Feldern
+    for board_size, pieces in ((6, 6), (8, 12), (10, 20)):
+        game, bitboard = Dame(board_size), BitboardDame(board_size)
+        assert len(game.human_pieces) == len(game.ai_pieces) == pieces
+        assert bitboard.piece_count(bitboard.human_player_piece) == pieces
+        assert bitboard.board == game.board
+
+    # Bitboard und Mengen-Implementierung spielen auf 10x10 dieselbe zufällige Partie
+    rng = random.Random(4)
+    game, bitboard = Dame(10), BitboardDame(10)
+    while not game.is_game_over():
+        piece = game.current_player_piece
+        moves = sorted(game.get_all_possible_moves(piece), key=repr)
+        assert moves == sorted(bitboard.get_all_possible_moves(piece), key=repr)
+        assert game.evaluate_board(game.ai_player_piece) == bitboard.evaluate_board(bitboard.ai_player_piece)
+        move = rng.choice(moves)
+        game.make_move(move, piece)
+        bitboard.make_move(move, piece)
+    assert game.check_win_condition() == bitboard.check_win_condition()
+
+    controller = GameController(game_type="Dame", difficulty=3, ai_time_limit_ms=None, board_size=8)
+    assert controller.game.board_size == 8 and controller.opening_book is None and controller.tablebase is None
+    human_move = controller.game.get_all_possible_moves(controller.game.human_player_piece)[0]
+    controller.game.make_move(human_move, controller.game.human_player_piece)
+    move = controller.search_ai_move(controller.game)
+    assert move in controller.game.get_all_possible_moves(controller.game.ai_player_piece)
+    controller.reset_game()
+    assert controller.game.board_size == 8
+
+    with pytest.raises(ValueError):
+        GameController(game_type="Dame", board_size=7)
+
+
 if __name__ == "__main__":
     test_dame_minimax()
+    test_dame_larger_boards()
@@ -0,0 +1,403 @@
+import threading
+from games.tic_tac_toe import TicTacToe, get_window_masks
+from ai.minimax import Minimax
+
+
+def test_tic_tac_toe_window_masks():
+    # 6x6, 4 in a row: 3 Fenster pro Zeile/Spalte, 9 pro Diagonalrichtung
+    assert len(get_window_masks(6)) == 6 * 3 * 2 + 9 * 2
+
+
+def test_tic_tac_toe_win_detection():
+    lines = [
+        [(1, 0), (1, 1), (1, 2), (1, 3)],
+        [(0, 5), (1, 5), (2, 5), (3, 5)],
+        [(2, 2), (3, 3), (4, 4), (5, 5)],
+        [(0, 4), (1, 3), (2, 2), (3, 1)],
+    ]
+    for line in lines:
+        game = TicTacToe()
+        for cell in line[:-1]:
+            game.make_move(cell, game.ai_player_mark)
+            assert game.check_win_condition() is None
+        game.make_move(line[-1], game.ai_player_mark)
+        assert game.check_win_condition() == "ai_wins"
+
+
+def test_tic_tac_toe_open_line_score():
+    game = TicTacToe()
+    game.make_move((0, 0), game.ai_player_mark)
+    # Zeile, Spalte und Diagonale durch die Ecke
+    assert game.evaluate_board(game.ai_player_mark) == 30
+    assert game.evaluate_board(game.human_player_mark) == -30
+    game.make_move((0, 1), game.human_player_mark)
+    assert game.get_possible_moves()[:2] == [(0, 2), (0, 3)]
+
+
+def test_tic_tac_toe_minimax_blocks_three_in_a_row():
+    game = TicTacToe()
+    for human_move, ai_move in [((2, 1), (2, 0)), ((2, 2), (5, 5))]:
+        game.make_move(human_move, game.human_player_mark)
+        game.make_move(ai_move, game.ai_player_mark)
+    game.make_move((2, 3), game.human_player_mark)
+    assert game.current_player == "ai"
+    best_move = Minimax(game, max_depth=2).find_best_move(game.ai_player_mark)
+    assert best_move == (2, 4)
+
+
+def test_tic_tac_toe_incremental_evaluation_survives_undo():
+    game = TicTacToe()
+    moves = [((1, 1), 'O'), ((1, 2), 'X'), ((2, 2), 'O'), ((3, 3), 'O'), ((0, 0), 'X')]
+    scores = [game.evaluate_board(game.ai_player_mark)]
+    for move, mark in moves:
+        game.make_move(move, mark)
+        scores.append(game.evaluate_board(game.ai_player_mark))
+
+    fresh = TicTacToe()
+    for move, mark in moves:
+        fresh.make_move(move, mark)
+    assert fresh.window_counts == game.window_counts
+    assert fresh.line_score == game.line_score
+
+    for expected in reversed(scores[:-1]):
+        game.undo_move()
+        assert game.evaluate_board(game.ai_player_mark) == expected
+    assert game.window_counts == TicTacToe().window_counts
+
+
+def test_tic_tac_toe_minimax_respects_node_budget():
+    game = TicTacToe()
+    game.make_move((2, 2), game.human_player_mark)
+    ai = Minimax(game, max_depth=8)
+    best_move = ai.find_best_move(game.ai_player_mark, max_nodes=2000)
+    assert best_move in game.get_possible_moves()
+    assert 1 <= ai.completed_depth < 8
+    assert ai.nodes_searched <= 2000 + 256
+    assert ai.principal_variation[0] == best_move
+
+
+def test_tic_tac_toe_parallel_root_search_matches_serial():
+    import pytest
+    from ai import parallel
+    from ai.minimax import _SearchAborted
+    game = TicTacToe()
+    for move, mark in [((2, 2), 'X'), ((3, 3), 'O'), ((2, 3), 'X')]:
+        game.make_move(move, mark)
+    try:
+        serial_move = Minimax(game, max_depth=3).find_best_move(game.ai_player_mark)
+        parallel_move = Minimax(game, max_depth=3, parallel_workers=2).find_best_move(game.ai_player_mark)
+
+        # Dieselben Worker nach einer Dame-Suche mit Endspieldatenbank: die Engine wird neu angelegt
+        from games.dame_bitboard import BitboardDame
+        from ai.tablebase import get_tablebase
+        dame = BitboardDame()
+        dame.make_move(dame.get_all_possible_moves(dame.human_player_piece)[0], dame.human_player_piece)
+        # Selektive Suche an: die Worker suchen ohne LMR, Null-Move und Futility wie die serielle Suche ohne sie
+        selective = {"use_lmr": True, "use_null_move": True, "use_futility": True}
+        dame_move = Minimax(dame, max_depth=5, parallel_workers=2, tablebase=get_tablebase(6),
+                            **selective).find_best_move(dame.ai_player_piece)
+        assert dame_move == Minimax(dame, max_depth=5, tablebase=get_tablebase(6)).find_best_move(dame.ai_player_piece)
+        after_dame_move = Minimax(game, max_depth=3, parallel_workers=2).find_best_move(game.ai_player_mark)
+
+        # Gesetztes stop_event: die Wurzelsuche in den Workern bricht ab, find_best_move schon vor der Suche
+        stop_event = threading.Event()
+        stop_event.set()
+        stopped = Minimax(game, max_depth=3, parallel_workers=2)
+        stopped.ai_player_piece = game.ai_player_mark
+        with pytest.raises(_SearchAborted):
+            parallel.search_root_parallel(stopped, game.clone(), game.get_possible_moves(), 3, stop_event=stop_event)
+        assert stopped.find_best_move(game.ai_player_mark, stop_event=stop_event) in game.get_possible_moves()
+        assert stopped.completed_depth == 0
+    finally:
+        parallel.shutdown_pool()
+    assert parallel_move == serial_move == after_dame_move
+
+
+def test_tic_tac_toe_controller_search_runs_on_snapshot():
+    from gui.gameController import GameController
+
+    controller = GameController(game_type="TicTacToe", difficulty=3, ai_time_limit_ms=None)
+    controller.handle_cell_click((2, 2))
+    snapshot = controller.game.clone()
+    move = controller.search_ai_move(snapshot)
+    # Die Suche darf das laufende Spiel nicht verändern
+    assert controller.game.current_player == "ai"
+    assert snapshot.board == controller.game.board
+
+    win_status, more_moves = controller.apply_ai_move(move)
+    assert win_status is None and not more_moves
+    assert controller.game.board[move[0]][move[1]] == controller.game.ai_player_mark
+
+    # Ein bereits gesetztes stop_event beendet die Suche nach der ersten Tiefe
+    stop_event = threading.Event()
+    stop_event.set()
+    controller.handle_cell_click((3, 3))
+    assert controller.search_ai_move(controller.game.clone(), stop_event=stop_event) is not None
+
+    generation = controller.game_generation
+    controller.reset_game()
+    assert controller.game_generation != generation
+
+
+def test_tic_tac_toe_pondering_answers_predicted_move():
+    from gui.gameController import GameController
+
+    controller = GameController(game_type="TicTacToe", difficulty=2, ai_time_limit_ms=None, ai_ponder=True)
+    controller.handle_cell_click((2, 2))
+    controller.make_ai_move()
+    board_before = [row[:] for row in controller.game.board]
+
+    controller.start_pondering()
+    controller._ponder_thread.join()
+    # Pondering arbeitet nur auf einer Kopie
+    assert controller.game.board == board_before
+    assert controller.game.current_player == "human"
+
+    predicted = controller._predict_human_replies(controller.game.clone())[0]
+    controller.handle_cell_click(predicted)
+    expected = Minimax(controller.game, max_depth=2).find_best_move(controller.game.ai_player_mark)
+    assert controller.search_ai_move(controller.game.clone()) == expected
+    assert controller.ponder_hits == 1
+
+    # Der Qt-Thread setzt nur das Event; gewartet wird erst in search_ai_move (im Worker-Thread)
+    controller.apply_ai_move(expected)
+    controller.difficulty = 8
+    controller.start_pondering()
+    ponder_thread = controller._ponder_thread
+    controller.stop_pondering()
+    assert controller._ponder_thread is ponder_thread
+    controller.stop_pondering(wait=True)
+    assert controller._ponder_thread is None and not ponder_thread.is_alive()
+
+    # Eine Suche, die nach reset_game noch ausläuft, lässt das Pondering des neuen Spiels in Ruhe
+    controller.difficulty = 2
+    controller.start_pondering()
+    old_game, old_search = controller.game.clone(), controller.capture_ai_search()
+    controller.reset_game()
+    controller.start_pondering()
+    new_thread, new_stop = controller._ponder_thread, controller._ponder_stop
+    old_game.make_move(controller._predict_human_replies(old_game)[0], old_game.human_player_mark)
+    assert controller.search_ai_move(old_game, search=old_search) is not None
+    assert not old_search[1].is_alive()
+    assert controller._ponder_thread is new_thread and not new_stop.is_set()
+    controller.stop_pondering(wait=True)
+
+
+def test_tic_tac_toe_move_ordering_reduces_nodes():
+    game = TicTacToe()
+    for move, mark in (((2, 2), 'X'), ((3, 3), 'O'), ((2, 3), 'X')):
+        game.make_move(move, mark)
+    ordered = Minimax(game, max_depth=4, use_transposition_table=False)
+    unordered = Minimax(game, max_depth=4, use_transposition_table=False, use_move_ordering=False)
+    assert ordered.find_best_move('O') == unordered.find_best_move('O')
+    assert ordered.nodes_searched < unordered.nodes_searched
+
+
+def test_tic_tac_toe_symmetric_positions_share_canonical_hash():
+    corners = [(0, 0), (0, 5), (5, 0), (5, 5)]
+    hashes = set()
+    for corner in corners:
+        game = TicTacToe()
+        game.make_move(corner, game.human_player_mark)
+        game.make_move((2, 3), game.ai_player_mark)
+        hashes.add(game.canonical_hash())
+        symmetry = game.canonical_symmetry()
+        assert game.from_canonical_move(game.to_canonical_move((1, 4), symmetry), symmetry) == (1, 4)
+        assert game.undo_move() and game.undo_move()
+        assert game.symmetry_hashes == [0] * 8
+    # (2, 3) liegt nicht symmetrisch zu allen Ecken: nur Ecken mit gleicher Lage teilen den Hash
+    assert 1 < len(hashes) < len(corners)
+
+    game = TicTacToe()
+    assert len(game.unique_moves(game.get_possible_moves())) == 6
+    game.make_move((0, 1), game.human_player_mark)
+    assert len(game.unique_moves(game.get_possible_moves())) == 35
+
+
+def test_tic_tac_toe_symmetry_reduces_empty_board_search():
+    results = {}
+    for use_symmetry in (False, True):
+        game = TicTacToe()
+        game.switch_player()
+        engine = Minimax(game, max_depth=4, use_symmetry=use_symmetry)
+        move = engine.find_best_move(game.ai_player_mark, time_limit_ms=60000)
+        results[use_symmetry] = (move, engine.nodes_searched)
+    assert results[True][0] == results[False][0]
+    assert results[True][1] * 3 < results[False][1]
+
+
+def test_tic_tac_toe_opening_book_round_trip(tmp_path):
+    from ai.opening_book import OpeningBook, build_book, write_book
+
+    records = build_book(TicTacToe(), plies=2, depth=2)
+    assert len(records) == 6  # ein Eintrag je Gruppe symmetrischer erster Züge
+    path = str(tmp_path / "tictactoe.book")
+    write_book(path, records)
+    book = OpeningBook(path)
+    try:
+        assert len(book) == 6
+        # (5, 5) steht nicht im Buch, ist aber symmetrisch zu (0, 0): die Antworten müssen es auch sein
+        positions = []
+        for human_move in ((0, 0), (5, 5)):
+            game = TicTacToe()
+            game.make_move(human_move, game.human_player_mark)
+            booked = Minimax(game, max_depth=2, opening_book=book)
+            move = booked.find_best_move(game.ai_player_mark)
+            assert booked.search_stats["book_hits"] == 1 and booked.nodes_searched == 0
+            assert game.make_move(move, game.ai_player_mark)
+            positions.append(game.canonical_hash())
+        assert positions[0] == positions[1]
+        game.undo_move()
+        # Tiefer als das Buch: es wird normal gesucht
+        deeper = Minimax(game, max_depth=3, opening_book=book)
+        deeper.find_best_move(game.ai_player_mark)
+        assert deeper.search_stats["book_hits"] == 0 and deeper.nodes_searched > 0
+    finally:
+        book.close()
+
+
+def test_tic_tac_toe_threat_search_finds_long_forced_win():
+    from ai.threat_space import ThreatSpaceSearch
+
+    game = TicTacToe()
+    for move in ((0, 0), (2, 2), (2, 3), (0, 4), (5, 4), (2, 4), (4, 3)):
+        game.make_move(move, game.human_player_mark if game.current_player == "human" else game.ai_player_mark)
+
+    # Vierer in Spalte 4, dann auf der Diagonale, dann Doppeldrohung in Zeile 1: Gewinn nach 7 Halbzügen
+    plies, line = ThreatSpaceSearch().solve(game, game.ai_player_mark)
+    assert (plies, line) == (7, [(1, 4), (3, 4), (1, 3), (3, 1), (1, 2)])
+    assert ThreatSpaceSearch().solve(game, game.ai_player_mark, max_depth=2) is None
+
+    engine = Minimax(game, max_depth=3, threat_search=ThreatSpaceSearch())
+    assert engine.find_best_move(game.ai_player_mark) == (1, 4)
+    assert engine.search_stats["threat_wins"] == 1 and engine.nodes_searched == 0
+
+    # Jede Antwort des Menschen auf die Folge verliert im nächsten Zug
+    for index, move in enumerate(line):
+        game.make_move(move, game.ai_player_mark if index % 2 == 0 else game.human_player_mark)
+    for reply in game.get_possible_moves():
+        game.make_move(reply, game.human_player_mark)
+        wins = []
+        for win in game.get_possible_moves():
+            game.make_move(win, game.ai_player_mark)
+            wins.append(game.check_win_condition() == "ai_wins")
+            game.undo_move()
+        assert any(wins)
+        game.undo_move()
+
+
+def test_tic_tac_toe_mcts_blocks_wins_and_reuses_tree():
+    from ai.mcts import MCTS
+    from gui.gameController import GameController
+
+    game = TicTacToe()
+    for move, mark in (((0, 0), 'X'), ((1, 1), 'O'), ((0, 1), 'X'), ((2, 2), 'O'), ((0, 2), 'X')):
+        game.make_move(move, mark)
+    engine = MCTS(game, max_depth=1, seed=1)
+    assert engine.find_best_move(game.ai_player_mark) == (0, 3)
+    assert engine.search_stats["playouts"] == 2000 and engine.completed_depth == 1
+
+    # Nach eigenem Zug und Antwort des Menschen geht es im alten Baum weiter
+    game.make_move((0, 3), game.ai_player_mark)
+    game.make_move((5, 5), game.human_player_mark)
+    engine.find_best_move(game.ai_player_mark, max_nodes=500)
+    assert engine.search_stats["reused_visits"] > 0
+    assert engine.completed_depth == 0
+
+    controller = GameController(game_type="TicTacToe", difficulty=1, ai_time_limit_ms=None, ai_engine="mcts")
+    move = controller.search_ai_move(controller.game)
+    assert isinstance(controller.engine, MCTS) and move in controller.game.get_possible_moves()
+
+
+def test_tic_tac_toe_batch_evaluation_matches_evaluate_board():
+    import random
+    import pytest
+    np = pytest.importorskip("numpy")
+    from ai.batch_eval import TicTacToeBatchEvaluator, AI_CELL, HUMAN_CELL
+
+    evaluator = TicTacToeBatchEvaluator()
+    rng = random.Random(7)
+    games = []
+    while len(games) < 40:
+        game = TicTacToe()
+        for _ in range(rng.randint(0, 36)):
+            if game.is_game_over():
+                break
+            mark = game.human_player_mark if game.current_player == "human" else game.ai_player_mark
+            game.make_move(rng.choice(game.get_possible_moves()), mark)
+        games.append(game)
+
+    # Ganze Bretter als (N, 6, 6)-Array, auch beendete Spiele und volle Bretter
+    values = {game.ai_player_mark: AI_CELL, game.human_player_mark: HUMAN_CELL, '': 0}
+    boards = np.array([[[values[cell] for cell in row] for row in game.board] for game in games], dtype=np.int8)
+    scores, _ = evaluator.evaluate(boards)
+    assert scores.tolist() == [game.evaluate_board(game.ai_player_mark) for game in games]
+
+    for game in games:
+        if game.is_game_over():
+            continue
+        mark = game.human_player_mark if game.current_player == "human" else game.ai_player_mark
+        moves = game.get_possible_moves()
+        scores, winners = evaluator.evaluate_moves(game, moves, mark)
+        for move, score, winner in zip(moves, scores.tolist(), winners.tolist()):
+            game.make_move(move, mark)
+            assert score == game.evaluate_board(game.ai_player_mark)
+            assert (winner != 0) == (game.check_win_condition() in ("ai_wins", "human_wins"))
+            game.undo_move()
+
+    # Gebündelte letzte Ebene: gleicher Zug und gleicher Wert wie die normale Suche
+    game = games[3] if not games[3].is_game_over() else TicTacToe()
+    for search_mode in ("alphabeta", "pvs"):
+        plain = Minimax(game, max_depth=3, search_mode=search_mode)
+        batched = Minimax(game, max_depth=3, search_mode=search_mode, batch_evaluator=evaluator)
+        assert plain.find_best_move(game.ai_player_mark) == batched.find_best_move(game.ai_player_mark)
+        key = plain._position_key(game, True)
+        assert plain.transposition_table.probe(key)[3] == batched.transposition_table.probe(key)[3]
+
+
+def test_tic_tac_toe_larger_board_with_five_in_a_row():
+    import random
+    from games.tic_tac_toe import get_cell_windows
+    from ai.threat_space import ThreatSpaceSearch
+
+    # 10x10, 5 in einer Reihe: 6 Fenster pro Zeile/Spalte, 36 pro Diagonalrichtung
+    assert len(get_window_masks(10, 5)) == 10 * 6 * 2 + 36 * 2
+    assert get_window_masks(10, 5) is get_window_masks(10, 5)
+    assert len(get_window_masks(6)) == 54
+    assert max(len(windows) for windows in get_cell_windows(10, 5)) == 4 * 5
+
+    game = TicTacToe(10, 5)
+    assert game.win_length == 5 and game.line_scores == [0, 10, 100, 1000, 10000, 100000]
+    for col in range(4):
+        game.make_move((3, col + 2), game.ai_player_mark)
+        assert game.check_win_condition() is None
+    game.make_move((3, 6), game.ai_player_mark)
+    assert game.check_win_condition() == "ai_wins"
+    assert game.evaluate_board(game.ai_player_mark) == game.win_score == 100000
+
+    # Zählerstand nach zufälligen Zügen und Rücknahmen wie bei einer Neuberechnung über alle Fenster
+    rng = random.Random(3)
+    game = TicTacToe(10, 5)
+    for _ in range(40):
+        mark = game.human_player_mark if game.current_player == "human" else game.ai_player_mark
+        game.make_move(rng.choice(game.get_possible_moves()), mark)
+        if rng.random() < 0.3 or game.is_game_over():
+            game.undo_move()
+    expected = 0
+    for mask in game.window_masks:
+        ai = bin(game.mark_bits[game.ai_player_mark] & mask).count("1")
+        human = bin(game.mark_bits[game.human_player_mark] & mask).count("1")
+        expected += game.line_scores[ai] if not human else -game.line_scores[human] if not ai else 0
+    assert game.line_score == expected
+    clone = game.clone()
+    assert (clone.win_length, clone.line_score, clone.window_counts) == (5, game.line_score, game.window_counts)
+
+    # Offene Vier: der Drohungslöser findet den Gewinn, die Suche spielt ihn
+    game = TicTacToe(10, 5)
+    for move in ((4, 3), (0, 0), (4, 4), (0, 9), (4, 5), (9, 0)):
+        game.make_move(move, game.ai_player_mark if move[0] == 4 else game.human_player_mark)
+    game.current_player = "ai"
+    game.zobrist_hash = game.zobrist.compute_hash(game.board, game.current_player)
+    assert ThreatSpaceSearch().solve(game, game.ai_player_mark)[0] == 3
+    engine = Minimax(game, max_depth=2, search_mode="pvs", threat_search=ThreatSpaceSearch())
+    assert engine.find_best_move(game.ai_player_mark) in ((4, 2), (4, 6))